@@ -9,6 +9,9 @@ class Producto:
         precio (float): Precio unitario del producto
     """
 
+    # Sin __dict__ por instancia: reduce la memoria de cada producto
+    __slots__ = ('id', 'nombre', 'cantidad', 'precio')
+
     def __init__(self, id: str, nombre: str, cantidad: int, precio: float):
         self.id = id
         self.nombre = nombre
@@ -0,0 +1,282 @@
+"""
+Benchmark reproducible de los tres Inventario (semana 9, semana 10 y semana 11).
+
+Genera catálogos sintéticos con una semilla fija y mide, para cada implementación y tamaño,
+la carga inicial, añadir, actualizar, eliminar, buscar por nombre y el listado completo.
+Los resultados se guardan en JSON para poder comparar una versión con otra:
+
+    python benchmarks/comparar_inventarios.py --tamaños 1000 10000 100000 --salida actual.json
+    python benchmarks/comparar_inventarios.py --tamaños 1000 10000 --comparar actual.json
+
+Con --comparar se indican las mediciones más lentas que la referencia en más de la
+tolerancia y el programa termina con código 1 si hay alguna.
+
+Cada operación que modifica el inventario se persiste como lo hace el programa de cada
+semana: la semana 9 no guarda nada, la semana 10 reescribe el archivo de texto y la semana 11
+reescribe el JSON o, en la variante "semana11-diario", añade una línea al log.
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PALABRAS = ["tornillo", "tuerca", "martillo", "llave", "destornillador", "taladro", "brocha", "pintura",
+            "cable", "enchufe", "bombilla", "cinta", "sierra", "lija", "clavo", "arandela", "bisagra",
+            "candado", "manguera", "pegamento"]
+
+
+def cargar_modulo(ruta_relativa, nombre):
+    """Importa un módulo a partir de su ruta (las carpetas de las semanas tienen espacios)"""
+    ruta = os.path.join(RAIZ, ruta_relativa)
+    sys.path.insert(0, os.path.dirname(ruta))
+    try:
+        especificacion = importlib.util.spec_from_file_location(nombre, ruta)
+        modulo = importlib.util.module_from_spec(especificacion)
+        especificacion.loader.exec_module(modulo)
+        return modulo
+    finally:
+        sys.path.pop(0)
+
+
+def generar_catalogo(n, semilla=42):
+    """Devuelve n tuplas (número, nombre, cantidad, precio) siempre iguales para la misma semilla"""
+    rng = random.Random(semilla)
+    return [(i, f"{rng.choice(PALABRAS)} {rng.choice(PALABRAS)} {i}", rng.randint(0, 500),
+             round(rng.uniform(0.5, 500), 2)) for i in range(n)]
+
+
+class Semana9:
+    """Inventario en memoria, sin persistencia: la carga es añadir el catálogo producto a producto"""
+    nombre = "semana9"
+
+    def __init__(self):
+        self.modulo = cargar_modulo(os.path.join("Semana 9", "inventario.py"), "inventario_semana9")
+
+    def id(self, numero):
+        return f"P{numero:07d}"
+
+    def producto(self, numero, nombre, cantidad, precio):
+        return self.modulo.Producto(self.id(numero), nombre, cantidad, precio)
+
+    def preparar(self, directorio, catalogo):
+        self.catalogo = catalogo
+
+    def abrir(self, directorio):
+        inventario = self.modulo.Inventario()
+        for fila in self.catalogo:
+            inventario.añadir_producto(self.producto(*fila))
+        return inventario
+
+    def listar(self, inventario):
+        inventario.mostrar_productos()
+
+    def cerrar(self, inventario):
+        pass
+
+
+class Semana10(Semana9):
+    """Inventario persistido en texto id|nombre|cantidad|precio, reescrito en cada cambio"""
+    nombre = "semana10"
+
+    def __init__(self):
+        self.modulo = cargar_modulo(os.path.join("semana 10", "sistema_inventariomejorado.py"),
+                                    "inventario_semana10")
+
+    def preparar(self, directorio, catalogo):
+        self.archivo = os.path.join(directorio, "inventario.txt")
+        self.modulo.escribir_productos_texto(self.archivo, (self.producto(*fila) for fila in catalogo))
+
+    def abrir(self, directorio):
+        return self.modulo.Inventario(self.archivo)
+
+
+class Semana11(Semana9):
+    """Inventario persistido en JSON (o en JSON más un log de operaciones con diario=True)"""
+    nombre = "semana11"
+    diario = False
+
+    def __init__(self):
+        self.modulo = cargar_modulo(os.path.join("semana11", "SistemaAvanzadodeGestióndeInventario.py"),
+                                    "inventario_semana11")
+
+    def id(self, numero):
+        return numero
+
+    def preparar(self, directorio, catalogo):
+        self.archivo = os.path.join(directorio, "inventario.json")
+        with open(self.archivo, 'w') as f:
+            self.modulo.escribir_productos(f, ({'id': i, 'nombre': nombre, 'cantidad': cantidad, 'precio': precio}
+                                               for i, nombre, cantidad, precio in catalogo))
+
+    def abrir(self, directorio):
+        return self.modulo.Inventario(self.archivo, diario=self.diario)
+
+    def listar(self, inventario):
+        # El menú de la semana 11 imprime la lista que devuelve mostrar_todos
+        for producto in inventario.mostrar_todos():
+            print(producto)
+
+    def cerrar(self, inventario):
+        inventario.cerrar()
+
+
+class Semana11Diario(Semana11):
+    nombre = "semana11-diario"
+    diario = True
+
+
+IMPLEMENTACIONES = {clase.nombre: clase for clase in (Semana9, Semana10, Semana11, Semana11Diario)}
+
+
+def resumir(tiempos):
+    return {
+        'repeticiones': len(tiempos),
+        'media_s': statistics.fmean(tiempos),
+        'mediana_s': statistics.median(tiempos),
+        'min_s': min(tiempos),
+        'total_s': sum(tiempos),
+    }
+
+
+def cronometrar(funcion, argumentos):
+    """Llama a funcion con cada tupla de argumentos y devuelve los tiempos de cada llamada"""
+    tiempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def medir_implementacion(implementacion, n, operaciones, repeticiones, semilla):
+    """Devuelve {operación: resumen de tiempos} de una implementación con n productos"""
+    catalogo = generar_catalogo(n, semilla)
+    rng = random.Random(semilla + 1)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio, open(os.devnull, 'w') as nulo:
+        implementacion.preparar(directorio, catalogo)
+        # Los programas informan de cada operación por pantalla; esa salida no nos interesa
+        with contextlib.redirect_stdout(nulo):
+            tiempos = []
+            for repeticion in range(max(1, repeticiones)):
+                if repeticion:
+                    implementacion.cerrar(inventario)
+                inicio = time.perf_counter()
+                inventario = implementacion.abrir(directorio)
+                tiempos.append(time.perf_counter() - inicio)
+            resultados['carga'] = resumir(tiempos)
+            try:
+                nuevos = [(n + k, f"{rng.choice(PALABRAS)} nuevo {n + k}", rng.randint(0, 500),
+                           round(rng.uniform(0.5, 500), 2)) for k in range(operaciones)]
+                resultados['añadir'] = resumir(cronometrar(
+                    inventario.añadir_producto, [(implementacion.producto(*fila),) for fila in nuevos]))
+
+                existentes = [implementacion.id(rng.randrange(n)) for _ in range(operaciones)] if n else []
+                if existentes:
+                    resultados['actualizar'] = resumir(cronometrar(
+                        inventario.actualizar_producto,
+                        [(id, rng.randint(0, 500), round(rng.uniform(0.5, 500), 2)) for id in existentes]))
+
+                # Mitad consultas selectivas (un nombre concreto) y mitad amplias (una palabra)
+                consultas = [(catalogo[rng.randrange(n)][1] if n and k % 2 else rng.choice(PALABRAS),)
+                             for k in range(operaciones)]
+                resultados['buscar'] = resumir(cronometrar(inventario.buscar_por_nombre, consultas))
+
+                resultados['listar'] = resumir(cronometrar(implementacion.listar, [(inventario,)] * repeticiones))
+
+                # Eliminamos los productos añadidos para que el catálogo vuelva a tener n productos
+                resultados['eliminar'] = resumir(cronometrar(
+                    inventario.eliminar_producto, [(implementacion.id(fila[0]),) for fila in nuevos]))
+            finally:
+                implementacion.cerrar(inventario)
+    return resultados
+
+
+def version_git():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, referencia, tolerancia):
+    """Imprime las mediciones más lentas que la referencia y devuelve cuántas son"""
+    anteriores = {(r['implementacion'], r['productos'], r['operacion']): r for r in referencia['resultados']}
+    regresiones = 0
+    for r in resultados:
+        anterior = anteriores.get((r['implementacion'], r['productos'], r['operacion']))
+        if anterior is None or anterior['mediana_s'] <= 0:
+            continue
+        cambio = r['mediana_s'] / anterior['mediana_s'] - 1
+        if cambio > tolerancia:
+            regresiones += 1
+            print(f"REGRESIÓN {r['implementacion']} n={r['productos']} {r['operacion']}: "
+                  f"{anterior['mediana_s'] * 1000:.3f} ms -> {r['mediana_s'] * 1000:.3f} ms (+{cambio:.0%})")
+    if not regresiones:
+        print(f"Sin regresiones respecto a {referencia.get('version') or 'la referencia'} "
+              f"(tolerancia {tolerancia:.0%}).")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark comparativo de los Inventario de las semanas 9, 10 y 11")
+    parser.add_argument("--tamaños", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--implementaciones", nargs="+", choices=list(IMPLEMENTACIONES),
+                        default=list(IMPLEMENTACIONES))
+    parser.add_argument("--operaciones", type=int, default=50,
+                        help="Altas, actualizaciones, bajas y búsquedas medidas por tamaño")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones de la carga y del listado completo")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Resultados JSON de referencia con los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Aumento relativo de la mediana que se considera regresión")
+    args = parser.parse_args()
+
+    resultados = []
+    for nombre in args.implementaciones:
+        implementacion = IMPLEMENTACIONES[nombre]()
+        for n in args.tamaños:
+            inicio = time.perf_counter()
+            medidas = medir_implementacion(implementacion, n, args.operaciones, args.repeticiones, args.semilla)
+            print(f"\n--- {nombre}, {n} productos ({time.perf_counter() - inicio:.1f} s) ---")
+            for operacion, resumen in medidas.items():
+                print(f"{operacion}: mediana {resumen['mediana_s'] * 1000:.3f} ms | "
+                      f"media {resumen['media_s'] * 1000:.3f} ms ({resumen['repeticiones']} rep.)")
+                resultados.append({'implementacion': nombre, 'productos': n, 'operacion': operacion, **resumen})
+
+    documento = {
+        'version': version_git(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {'operaciones': args.operaciones, 'repeticiones': args.repeticiones, 'semilla': args.semilla},
+        'resultados': resultados,
+    }
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(documento, f, indent=4, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            referencia = json.load(f)
+        print()
+        if comparar(resultados, referencia, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
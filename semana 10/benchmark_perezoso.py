@@ -0,0 +1,70 @@
+"""
+Apertura del inventario con carga completa frente a lectura bajo demanda (perezoso=True):
+tiempo hasta poder consultar, memoria y tasa de aciertos de la caché con un conjunto
+pequeño de productos muy consultados.
+
+Uso:
+    python benchmark_perezoso.py --productos 1000000 --tamaño-cache 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from sistema_inventariomejorado import Inventario, Producto, escribir_snapshot_binario, escribir_productos_texto
+
+
+def abrir(archivo: str, **opciones):
+    """Devuelve (inventario, segundos, pico de memoria en MB) de la apertura"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        inventario = Inventario(archivo, **opciones)
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return inventario, segundos, pico / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la lectura bajo demanda del inventario")
+    parser.add_argument("--productos", type=int, default=200000)
+    parser.add_argument("--tamaño-cache", type=int, default=1000)
+    parser.add_argument("--consultas", type=int, default=100000)
+    args = parser.parse_args()
+
+    productos = [Producto(f"P{i:08d}", f"producto {i}", i % 500, round(0.5 + i % 1000 / 10, 2))
+                 for i in range(args.productos)]
+    rng = random.Random(42)
+    # El 90 % de las consultas van a un 0,1 % de los productos
+    calientes = [f"P{rng.randrange(args.productos):08d}" for _ in range(max(1, args.productos // 1000))]
+    consultas = [rng.choice(calientes) if rng.random() < 0.9 else f"P{rng.randrange(args.productos):08d}"
+                 for _ in range(args.consultas)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for extension, escribir in ((".txt", escribir_productos_texto), (".bin", escribir_snapshot_binario)):
+            archivo = os.path.join(directorio, "inventario" + extension)
+            escribir(archivo, productos)
+            print(f"\n--- {extension} ({os.path.getsize(archivo) / 1024 / 1024:.1f} MB) ---")
+            for perezoso in (False, True):
+                inventario, segundos, pico = abrir(archivo, perezoso=perezoso, tamaño_cache=args.tamaño_cache)
+                inicio = time.perf_counter()
+                for id in consultas:
+                    inventario.productos[id]
+                consulta = (time.perf_counter() - inicio) / len(consultas)
+                modo = "perezoso" if perezoso else "completo"
+                print(f"{modo}: apertura {segundos:.2f} s | pico {pico:.1f} MB | "
+                      f"consulta por ID {consulta * 1e6:.1f} µs")
+                if perezoso:
+                    estadisticas = inventario.productos.cache.estadisticas()
+                    print(f"caché: {estadisticas['aciertos']} aciertos, {estadisticas['fallos']} fallos "
+                          f"({estadisticas['tasa_aciertos']:.0%})")
+                    inventario.productos.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Prueba de estrés del modo compartido del Inventario: varios procesos escriben a la vez
+sobre el mismo archivo y al final se comprueba que no se perdió ninguna actualización.
+
+Uso:
+    python prueba_concurrencia.py --procesos 8 --operaciones 50
+    python prueba_concurrencia.py --perezoso
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sistema_inventariomejorado import Inventario, Producto
+
+ID_CONTADOR = "contador"
+
+
+def trabajador(archivo: str, numero: int, operaciones: int, perezoso: bool):
+    """Alterna altas de productos propios con incrementos de un contador compartido"""
+    # El Inventario informa de cada operación por pantalla; aquí descartamos esos mensajes
+    with contextlib.redirect_stdout(io.StringIO()):
+        inventario = Inventario(archivo, compartido=True, perezoso=perezoso)
+        for i in range(operaciones):
+            inventario.añadir_producto(Producto(f"P{numero}-{i}", f"proceso {numero} producto {i}", 1, 1.0))
+            # Lectura-modificación-escritura del contador dentro de una sola sesión bloqueada
+            with inventario.sesion_compartida():
+                contador = inventario.productos[ID_CONTADOR]
+                inventario.actualizar_producto(ID_CONTADOR, cantidad=contador.get_cantidad() + 1)
+
+
+def ejecutar(procesos: int, operaciones: int, extension: str, perezoso: bool):
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "inventario" + extension)
+        with contextlib.redirect_stdout(io.StringIO()):
+            Inventario(archivo, compartido=True).añadir_producto(Producto(ID_CONTADOR, "contador", 0, 0.0))
+
+        inicio = time.perf_counter()
+        trabajadores = [multiprocessing.Process(target=trabajador, args=(archivo, n, operaciones, perezoso))
+                        for n in range(procesos)]
+        for proceso in trabajadores:
+            proceso.start()
+        for proceso in trabajadores:
+            proceso.join()
+            assert proceso.exitcode == 0, f"Un proceso terminó con código {proceso.exitcode}"
+        segundos = time.perf_counter() - inicio
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            final = Inventario(archivo)
+        esperado = procesos * operaciones
+        contador = final.productos[ID_CONTADOR].get_cantidad()
+        altas = len(final.productos) - 1
+        print(f"[{extension}] {procesos} procesos x {operaciones} operaciones en {segundos:.2f} s: "
+              f"contador {contador}/{esperado}, altas {altas}/{esperado}")
+        assert contador == esperado, "Se perdieron incrementos del contador"
+        assert altas == esperado, "Se perdieron altas de productos"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de escrituras concurrentes sobre un mismo inventario")
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=50)
+    parser.add_argument("--perezoso", action="store_true", help="Leer los productos del archivo bajo demanda")
+    args = parser.parse_args()
+
+    for extension in (".txt", ".bin"):
+        ejecutar(args.procesos, args.operaciones, extension, args.perezoso)
+    print("Sin actualizaciones perdidas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Prueba de propiedades de Inventario.resumen(): tras cada operación aleatoria (incluidas
+escrituras fallidas que se revierten) los agregados mantenidos incrementalmente deben
+coincidir con los recalculados recorriendo todos los productos.
+
+Uso:
+    python prueba_resumen.py --operaciones 2000 --semilla 1
+    python prueba_resumen.py --perezoso --binario --tamaño-cache 16
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import tempfile
+
+from sistema_inventariomejorado import Inventario, Producto
+
+
+def resumen_recalculado(inventario: Inventario) -> dict:
+    productos = list(inventario.productos.values())
+    precios = [p.get_precio() for p in productos]
+    return {
+        'productos': len(productos),
+        'unidades': sum(p.get_cantidad() for p in productos),
+        'valor_total': math.fsum(p.get_cantidad() * p.get_precio() for p in productos),
+        'precio_minimo': min(precios) if precios else None,
+        'precio_maximo': max(precios) if precios else None,
+    }
+
+
+def comprobar(inventario: Inventario, paso: int):
+    esperado = resumen_recalculado(inventario)
+    obtenido = inventario.resumen()
+    for clave, valor in esperado.items():
+        if clave == 'valor_total':
+            assert math.isclose(obtenido[clave], valor, rel_tol=1e-9, abs_tol=1e-6), (paso, clave, obtenido, esperado)
+        else:
+            assert obtenido[clave] == valor, (paso, clave, obtenido, esperado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de propiedades de Inventario.resumen()")
+    parser.add_argument("--operaciones", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--perezoso", action="store_true", help="Leer los productos del archivo bajo demanda")
+    parser.add_argument("--binario", action="store_true", help="Usar la instantánea binaria (.bin)")
+    parser.add_argument("--tamaño-cache", type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    with tempfile.TemporaryDirectory() as directorio, contextlib.redirect_stdout(io.StringIO()):
+        archivo = os.path.join(directorio, "inventario.bin" if args.binario else "inventario.txt")
+        inventario = Inventario(archivo, perezoso=args.perezoso, tamaño_cache=args.tamaño_cache)
+        for paso in range(args.operaciones):
+            id = f"P{rng.randrange(200)}"
+            accion = rng.random()
+            # De vez en cuando la escritura falla y la operación debe revertirse sin alterar el resumen
+            inventario.archivo = directorio if rng.random() < 0.05 else archivo
+            if accion < 0.4:
+                inventario.añadir_producto(Producto(id, f"producto {id}", rng.randint(0, 100),
+                                                    round(rng.uniform(0.1, 999), 2)))
+            elif accion < 0.6:
+                inventario.eliminar_producto(id)
+            else:
+                cantidad = rng.randint(0, 100) if rng.random() < 0.7 else None
+                precio = round(rng.uniform(0.1, 999), 2) if rng.random() < 0.7 else None
+                inventario.actualizar_producto(id, cantidad, precio)
+            comprobar(inventario, paso)
+
+        inventario.archivo = archivo
+        comprobar(Inventario(archivo, perezoso=args.perezoso, tamaño_cache=args.tamaño_cache), args.operaciones)
+
+    print(f"resumen() coincide con el recálculo completo tras {args.operaciones} operaciones.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,24 @@
+import bisect
+import functools
+import heapq
+import math
+import mmap
 import os
+import shutil
+import stat
+import struct
+import tempfile
 import traceback
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no existe fcntl; usamos msvcrt para el bloqueo de archivos
+    fcntl = None
+    import msvcrt
 
 
 class Producto:
@@ -13,6 +32,9 @@ class Producto:
         precio (float): Precio unitario del producto
     """
 
+    # Sin __dict__ por instancia: reduce la memoria de cada producto
+    __slots__ = ('id', 'nombre', 'cantidad', 'precio')
+
     def __init__(self, id: str, nombre: str, cantidad: int, precio: float):
         self.id = id
         self.nombre = nombre
@@ -66,6 +88,564 @@ class Producto:
         return f"ID: {self.id} | {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
 
 
+@contextmanager
+def escritura_atomica(ruta: str, modo: str = 'w', antes_de_reemplazar=None):
+    """
+    Escribe en un archivo temporal del mismo directorio, lo sincroniza a disco y lo renombra
+    sobre el destino: una caída a mitad de escritura nunca deja el archivo truncado.
+
+    antes_de_reemplazar() se llama justo antes del renombrado, para que quien tenga abierto el
+    destino lo cierre: en Windows no se puede reemplazar un archivo abierto.
+    """
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=os.path.basename(ruta) + ".", suffix=".tmp")
+    try:
+        # mkstemp crea el archivo con permisos 0600; conservamos los del archivo original
+        os.chmod(temporal, stat.S_IMODE(os.stat(ruta).st_mode) if os.path.exists(ruta) else 0o644)
+        with os.fdopen(descriptor, modo) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if antes_de_reemplazar is not None:
+            antes_de_reemplazar()
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+    # Sincronizamos también el directorio para que el renombrado sobreviva a una caída
+    if os.name != 'nt':
+        descriptor = os.open(directorio, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+@contextmanager
+def bloqueo_archivo(ruta: str):
+    """Bloqueo consultivo exclusivo entre procesos, tomado sobre el archivo auxiliar ruta + '.lock'"""
+    with open(ruta + ".lock", 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def en_sesion_compartida(metodo):
+    """Ejecuta el método del Inventario dentro de sesion_compartida()"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.sesion_compartida():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+# Formato binario de instantánea:
+#   cabecera: firma, versión, número de registros y posición de la tabla de cadenas
+#   registros de ancho fijo ordenados por ID: (pos_id, largo_id, pos_nombre, largo_nombre, cantidad, precio)
+#   tabla de cadenas: ID y nombre de cada registro en UTF-8, cada uno terminado en un byte nulo
+FIRMA_BINARIA = b'INVB'
+CABECERA = struct.Struct('<4sHHQQ')
+REGISTRO = struct.Struct('<QIQIqd')
+
+
+def es_archivo_binario(ruta: str) -> bool:
+    """Los archivos .bin usan la instantánea binaria en lugar del formato de texto id|nombre|cantidad|precio"""
+    return ruta.endswith('.bin')
+
+
+class SnapshotBinario:
+    """
+    Lectura perezosa de una instantánea binaria mediante memoria mapeada.
+
+    Los registros solo se decodifican al accederlos, y al estar ordenados por ID
+    se pueden buscar con búsqueda binaria sin cargar el archivo completo.
+    """
+
+    def __init__(self, ruta: str):
+        self.archivo = open(ruta, 'rb')
+        self.datos = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        firma, version, _, self.total, self.pos_tabla = CABECERA.unpack_from(self.datos, 0)
+        if firma != FIRMA_BINARIA or version != 1:
+            self.cerrar()
+            raise ValueError(f"{ruta} no es una instantánea binaria de inventario válida")
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _cadena(self, posicion: int, largo: int) -> str:
+        inicio = self.pos_tabla + posicion
+        return self.datos[inicio:inicio + largo].decode('utf-8')
+
+    def id_en(self, i: int) -> str:
+        pos_id, largo_id = REGISTRO.unpack_from(self.datos, CABECERA.size + i * REGISTRO.size)[:2]
+        return self._cadena(pos_id, largo_id)
+
+    def producto_en(self, i: int) -> Producto:
+        pos_id, largo_id, pos_nombre, largo_nombre, cantidad, precio = REGISTRO.unpack_from(
+            self.datos, CABECERA.size + i * REGISTRO.size)
+        return Producto(self._cadena(pos_id, largo_id), self._cadena(pos_nombre, largo_nombre), cantidad, precio)
+
+    def buscar(self, id: str):
+        """Busca un producto por ID con búsqueda binaria; devuelve None si no existe"""
+        inicio, fin = 0, self.total
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            if self.id_en(medio) < id:
+                inicio = medio + 1
+            else:
+                fin = medio
+        if inicio < self.total and self.id_en(inicio) == id:
+            return self.producto_en(inicio)
+        return None
+
+    def __iter__(self):
+        # Recorrido completo: desempaquetamos todos los registros de una vez y decodificamos
+        # la tabla de cadenas con una sola operación, separando por los bytes nulos
+        registros = memoryview(self.datos)[CABECERA.size:CABECERA.size + self.total * REGISTRO.size]
+        cadenas = iter(self.datos[self.pos_tabla:].decode('utf-8').split('\x00'))
+        try:
+            for id, nombre, registro in zip(cadenas, cadenas, REGISTRO.iter_unpack(registros)):
+                yield Producto(id, nombre, registro[4], registro[5])
+        finally:
+            # Liberamos la vista para poder cerrar el mmap
+            registros.release()
+
+    def en_orden(self):
+        """Recorre los productos por ID decodificando un registro cada vez (memoria constante)"""
+        for i in range(self.total):
+            yield self.producto_en(i)
+
+    def cerrar(self):
+        self.datos.close()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+def escribir_snapshot_binario(ruta: str, productos, antes_de_reemplazar=None, ordenados: bool = False):
+    """
+    Escribe los productos en formato binario, ordenados por ID (antes_de_reemplazar: ver
+    escritura_atomica). Con ordenados=True los productos ya llegan en orden de ID y se escriben
+    a medida que llegan, sin tenerlos todos en memoria.
+    """
+    if not ordenados:
+        productos = sorted(productos, key=lambda p: p.get_id())
+    # Los registros van al archivo y la tabla de cadenas a un temporal que se copia detrás;
+    # la cabecera se escribe al final, cuando se conoce el número de registros
+    with escritura_atomica(ruta, 'wb', antes_de_reemplazar) as f, tempfile.TemporaryFile() as tabla:
+        f.write(bytes(CABECERA.size))
+        total = largo_tabla = 0
+        for producto in productos:
+            id_bytes = producto.get_id().encode('utf-8')
+            nombre_bytes = producto.get_nombre().encode('utf-8')
+            if b'\x00' in id_bytes or b'\x00' in nombre_bytes:
+                raise ValueError(f"El producto {producto.get_id()!r} contiene un carácter nulo")
+            f.write(REGISTRO.pack(largo_tabla, len(id_bytes), largo_tabla + len(id_bytes) + 1, len(nombre_bytes),
+                                  producto.get_cantidad(), producto.get_precio()))
+            tabla.write(id_bytes + b'\x00' + nombre_bytes + b'\x00')
+            largo_tabla += len(id_bytes) + len(nombre_bytes) + 2
+            total += 1
+        tabla.seek(0)
+        shutil.copyfileobj(tabla, f)
+        f.seek(0)
+        f.write(CABECERA.pack(FIRMA_BINARIA, 1, 0, total, CABECERA.size + total * REGISTRO.size))
+
+
+def producto_de_linea(linea: str):
+    """
+    Convierte una línea id|nombre|cantidad|precio en Producto. Devuelve None si la línea no
+    tiene cuatro campos y lanza ValueError si la cantidad o el precio no son números.
+    """
+    datos = linea.strip().split('|')
+    if len(datos) != 4:
+        return None
+    id, nombre, cantidad, precio = datos
+    return Producto(id, nombre, int(cantidad), float(precio))
+
+
+def leer_productos_texto(ruta: str):
+    """Lee los productos de un archivo de texto id|nombre|cantidad|precio, línea a línea"""
+    with open(ruta, 'r') as f:
+        for linea in f:
+            try:
+                producto = producto_de_linea(linea)
+            except ValueError:
+                print(f"Advertencia: Formato incorrecto en línea: {linea}")
+                continue
+            if producto is not None:
+                yield producto
+
+
+def linea_de_producto(producto: Producto) -> str:
+    return f"{producto.get_id()}|{producto.get_nombre()}|{producto.get_cantidad()}|{producto.get_precio()}\n"
+
+
+def escribir_productos_texto(ruta: str, productos, antes_de_reemplazar=None):
+    """Escribe los productos en el formato de texto id|nombre|cantidad|precio (antes_de_reemplazar: ver escritura_atomica)"""
+    with escritura_atomica(ruta, 'w', antes_de_reemplazar) as f:
+        for producto in productos:
+            f.write(linea_de_producto(producto))
+
+
+def leer_log_cambios(ruta_log: str):
+    """
+    Lee el log de cambios del modo perezoso: genera (id, producto) por cada línea
+    '+id|nombre|cantidad|precio' y (id, None) por cada eliminación '-id'. Una última línea a
+    medias (escritura interrumpida) se descarta y se recorta del archivo.
+    """
+    if not os.path.exists(ruta_log):
+        return
+    validos = 0
+    with open(ruta_log, 'rb') as f:
+        for linea in f:
+            if not linea.endswith(b"\n"):
+                break
+            validos += len(linea)
+            texto = linea.decode('utf-8')
+            if texto.startswith('-'):
+                yield texto[1:-1], None
+                continue
+            try:
+                producto = producto_de_linea(texto[1:]) if texto.startswith('+') else None
+            except ValueError:
+                producto = None
+            if producto is None:
+                print(f"Advertencia: Formato incorrecto en el log de cambios: {texto}")
+                continue
+            yield producto.get_id(), producto
+    if validos < os.path.getsize(ruta_log):
+        with open(ruta_log, 'r+b') as f:
+            f.truncate(validos)
+
+
+def texto_a_binario(origen: str, destino: str):
+    """Convierte un inventario en formato de texto a instantánea binaria"""
+    escribir_snapshot_binario(destino, leer_productos_texto(origen))
+
+
+def binario_a_texto(origen: str, destino: str):
+    """Convierte una instantánea binaria al formato de texto"""
+    with SnapshotBinario(origen) as snapshot:
+        escribir_productos_texto(destino, snapshot)
+
+
+# Copia idéntica de la clase en semana11/SistemaAvanzadodeGestióndeInventario.py: cualquier cambio debe hacerse en las dos
+class IndiceTrigramas:
+    """Índice invertido de trigramas para acotar las búsquedas por subcadena en los nombres"""
+
+    def __init__(self):
+        # Trigrama -> conjunto de IDs cuyos nombres lo contienen
+        self._trigramas = {}
+
+    @staticmethod
+    def _trigramas_de(texto):
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    def agregar(self, id, nombre):
+        for trigrama in self._trigramas_de(nombre.lower()):
+            self._trigramas.setdefault(trigrama, set()).add(id)
+
+    def quitar(self, id, nombre):
+        for trigrama in self._trigramas_de(nombre.lower()):
+            ids = self._trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del self._trigramas[trigrama]
+
+    def candidatos(self, consulta):
+        """
+        Devuelve los IDs que pueden contener la consulta (superconjunto de las coincidencias),
+        o None si hay que recorrer todos los nombres: una consulta de menos de 3 letras no
+        tiene trigramas que intersectar y reunir los trigramas que la contienen es más lento
+        que el recorrido lineal. Los nombres de menos de 3 letras no tienen trigramas, pero
+        tampoco pueden contener una consulta más larga.
+        """
+        consulta = consulta.lower()
+        if len(consulta) < 3:
+            return None
+
+        # Intersectamos empezando por el trigrama menos frecuente
+        conjuntos = sorted((self._trigramas.get(t, set()) for t in self._trigramas_de(consulta)), key=len)
+        if not conjuntos[0]:
+            return set()
+        resto = conjuntos[1:]
+        return {id for id in conjuntos[0] if all(id in ids for ids in resto)}
+
+
+# Copia idéntica de la clase en semana11/SistemaAvanzadodeGestióndeInventario.py: cualquier cambio debe hacerse en las dos
+class CacheLRU:
+    """Caché de tamaño acotado que descarta el elemento usado hace más tiempo, con contadores de aciertos y fallos"""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.elementos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, cargar):
+        """Devuelve el valor en caché o lo lee con cargar(clave); los None no se guardan"""
+        try:
+            valor = self.elementos[clave]
+        except KeyError:
+            self.fallos += 1
+            valor = cargar(clave)
+            if valor is not None:
+                self.guardar(clave, valor)
+            return valor
+        self.aciertos += 1
+        self.elementos.move_to_end(clave)
+        return valor
+
+    def guardar(self, clave, valor):
+        if self.capacidad <= 0:
+            return
+        self.elementos[clave] = valor
+        self.elementos.move_to_end(clave)
+        if len(self.elementos) > self.capacidad:
+            self.elementos.popitem(last=False)
+
+    def descartar(self, clave):
+        self.elementos.pop(clave, None)
+
+    def limpiar(self):
+        self.elementos.clear()
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'en_cache': len(self.elementos),
+            'capacidad': self.capacidad,
+        }
+
+
+class AlmacenPerezoso(MutableMapping):
+    """
+    Diccionario de productos que lee cada producto del archivo solo cuando se pide.
+
+    La instantánea binaria ya está ordenada por ID y se consulta con búsqueda binaria sobre el
+    mmap, así que abrirla es inmediato. Para el formato de texto se recorre el archivo una vez
+    para construir el índice ID -> posición de la línea, sin crear ningún Producto.
+
+    Los productos leídos se guardan en una CacheLRU acotada. Los cambios hechos desde la
+    última reescritura se guardan aparte (None marca un producto eliminado) y cada uno se
+    añade con registrar() a un log de cambios (ruta + '.log'), que se reaplica al abrir. El
+    Inventario solo reescribe el archivo cuando se acumulan bastantes cambios; después vacía
+    el log y llama a reabrir().
+
+    Al guardar, el Inventario lee los productos de este mismo archivo mientras escribe el
+    nuevo y cierra el almacén justo antes de sustituirlo (en Windows un archivo abierto no se
+    puede reemplazar); si el guardado falla, reabrir(conservar_cambios=True) vuelve a abrir
+    el archivo anterior sin perder los cambios pendientes.
+    """
+
+    def __init__(self, ruta: str, capacidad_cache: int = 1024):
+        self.ruta = ruta
+        self.ruta_log = ruta + ".log"
+        self.cache = CacheLRU(capacidad_cache)
+        self._snapshot = None
+        self._texto = None
+        self._posiciones = None
+        self._total_base = 0
+        self._cambios = {}
+        self._nuevos = set()
+        self._diferencia = 0
+        self._lineas_log = 0
+
+    def reabrir(self, conservar_cambios: bool = False):
+        """
+        Vuelve a abrir el archivo tras reescribirlo y descarta los cambios ya guardados en él;
+        los del log de cambios se vuelven a aplicar. Con conservar_cambios=True mantiene los
+        cambios pendientes en memoria (el archivo no cambió).
+        """
+        self.cerrar()
+        if not conservar_cambios:
+            self._cambios = {}
+            self._nuevos = set()
+            self._diferencia = 0
+            self._lineas_log = 0
+        self._abrir_base()
+        if not conservar_cambios:
+            # Cada línea guarda el estado final del producto: reaplicarla sobre un archivo que ya la incluye no cambia nada
+            for id, producto in leer_log_cambios(self.ruta_log):
+                if producto is not None:
+                    self[id] = producto
+                elif id in self:
+                    del self[id]
+                self._lineas_log += 1
+
+    def _abrir_base(self):
+        if not os.path.exists(self.ruta):
+            return
+        if es_archivo_binario(self.ruta):
+            self._snapshot = SnapshotBinario(self.ruta)
+            self._total_base = len(self._snapshot)
+            return
+
+        # Índice de posiciones: si un ID se repite gana la última línea, como en la carga completa
+        self._posiciones = {}
+        self._texto = open(self.ruta, 'rb')
+        posicion = 0
+        for linea in self._texto:
+            try:
+                producto = producto_de_linea(linea.decode('utf-8'))
+            except ValueError:
+                print(f"Advertencia: Formato incorrecto en línea: {linea.decode('utf-8')}")
+                producto = None
+            if producto is not None:
+                self._posiciones[producto.get_id()] = posicion
+            posicion += len(linea)
+        self._total_base = len(self._posiciones)
+
+    def registrar(self, id: str):
+        """Añade al log el estado actual del producto (o su eliminación); si falla, deja el log como estaba"""
+        producto = self._cambios.get(id)
+        linea = f"-{id}\n" if producto is None else "+" + linea_de_producto(producto)
+        with open(self.ruta_log, 'ab') as f:
+            tamaño = f.tell()
+            try:
+                f.write(linea.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError:
+                f.truncate(tamaño)
+                raise
+        self._lineas_log += 1
+
+    def pendientes(self) -> int:
+        """Número de líneas del log de cambios, aún no incorporadas al archivo"""
+        return self._lineas_log
+
+    def vaciar_log(self):
+        """Vacía el log tras reescribir el archivo con todos sus cambios"""
+        try:
+            if os.path.exists(self.ruta_log):
+                with open(self.ruta_log, 'r+b') as f:
+                    f.truncate(0)
+        except OSError as e:
+            # No se pierde nada: reaplicar el log sobre el archivo nuevo no cambia el resultado
+            print(f"Advertencia: No se pudo vaciar el log de cambios: {e}")
+
+    def cerrar(self):
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
+        if self._texto is not None:
+            self._texto.close()
+            self._texto = None
+        self._posiciones = None
+        self._total_base = 0
+
+    def _leer_base(self, id: str):
+        """Lee un producto del archivo, o None si no está en él"""
+        if self._snapshot is not None:
+            return self._snapshot.buscar(id)
+        if self._posiciones is not None and id in self._posiciones:
+            self._texto.seek(self._posiciones[id])
+            return producto_de_linea(self._texto.readline().decode('utf-8'))
+        return None
+
+    def _en_base(self, id: str) -> bool:
+        if self._snapshot is not None:
+            return self._snapshot.buscar(id) is not None
+        return self._posiciones is not None and id in self._posiciones
+
+    def __getitem__(self, id: str) -> Producto:
+        if id in self._cambios:
+            producto = self._cambios[id]
+        else:
+            producto = self.cache.obtener(id, self._leer_base)
+        if producto is None:
+            raise KeyError(id)
+        return producto
+
+    def __contains__(self, id) -> bool:
+        if id in self._cambios:
+            return self._cambios[id] is not None
+        return self.cache.obtener(id, self._leer_base) is not None
+
+    def __setitem__(self, id: str, producto: Producto):
+        if id not in self:
+            self._diferencia += 1
+            if not self._en_base(id):
+                self._nuevos.add(id)
+        self._cambios[id] = producto
+        self.cache.guardar(id, producto)
+
+    def __delitem__(self, id: str):
+        if id not in self:
+            raise KeyError(id)
+        self._cambios[id] = None
+        self._diferencia -= 1
+        self.cache.descartar(id)
+
+    def __len__(self) -> int:
+        return self._total_base + self._diferencia
+
+    def __iter__(self):
+        return (producto.get_id() for producto in self.values())
+
+    def values(self):
+        """Recorre todos los productos leyendo el archivo en orden, sin pasar por la caché"""
+        yield from self._valores_base()
+        for id in self._nuevos:
+            if self._cambios[id] is not None:
+                yield self._cambios[id]
+
+    def valores_por_id(self):
+        """Como values(), pero en orden de ID; solo con una instantánea binaria (ya ordenada) como base"""
+        nuevos = sorted(id for id in self._nuevos if self._cambios[id] is not None)
+        return heapq.merge(self._valores_base(), (self._cambios[id] for id in nuevos), key=lambda p: p.get_id())
+
+    def _valores_base(self):
+        """Productos del archivo con los cambios aplicados, decodificados de uno en uno"""
+        if self._snapshot is not None:
+            base = self._snapshot.en_orden()
+        elif self._texto is not None:
+            base = self._recorrer_texto()
+        else:
+            base = iter(())
+        for producto in base:
+            id = producto.get_id()
+            if id in self._cambios:
+                producto = self._cambios[id]
+                if producto is None:
+                    continue
+            yield producto
+
+    def _recorrer_texto(self):
+        with open(self.ruta, 'rb') as f:
+            posicion = 0
+            for linea in f:
+                try:
+                    producto = producto_de_linea(linea.decode('utf-8'))
+                except ValueError:
+                    producto = None
+                # Solo la línea indexada de cada ID (la última si el ID se repite)
+                if producto is not None and self._posiciones.get(producto.get_id()) == posicion:
+                    yield producto
+                posicion += len(linea)
+
+
 class Inventario:
     """
     Clase que gestiona una colección de productos con persistencia en archivo.
@@ -73,35 +653,127 @@ class Inventario:
     Atributos:
         productos (dict): Diccionario de productos (ID como clave)
         archivo (str): Nombre del archivo para guardar/recuperar datos
+        indice_nombres (IndiceTrigramas): Índice de trigramas para búsquedas por nombre
+        compartido (bool): Si varios procesos comparten el archivo; cada operación toma un
+            bloqueo de archivo y recarga el inventario si otro proceso lo modificó
+        total_unidades (int): Suma de las cantidades, mantenida en cada cambio
+        valor_total (float): Suma de cantidad * precio, mantenida en cada cambio
+        precios_ordenados (list): Precios ordenados con bisect (mínimo y máximo en O(1))
+        perezoso (bool): Si los productos se leen del archivo bajo demanda (AlmacenPerezoso)
+            en lugar de cargarse todos al iniciar. En este modo no hay índice de nombres y
+            los agregados se calculan la primera vez que se pide resumen()
+        cambios_por_compactacion (int): En modo perezoso cada cambio se añade al log de
+            cambios (archivo + '.log') y el archivo solo se reescribe al llegar a este número
+            de líneas en el log
     """
 
-    def __init__(self, archivo='inventario.txt'):
-        self.productos = {}
+    def __init__(self, archivo='inventario.txt', compartido: bool = False, perezoso: bool = False,
+                 tamaño_cache: int = 1024, cambios_por_compactacion: int = 10000):
+        self.perezoso = perezoso
+        self.cambios_por_compactacion = cambios_por_compactacion
+        self.productos = AlmacenPerezoso(archivo, tamaño_cache) if perezoso else {}
+        self.indice_nombres = None if perezoso else IndiceTrigramas()
+        self.total_unidades = 0
+        self.valor_total = 0.0
+        self.precios_ordenados = []
+        self._resumen_valido = not perezoso
         self.archivo = archivo
-        self.cargar_desde_archivo()
+        self.compartido = compartido
+        self._sesiones = 0
+        self._firma = None
+        if compartido:
+            with self.sesion_compartida():
+                pass
+        else:
+            self.cargar_desde_archivo()
+
+    @contextmanager
+    def sesion_compartida(self):
+        """
+        En modo compartido, mantiene el bloqueo del archivo durante el bloque (por ejemplo, para
+        leer y actualizar un producto sin perder cambios de otros procesos) y antes recarga el
+        inventario si el archivo cambió. Fuera del modo compartido no hace nada.
+        """
+        if not self.compartido:
+            yield self
+            return
+
+        if self._sesiones:
+            self._sesiones += 1
+            try:
+                yield self
+            finally:
+                self._sesiones -= 1
+            return
+
+        with bloqueo_archivo(self.archivo):
+            self._sesiones = 1
+            try:
+                firma = self._firma_archivo()
+                if firma != self._firma:
+                    if self.perezoso:
+                        # Los productos en caché pueden estar desactualizados
+                        self.productos.cache.limpiar()
+                    else:
+                        self.productos = {}
+                        self.indice_nombres = IndiceTrigramas()
+                    self._recalcular_resumen()
+                    self.cargar_desde_archivo()
+                yield self
+            finally:
+                self._sesiones = 0
+                self._firma = self._firma_archivo()
+
+    def _firma_archivo(self):
+        """Identifica la versión del archivo y de su log de cambios (inodo, tamaño y fecha de modificación)"""
+        firma = []
+        for ruta in (self.archivo, self.archivo + ".log"):
+            try:
+                estado = os.stat(ruta)
+                firma.append((estado.st_ino, estado.st_size, estado.st_mtime_ns))
+            except FileNotFoundError:
+                firma.append(None)
+        return tuple(firma)
 
     def cargar_desde_archivo(self):
         """Carga los productos desde el archivo, manejando posibles excepciones"""
         try:
+            if self.perezoso:
+                # Solo se abre el archivo (y se indexan las posiciones si es de texto)
+                self.productos.reabrir()
+                self._recalcular_resumen()
+                if not os.path.exists(self.archivo):
+                    print(f"El archivo {self.archivo} no existe. Se creará uno nuevo al guardar.")
+                    return True
+                print(f"Inventario abierto desde {self.archivo} ({len(self.productos)} productos, lectura bajo demanda)")
+                return True
+
             # Verificar si el archivo existe
             if not os.path.exists(self.archivo):
+                self._aplicar_log_cambios()
                 print(f"El archivo {self.archivo} no existe. Se creará uno nuevo al guardar.")
                 return True
 
-            # Leer el archivo
-            with open(self.archivo, 'r') as f:
-                lineas = f.readlines()
-
-            # Procesar cada línea
-            for linea in lineas:
-                datos = linea.strip().split('|')
-                if len(datos) == 4:
-                    id, nombre, cantidad, precio = datos
-                    try:
-                        producto = Producto(id, nombre, int(cantidad), float(precio))
-                        self.productos[id] = producto
-                    except ValueError:
-                        print(f"Advertencia: Formato incorrecto en línea: {linea}")
+            # Leer el archivo (instantánea binaria o texto línea a línea)
+            if es_archivo_binario(self.archivo):
+                snapshot = SnapshotBinario(self.archivo)
+                productos = iter(snapshot)
+            else:
+                snapshot = None
+                productos = leer_productos_texto(self.archivo)
+
+            try:
+                for producto in productos:
+                    id = producto.get_id()
+                    if id in self.productos:
+                        self.indice_nombres.quitar(id, self.productos[id].get_nombre())
+                    self.productos[id] = producto
+                    self.indice_nombres.agregar(id, producto.get_nombre())
+            finally:
+                if snapshot is not None:
+                    productos.close()
+                    snapshot.cerrar()
+            self._aplicar_log_cambios()
 
             print(f"Inventario cargado exitosamente desde {self.archivo}")
             return True
@@ -117,25 +789,130 @@ class Inventario:
             print(traceback.format_exc())
             return False
 
+    def _aplicar_log_cambios(self):
+        """Aplica los cambios que un inventario perezoso dejó en el log sin incorporar al archivo"""
+        try:
+            for id, producto in leer_log_cambios(self.archivo + ".log"):
+                if id in self.productos:
+                    self.indice_nombres.quitar(id, self.productos.pop(id).get_nombre())
+                if producto is not None:
+                    self.productos[id] = producto
+                    self.indice_nombres.agregar(id, producto.get_nombre())
+        finally:
+            self._recalcular_resumen()
+
+    def _recalcular_resumen(self):
+        """Calcula los agregados recorriendo todos los productos (tras cargar el archivo)"""
+        if self.perezoso:
+            # Se calculan al pedir resumen() por primera vez, para que abrir el archivo sea inmediato
+            self._resumen_valido = False
+            return
+        self.total_unidades = sum(p.get_cantidad() for p in self.productos.values())
+        self.valor_total = math.fsum(p.get_cantidad() * p.get_precio() for p in self.productos.values())
+        self.precios_ordenados = sorted(p.get_precio() for p in self.productos.values())
+
+    def _sumar_al_resumen(self, cantidad: int, precio: float, signo: int):
+        """Suma (signo=1) o resta (signo=-1) un producto de los agregados"""
+        if not self._resumen_valido:
+            return
+        self.total_unidades += signo * cantidad
+        self.valor_total += signo * cantidad * precio
+        if signo > 0:
+            bisect.insort(self.precios_ordenados, precio)
+        else:
+            del self.precios_ordenados[bisect.bisect_left(self.precios_ordenados, precio)]
+
+    def resumen(self) -> dict:
+        """Devuelve los agregados del inventario sin recorrer los productos"""
+        if not self._resumen_valido:
+            self.total_unidades = 0
+            self.valor_total = 0.0
+            precios = []
+            sumandos = []
+            for producto in self.productos.values():
+                self.total_unidades += producto.get_cantidad()
+                sumandos.append(producto.get_cantidad() * producto.get_precio())
+                precios.append(producto.get_precio())
+            self.valor_total = math.fsum(sumandos)
+            self.precios_ordenados = sorted(precios)
+            self._resumen_valido = True
+        return {
+            'productos': len(self.productos),
+            'unidades': self.total_unidades,
+            'valor_total': self.valor_total,
+            'precio_minimo': self.precios_ordenados[0] if self.precios_ordenados else None,
+            'precio_maximo': self.precios_ordenados[-1] if self.precios_ordenados else None,
+        }
+
     def guardar_en_archivo(self):
         """Guarda los productos en el archivo, manejando posibles excepciones"""
+        # En modo perezoso los productos se leen del mismo archivo que se va a sustituir:
+        # el almacén se cierra después de escribirlos y antes del renombrado
+        mismo_archivo = self.perezoso and self.archivo == self.productos.ruta
+        cerrar = self.productos.cerrar if mismo_archivo else None
         try:
-            with open(self.archivo, 'w') as f:
-                for producto in self.productos.values():
-                    linea = f"{producto.get_id()}|{producto.get_nombre()}|{producto.get_cantidad()}|{producto.get_precio()}\n"
-                    f.write(linea)
+            if mismo_archivo and es_archivo_binario(self.archivo):
+                # La base ya está ordenada por ID: se mezcla con los nuevos sin cargarla en memoria
+                escribir_snapshot_binario(self.archivo, self.productos.valores_por_id(), cerrar, ordenados=True)
+            elif es_archivo_binario(self.archivo):
+                escribir_snapshot_binario(self.archivo, self.productos.values(), cerrar)
+            else:
+                escribir_productos_texto(self.archivo, self.productos.values(), cerrar)
+            # Los cambios ya están en el archivo: el log de cambios sobra
+            if self.perezoso:
+                self.productos.vaciar_log()
+            elif os.path.exists(self.archivo + ".log"):
+                os.remove(self.archivo + ".log")
+            if mismo_archivo:
+                # Volvemos a leer el archivo desde disco
+                self.productos.reabrir()
 
             print(f"Inventario guardado exitosamente en {self.archivo}")
             return True
 
         except PermissionError:
+            self._reabrir_tras_fallo(mismo_archivo)
             print(f"Error: No tiene permisos para escribir en el archivo {self.archivo}.")
             return False
         except Exception as e:
+            self._reabrir_tras_fallo(mismo_archivo)
             print(f"Error inesperado al guardar el inventario: {str(e)}")
             print(traceback.format_exc())
             return False
 
+    def _guardar_cambio(self, id: str) -> bool:
+        """
+        Guarda el cambio de un producto. En modo perezoso se añade al log de cambios y el
+        archivo solo se reescribe cuando el log llega a cambios_por_compactacion líneas;
+        en otro caso se reescribe el archivo completo.
+        """
+        if not self.perezoso or self.archivo != self.productos.ruta:
+            return self.guardar_en_archivo()
+        try:
+            self.productos.registrar(id)
+        except OSError as e:
+            print(f"Error al guardar el cambio en {self.productos.ruta_log}: {e}")
+            return False
+        if self.productos.pendientes() >= self.cambios_por_compactacion:
+            # El cambio ya está en el log: si la reescritura falla se reintenta con el siguiente
+            self.guardar_en_archivo()
+        return True
+
+    def _reabrir_tras_fallo(self, mismo_archivo: bool):
+        """Si el guardado falló con el almacén perezoso ya cerrado, lo abre de nuevo sobre el archivo anterior"""
+        if mismo_archivo:
+            self.productos.reabrir(conservar_cambios=True)
+
+    def _indexar(self, id: str, nombre: str, signo: int):
+        """Añade (signo=1) o quita (signo=-1) un nombre del índice; en modo perezoso no hay índice"""
+        if self.indice_nombres is None:
+            return
+        if signo > 0:
+            self.indice_nombres.agregar(id, nombre)
+        else:
+            self.indice_nombres.quitar(id, nombre)
+
+    @en_sesion_compartida
     def añadir_producto(self, producto: Producto) -> bool:
         """Añade un nuevo producto verificando ID único y guarda en archivo"""
         if producto.get_id() in self.productos:
@@ -143,17 +920,22 @@ class Inventario:
             return False
 
         self.productos[producto.get_id()] = producto
+        self._indexar(producto.get_id(), producto.get_nombre(), 1)
+        self._sumar_al_resumen(producto.get_cantidad(), producto.get_precio(), 1)
 
         # Guardar en archivo
-        if self.guardar_en_archivo():
+        if self._guardar_cambio(producto.get_id()):
             print("\nProducto añadido exitosamente")
             return True
         else:
             # Revertir cambios si falla la escritura
             del self.productos[producto.get_id()]
+            self._indexar(producto.get_id(), producto.get_nombre(), -1)
+            self._sumar_al_resumen(producto.get_cantidad(), producto.get_precio(), -1)
             print("\nError: No se pudo guardar el producto en el archivo")
             return False
 
+    @en_sesion_compartida
     def eliminar_producto(self, id: str) -> bool:
         """Elimina un producto por ID y guarda en archivo"""
         if id not in self.productos:
@@ -162,17 +944,22 @@ class Inventario:
 
         producto_eliminado = self.productos[id]
         del self.productos[id]
+        self._indexar(id, producto_eliminado.get_nombre(), -1)
+        self._sumar_al_resumen(producto_eliminado.get_cantidad(), producto_eliminado.get_precio(), -1)
 
         # Guardar en archivo
-        if self.guardar_en_archivo():
+        if self._guardar_cambio(id):
             print("\nProducto eliminado exitosamente")
             return True
         else:
             # Revertir cambios si falla la escritura
             self.productos[id] = producto_eliminado
+            self._indexar(id, producto_eliminado.get_nombre(), 1)
+            self._sumar_al_resumen(producto_eliminado.get_cantidad(), producto_eliminado.get_precio(), 1)
             print("\nError: No se pudo eliminar el producto del archivo")
             return False
 
+    @en_sesion_compartida
     def actualizar_producto(self, id: str, cantidad: int = None, precio: float = None) -> bool:
         """Actualiza cantidad y/o precio de un producto y guarda en archivo"""
         if id not in self.productos:
@@ -188,27 +975,44 @@ class Inventario:
             producto.set_cantidad(cantidad)
         if precio is not None:
             producto.set_precio(precio)
+        # En modo perezoso la asignación registra el cambio para la próxima escritura
+        self.productos[id] = producto
+        self._sumar_al_resumen(cantidad_anterior, precio_anterior, -1)
+        self._sumar_al_resumen(producto.get_cantidad(), producto.get_precio(), 1)
 
         # Guardar en archivo
-        if self.guardar_en_archivo():
+        if self._guardar_cambio(id):
             print("\nProducto actualizado exitosamente")
             return True
         else:
             # Revertir cambios si falla la escritura
+            self._sumar_al_resumen(producto.get_cantidad(), producto.get_precio(), -1)
+            self._sumar_al_resumen(cantidad_anterior, precio_anterior, 1)
             producto.set_cantidad(cantidad_anterior)
             producto.set_precio(precio_anterior)
             print("\nError: No se pudo actualizar el producto en el archivo")
             return False
 
+    @en_sesion_compartida
     def buscar_por_nombre(self, nombre: str) -> list:
-        """Busca productos por coincidencia parcial en el nombre (case-insensitive)"""
+        """Busca productos por coincidencia parcial en el nombre (case-insensitive), en orden de ID"""
         resultados = []
         nombre = nombre.lower()
-        for producto in self.productos.values():
+        # El índice de trigramas acota los candidatos; el `in` confirma la coincidencia
+        candidatos = self.indice_nombres.candidatos(nombre) if self.indice_nombres is not None else None
+        if candidatos is None:
+            productos = self.productos.values()
+        else:
+            productos = (self.productos[id] for id in sorted(candidatos))
+        for producto in productos:
             if nombre in producto.get_nombre().lower():
                 resultados.append(producto)
+        if candidatos is None:
+            # El recorrido completo sigue el orden del diccionario (o del archivo en modo perezoso)
+            resultados.sort(key=Producto.get_id)
         return resultados
 
+    @en_sesion_compartida
     def mostrar_productos(self):
         """Muestra todos los productos en formato de tabla"""
         if not self.productos:
@@ -1,3 +1,96 @@
+import bisect
+import heapq
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+_PALABRAS = re.compile(r'\w+')
+# Sustituto de los candados cuando la biblioteca no es concurrente
+_SIN_CANDADO = nullcontext()
+
+
+def normalizar(texto):
+    """Pasa el texto a minúsculas y le quita tildes y diéresis (la ñ se compara como n)"""
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def palabras(texto):
+    return set(_PALABRAS.findall(normalizar(texto)))
+
+
+class IndiceTexto:
+    """
+    Índice invertido de un campo de los libros: palabra normalizada -> ISBNs. El vocabulario
+    se mantiene ordenado con bisect para buscar por el principio de las palabras; las búsquedas
+    por subcadena recorren el vocabulario, mucho más pequeño que el catálogo.
+    """
+
+    def __init__(self):
+        self.isbns = {}
+        self.vocabulario = []
+
+    def agregar(self, isbn, texto):
+        for palabra in palabras(texto):
+            if palabra not in self.isbns:
+                self.isbns[palabra] = set()
+                bisect.insort(self.vocabulario, palabra)
+            self.isbns[palabra].add(isbn)
+
+    def quitar(self, isbn, texto):
+        for palabra in palabras(texto):
+            isbns = self.isbns.get(palabra)
+            if isbns is None:
+                continue
+            isbns.discard(isbn)
+            if not isbns:
+                del self.isbns[palabra]
+                del self.vocabulario[bisect.bisect_left(self.vocabulario, palabra)]
+
+    def candidatos(self, texto):
+        """
+        Devuelve los ISBNs cuyo campo tiene, para cada palabra del texto, alguna palabra que la
+        contiene, o None si el texto no tiene palabras y no restringe la búsqueda. Incluye
+        todos los campos que contienen el texto como subcadena ("arcía" encuentra "García");
+        si el texto tiene más de una palabra, hay que comprobar después el campo completo.
+        """
+        return self._intersectar(texto, lambda consulta: (palabra for palabra in self.vocabulario
+                                                          if consulta in palabra))
+
+    def buscar_prefijo(self, texto):
+        """
+        Devuelve los ISBNs cuyo campo tiene, para cada palabra del texto, alguna palabra que
+        empieza por ella ("garc marq" encuentra "García Márquez"), o None si el texto no tiene
+        palabras y no restringe la búsqueda.
+        """
+        return self._intersectar(texto, self._con_prefijo)
+
+    def _con_prefijo(self, consulta):
+        i = bisect.bisect_left(self.vocabulario, consulta)
+        while i < len(self.vocabulario) and self.vocabulario[i].startswith(consulta):
+            yield self.vocabulario[i]
+            i += 1
+
+    def _intersectar(self, texto, coinciden):
+        """Intersecta, para cada palabra del texto, los ISBNs de las palabras del vocabulario que coinciden con ella"""
+        resultado = None
+        # Empezamos por las palabras más largas, que suelen dar menos coincidencias
+        for consulta in sorted(palabras(texto), key=len, reverse=True):
+            coincidencias = set()
+            for palabra in coinciden(consulta):
+                coincidencias.update(self.isbns[palabra])
+            resultado = coincidencias if resultado is None else resultado & coincidencias
+            if not resultado:
+                return set()
+        return resultado
+
+
 class Libro:
     def __init__(self, titulo, autor, categoria, isbn):
         # Usamos tuplas para almacenar autor y título (inmutables)
@@ -9,19 +102,75 @@ class Libro:
         return f"'{self.datos[1]}' por {self.datos[0]} - {self.categoria} ({self.isbn})"
 
 
+class LibrosPrestados:
+    """
+    Libros prestados a un usuario indexados por ISBN. Se recorre como una lista de libros
+    (en el orden en que se prestaron), pero buscar y quitar un libro por ISBN es O(1).
+    """
+
+    def __init__(self):
+        # Diccionario ISBN -> libro (conserva el orden de inserción)
+        self._libros = {}
+
+    def agregar(self, libro):
+        self._libros[libro.isbn] = libro
+
+    def quitar(self, isbn):
+        """Quita y devuelve el libro con ese ISBN"""
+        return self._libros.pop(isbn)
+
+    def __getitem__(self, isbn):
+        return self._libros[isbn]
+
+    def __contains__(self, isbn):
+        return isbn in self._libros
+
+    def __iter__(self):
+        return iter(self._libros.values())
+
+    def __len__(self):
+        return len(self._libros)
+
+    def __repr__(self):
+        return f"LibrosPrestados({list(self._libros.values())!r})"
+
+
 class Usuario:
     def __init__(self, nombre, id_usuario):
         self.nombre = nombre
         self.id_usuario = id_usuario
-        # Lista para libros prestados al usuario
-        self.libros_prestados = []
+        # Libros prestados al usuario, indexados por ISBN
+        self.libros_prestados = LibrosPrestados()
 
     def __str__(self):
         return f"{self.nombre} (ID: {self.id_usuario})"
 
 
 class Biblioteca:
-    def __init__(self):
+    """
+    Con archivo=None la biblioteca solo vive en memoria. Con un archivo, el estado se guarda
+    como una instantánea completa (el archivo JSON) más un registro de eventos numerados
+    (archivo + ".log") al que cada operación añade una línea: un préstamo o una devolución
+    solo escriben esa línea. Cada eventos_por_instantanea eventos se escribe una instantánea
+    nueva y se vacía el registro, así que al arrancar solo se reaplica la cola de eventos.
+
+    Con concurrente=True se puede usar desde varios hilos. En lugar de un candado global hay
+    `franjas` candados para los ISBN y otros tantos para los usuarios (cada ISBN o usuario usa
+    el de su franja): dos préstamos de libros y usuarios distintos casi nunca se esperan. Los
+    cambios del catálogo y las búsquedas comparten además el candado de los índices.
+
+    Con mensajes=False no se imprime nada; el resultado de cada operación es su valor de
+    retorno (True si se hizo, False si no).
+
+    Cada préstamo guarda su fecha y su fecha de devolución (dias_prestamo días después, salvo
+    que se indique otra cosa). Los vencimientos se guardan en un montículo ordenado por fecha,
+    así vencidos() y recordatorios() solo recorren los préstamos ya vencidos.
+    """
+
+    def __init__(self, archivo=None, eventos_por_instantanea=10000, concurrente=False, franjas=64, mensajes=True,
+                 dias_prestamo=14):
+        # Diccionario con todos los libros, disponibles o prestados (ISBN como clave)
+        self.catalogo = {}
         # Diccionario para libros disponibles (ISBN como clave)
         self.libros_disponibles = {}
         # Conjunto para IDs de usuarios únicos
@@ -30,108 +179,488 @@ class Biblioteca:
         self.usuarios = {}
         # Diccionario para registrar préstamos (ISBN: ID usuario)
         self.prestamos_activos = {}
+        # Fechas de cada préstamo (ISBN: (prestado, vence, número del préstamo))
+        self._fechas = {}
+        # Montículo de (vence, número, ISBN). Al devolver un libro su entrada no se saca (costaría
+        # O(N)): queda obsoleta, se salta al recorrerlo y se limpia cuando hay demasiadas
+        self._vencimientos = []
+        self._obsoletos = 0
+        self._numeros_prestamo = itertools.count()
+        self.dias_prestamo = dias_prestamo
+        # Índices de palabras por campo para las búsquedas (cubren todo el catálogo)
+        self.indices = {criterio: IndiceTexto() for criterio in ('titulo', 'autor', 'categoria')}
+        self.mensajes = mensajes
+        # Candados del modo concurrente (sin concurrencia no bloquean nada)
+        self._candados_isbn = [threading.Lock() for _ in range(franjas)] if concurrente else None
+        self._candados_usuario = [threading.Lock() for _ in range(franjas)] if concurrente else None
+        self._candado_catalogo = threading.Lock() if concurrente else _SIN_CANDADO
+        # El montículo de vencimientos es común a todas las franjas
+        self._candado_vencimientos = threading.Lock() if concurrente else _SIN_CANDADO
+        # Con archivo, el registro y la secuencia de eventos son compartidos por todos los hilos
+        self._candado_registro = threading.Lock() if concurrente and archivo is not None else _SIN_CANDADO
+        # Persistencia: número del último evento aplicado y registro abierto para añadir eventos
+        self.archivo = archivo
+        self.eventos_por_instantanea = eventos_por_instantanea
+        self.secuencia = 0
+        self._eventos_en_registro = 0
+        self._registro = None
+        if archivo is not None:
+            self._cargar()
+
+    @staticmethod
+    def _campos(libro):
+        return {'titulo': libro.datos[1], 'autor': libro.datos[0], 'categoria': libro.categoria}
+
+    def _indexar(self, libro):
+        for criterio, texto in self._campos(libro).items():
+            self.indices[criterio].agregar(libro.isbn, texto)
+
+    def _desindexar(self, libro):
+        for criterio, texto in self._campos(libro).items():
+            self.indices[criterio].quitar(libro.isbn, texto)
+
+    def _aplicar(self, evento, objeto=None):
+        """
+        Aplica un evento al estado en memoria, sin validar ni registrar. objeto es el Libro o
+        Usuario original cuando no viene de la instantánea o del registro.
+        """
+        op = evento['op']
+        if op == 'libro':
+            libro = objeto if objeto is not None else Libro(evento['titulo'], evento['autor'], evento['categoria'],
+                                                            evento['isbn'])
+            if libro.isbn in self.catalogo:
+                # Sustituye al libro disponible con el mismo ISBN
+                self._desindexar(self.catalogo[libro.isbn])
+            self.catalogo[libro.isbn] = libro
+            self.libros_disponibles[libro.isbn] = libro
+            self._indexar(libro)
+            return libro
+        if op == 'quitar_libro':
+            libro = self.libros_disponibles.pop(evento['isbn'])
+            del self.catalogo[evento['isbn']]
+            self._desindexar(libro)
+            return libro
+        if op == 'usuario':
+            usuario = objeto if objeto is not None else Usuario(evento['nombre'], evento['id'])
+            self.usuarios_registrados.add(usuario.id_usuario)
+            self.usuarios[usuario.id_usuario] = usuario
+            return usuario
+        if op == 'baja_usuario':
+            self.usuarios_registrados.remove(evento['id'])
+            return self.usuarios.pop(evento['id'])
+        if op == 'prestar':
+            libro = self.libros_disponibles.pop(evento['isbn'])
+            self.usuarios[evento['usuario']].libros_prestados.agregar(libro)
+            self.prestamos_activos[evento['isbn']] = evento['usuario']
+            # Los préstamos registrados antes de que hubiera fechas no tienen vencimiento
+            if 'vence' in evento:
+                self._agregar_vencimiento(evento['isbn'], datetime.fromisoformat(evento['prestado']),
+                                          datetime.fromisoformat(evento['vence']))
+            return libro
+        if op == 'devolver':
+            id_usuario = self.prestamos_activos.pop(evento['isbn'])
+            self._quitar_vencimiento(evento['isbn'])
+            libro = self.usuarios[id_usuario].libros_prestados.quitar(evento['isbn'])
+            self.libros_disponibles[evento['isbn']] = libro
+            return libro
+        raise ValueError(f"Evento desconocido: {op}")
+
+    def _agregar_vencimiento(self, isbn, prestado, vence):
+        with self._candado_vencimientos:
+            numero = next(self._numeros_prestamo)
+            self._fechas[isbn] = (prestado, vence, numero)
+            heapq.heappush(self._vencimientos, (vence, numero, isbn))
+
+    def _quitar_vencimiento(self, isbn):
+        with self._candado_vencimientos:
+            if self._fechas.pop(isbn, None) is None:
+                return
+            self._obsoletos += 1
+            # Con más de la mitad de entradas obsoletas se rehace el montículo: O(N) cada N/2
+            # devoluciones, O(1) amortizado por devolución
+            if self._obsoletos > len(self._vencimientos) // 2:
+                self._vencimientos = [entrada for entrada in self._vencimientos if self._vigente(entrada)]
+                heapq.heapify(self._vencimientos)
+                self._obsoletos = 0
+
+    def _vigente(self, entrada):
+        """Una entrada del montículo es vigente si el libro sigue prestado en ese mismo préstamo"""
+        fechas = self._fechas.get(entrada[2])
+        return fechas is not None and fechas[2] == entrada[1]
+
+    def _cargar(self):
+        """Carga la última instantánea y reaplica los eventos posteriores del registro"""
+        if os.path.exists(self.archivo):
+            with open(self.archivo, encoding='utf-8') as f:
+                instantanea = json.load(f)
+            for libro in instantanea['libros']:
+                self._aplicar({'op': 'libro', **libro})
+            for usuario in instantanea['usuarios']:
+                self._aplicar({'op': 'usuario', **usuario})
+            # Los préstamos se guardan en el orden en que se hicieron
+            for prestamo in instantanea['prestamos']:
+                self._aplicar({'op': 'prestar', **prestamo})
+            self.secuencia = instantanea['secuencia']
+
+        ruta_registro = self.archivo + ".log"
+        validos = 0
+        if os.path.exists(ruta_registro):
+            with open(ruta_registro, 'rb') as f:
+                for linea in f:
+                    if not linea.endswith(b"\n"):
+                        # Última línea a medias de una escritura interrumpida: se descarta
+                        break
+                    validos += len(linea)
+                    try:
+                        evento = json.loads(linea)
+                    except ValueError:
+                        # Una línea dañada no invalida los eventos que la siguen
+                        continue
+                    # Los eventos ya incluidos en la instantánea se saltan
+                    if evento['n'] > self.secuencia:
+                        self._aplicar(evento)
+                        self.secuencia = evento['n']
+                        self._eventos_en_registro += 1
+        self._registro = open(ruta_registro, 'ab')
+        self._registro.truncate(validos)
+
+    def _registrar(self, evento):
+        """Añade el evento al registro antes de aplicarlo; sin archivo no hace nada"""
+        if self._registro is None:
+            return True
+        if self._registro.closed:
+            print("Error: El registro de operaciones no está disponible")
+            return False
+        evento['n'] = self.secuencia + 1
+        tamaño = self._registro.tell()
+        try:
+            self._registro.write(json.dumps(evento, ensure_ascii=False).encode('utf-8') + b"\n")
+            self._registro.flush()
+            os.fsync(self._registro.fileno())
+        except OSError as e:
+            print(f"Error al guardar la operación: {e}")
+            # Lo que llegara a escribirse se recorta: si no, al cargar se aplicaría este evento
+            # rechazado y el siguiente, con el mismo número, se saltaría
+            self._recortar_registro(tamaño)
+            return False
+        self.secuencia += 1
+        self._eventos_en_registro += 1
+        return True
+
+    def _recortar_registro(self, tamaño):
+        try:
+            self._registro.truncate(tamaño)
+            self._registro.flush()
+            os.fsync(self._registro.fileno())
+        except OSError as e:
+            # Sin poder recortarlo, el registro ya no es fiable: no se aceptan más operaciones
+            print(f"Error al recortar el registro: {e}")
+            self._registro.close()
+
+    def _ejecutar(self, evento, objeto=None):
+        """Registra el evento y lo aplica. Devuelve lo que devuelve _aplicar, o None si no se pudo registrar"""
+        # Registrar y aplicar van juntos: el orden del registro es el orden en que se aplicaron
+        # los eventos, y la instantánea nunca ve un evento registrado pero aún sin aplicar
+        with self._candado_registro:
+            if not self._registrar(evento):
+                return None
+            resultado = self._aplicar(evento, objeto)
+            # La instantánea se escribe con el evento ya aplicado
+            if self._registro is not None and self._eventos_en_registro >= self.eventos_por_instantanea:
+                self._escribir_instantanea()
+            return resultado
+
+    def guardar_instantanea(self):
+        """Escribe el estado completo y vacía el registro de eventos"""
+        if self.archivo is None:
+            return False
+        with self._candado_registro:
+            if self._registro is None or self._registro.closed:
+                print("Error: El registro de operaciones no está disponible")
+                return False
+            return self._escribir_instantanea()
+
+    def _escribir_instantanea(self):
+        instantanea = {
+            'secuencia': self.secuencia,
+            'libros': [{'isbn': libro.isbn, 'titulo': libro.datos[1], 'autor': libro.datos[0],
+                        'categoria': libro.categoria} for libro in self.catalogo.values()],
+            'usuarios': [{'id': usuario.id_usuario, 'nombre': usuario.nombre} for usuario in self.usuarios.values()],
+            'prestamos': [self._prestamo_guardado(isbn, id_usuario) for isbn, id_usuario in self.prestamos_activos.items()],
+        }
+        directorio = os.path.dirname(os.path.abspath(self.archivo))
+        temporal = None
+        try:
+            # Archivo temporal + renombrado: una caída a mitad nunca deja la instantánea truncada
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directorio, delete=False) as f:
+                temporal = f.name
+                json.dump(instantanea, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.archivo)
+            temporal = None
+            # Si fallamos aquí, los eventos que quedan en el registro ya están en la instantánea
+            # y se saltan por su número al cargar
+            self._registro.truncate(0)
+            os.fsync(self._registro.fileno())
+        except OSError as e:
+            print(f"Error al guardar la instantánea: {e}")
+            return False
+        finally:
+            # Si no llegó a renombrarse, el temporal no debe quedarse en el directorio
+            if temporal is not None and os.path.exists(temporal):
+                os.remove(temporal)
+        self._eventos_en_registro = 0
+        return True
+
+    def _prestamo_guardado(self, isbn, id_usuario):
+        prestamo = {'isbn': isbn, 'usuario': id_usuario}
+        if isbn in self._fechas:
+            prestado, vence, _ = self._fechas[isbn]
+            prestamo.update(prestado=prestado.isoformat(), vence=vence.isoformat())
+        return prestamo
+
+    def cerrar(self):
+        """Cierra el registro de eventos"""
+        if self._registro is not None:
+            self._registro.close()
+            self._registro = None
+
+    def _informar(self, mensaje):
+        if self.mensajes:
+            print(mensaje)
+
+    def _candado_isbn(self, isbn):
+        if self._candados_isbn is None:
+            return _SIN_CANDADO
+        return self._candados_isbn[hash(isbn) % len(self._candados_isbn)]
+
+    def _candado_usuario(self, id_usuario):
+        if self._candados_usuario is None:
+            return _SIN_CANDADO
+        return self._candados_usuario[hash(id_usuario) % len(self._candados_usuario)]
 
     def añadir_libro(self, libro):
         """Añade un libro a la colección disponible"""
-        self.libros_disponibles[libro.isbn] = libro
-        print(f"Libro añadido: {libro}")
+        with self._candado_isbn(libro.isbn), self._candado_catalogo:
+            if libro.isbn in self.prestamos_activos:
+                self._informar("Error: Ya hay un libro prestado con ese ISBN")
+                return False
+            evento = {'op': 'libro', 'isbn': libro.isbn, 'titulo': libro.datos[1], 'autor': libro.datos[0],
+                      'categoria': libro.categoria}
+            if self._ejecutar(evento, libro) is None:
+                return False
+        self._informar(f"Libro añadido: {libro}")
+        return True
 
     def quitar_libro(self, isbn):
         """Elimina un libro de la colección disponible"""
-        if isbn in self.libros_disponibles:
-            libro = self.libros_disponibles.pop(isbn)
-            print(f"Libro removido: {libro}")
-        else:
-            print("ISBN no encontrado en la colección")
+        with self._candado_isbn(isbn), self._candado_catalogo:
+            if isbn not in self.libros_disponibles:
+                self._informar("ISBN no encontrado en la colección")
+                return False
+            libro = self._ejecutar({'op': 'quitar_libro', 'isbn': isbn})
+            if libro is None:
+                return False
+        self._informar(f"Libro removido: {libro}")
+        return True
 
     def registrar_usuario(self, usuario):
         """Registra un nuevo usuario en el sistema"""
-        if usuario.id_usuario not in self.usuarios_registrados:
-            self.usuarios_registrados.add(usuario.id_usuario)
-            self.usuarios[usuario.id_usuario] = usuario
-            print(f"Usuario registrado: {usuario}")
-        else:
-            print("Error: ID de usuario ya existe")
+        with self._candado_usuario(usuario.id_usuario):
+            if usuario.id_usuario in self.usuarios_registrados:
+                self._informar("Error: ID de usuario ya existe")
+                return False
+            evento = {'op': 'usuario', 'id': usuario.id_usuario, 'nombre': usuario.nombre}
+            if self._ejecutar(evento, usuario) is None:
+                return False
+        self._informar(f"Usuario registrado: {usuario}")
+        return True
 
     def dar_baja_usuario(self, id_usuario):
         """Elimina un usuario del sistema"""
-        if id_usuario in self.usuarios_registrados:
+        with self._candado_usuario(id_usuario):
+            if id_usuario not in self.usuarios_registrados:
+                self._informar("Error: Usuario no registrado")
+                return False
             # Verificar que no tenga libros prestados
-            if not self.usuarios[id_usuario].libros_prestados:
-                self.usuarios_registrados.remove(id_usuario)
-                del self.usuarios[id_usuario]
-                print(f"Usuario {id_usuario} eliminado")
-            else:
-                print("Error: Usuario tiene libros prestados")
-        else:
-            print("Error: Usuario no registrado")
-
-    def prestar_libro(self, isbn, id_usuario):
-        """Gestiona el préstamo de un libro a un usuario"""
-        if isbn not in self.libros_disponibles:
-            print("Error: Libro no disponible")
-            return
-
-        if id_usuario not in self.usuarios_registrados:
-            print("Error: Usuario no registrado")
-            return
-
-        libro = self.libros_disponibles[isbn]
-        usuario = self.usuarios[id_usuario]
-
-        # Registrar préstamo
-        usuario.libros_prestados.append(libro)
-        self.prestamos_activos[isbn] = id_usuario
-        del self.libros_disponibles[isbn]
-
-        print(f"Libro prestado: {libro} a {usuario}")
+            if self.usuarios[id_usuario].libros_prestados:
+                self._informar("Error: Usuario tiene libros prestados")
+                return False
+            if self._ejecutar({'op': 'baja_usuario', 'id': id_usuario}) is None:
+                return False
+        self._informar(f"Usuario {id_usuario} eliminado")
+        return True
+
+    def prestar_libro(self, isbn, id_usuario, ahora=None, dias=None):
+        """
+        Gestiona el préstamo de un libro a un usuario. El préstamo empieza en `ahora` (por
+        defecto, la fecha y hora actuales) y vence `dias` días después (por defecto, dias_prestamo).
+        """
+        prestado = ahora if ahora is not None else datetime.now()
+        vence = prestado + timedelta(days=dias if dias is not None else self.dias_prestamo)
+        # Siempre se bloquea primero el ISBN y después el usuario, así dos hilos nunca se esperan mutuamente
+        with self._candado_isbn(isbn), self._candado_usuario(id_usuario):
+            if isbn not in self.libros_disponibles:
+                self._informar("Error: Libro no disponible")
+                return False
+
+            if id_usuario not in self.usuarios_registrados:
+                self._informar("Error: Usuario no registrado")
+                return False
+
+            # Registrar préstamo
+            libro = self._ejecutar({'op': 'prestar', 'isbn': isbn, 'usuario': id_usuario,
+                                    'prestado': prestado.isoformat(), 'vence': vence.isoformat()})
+            if libro is None:
+                return False
+            usuario = self.usuarios[id_usuario]
+        self._informar(f"Libro prestado: {libro} a {usuario}")
+        return True
 
     def devolver_libro(self, isbn):
         """Gestiona la devolución de un libro"""
-        if isbn not in self.prestamos_activos:
-            print("Error: Este libro no está prestado")
-            return
-
-        id_usuario = self.prestamos_activos[isbn]
-        usuario = self.usuarios[id_usuario]
-        libro = next(lib for lib in usuario.libros_prestados if lib.isbn == isbn)
-
-        # Remover de préstamos activos
-        usuario.libros_prestados.remove(libro)
-        self.libros_disponibles[isbn] = libro
-        del self.prestamos_activos[isbn]
-
-        print(f"Libro devuelto: {libro} por {usuario}")
+        with self._candado_isbn(isbn):
+            # Con el ISBN bloqueado nadie más puede cambiar a quién está prestado el libro
+            id_usuario = self.prestamos_activos.get(isbn)
+            if id_usuario is None:
+                self._informar("Error: Este libro no está prestado")
+                return False
+
+            with self._candado_usuario(id_usuario):
+                usuario = self.usuarios[id_usuario]
+                libro = self._ejecutar({'op': 'devolver', 'isbn': isbn})
+                if libro is None:
+                    return False
+        self._informar(f"Libro devuelto: {libro} por {usuario}")
+        return True
+
+    def buscar(self, **criterios):
+        """
+        Busca los libros que cumplen todos los criterios a la vez, por ejemplo
+        buscar(titulo="cien", autor="garcia"). Cada valor tiene que aparecer dentro del campo,
+        sin distinguir mayúsculas ni tildes.
+
+        Devuelve una lista de (libro, disponible) ordenada por ISBN, con los libros
+        disponibles y los prestados.
+        """
+        with self._candado_catalogo:
+            return [(self.catalogo[isbn], isbn in self.libros_disponibles) for isbn in self._buscar_isbns(criterios)]
+
+    def buscar_por_prefijo(self, **criterios):
+        """
+        Como buscar(), pero cada palabra buscada tiene que ser el principio de alguna palabra
+        del campo: buscar_por_prefijo(autor="garc marq") encuentra "García Márquez", y "arcía"
+        ya no encuentra nada.
+        """
+        with self._candado_catalogo:
+            return [(self.catalogo[isbn], isbn in self.libros_disponibles)
+                    for isbn in self._buscar_isbns(criterios, prefijo=True)]
 
     def buscar_libros(self, criterio, valor):
-        """Busca libros por título, autor o categoría"""
-        resultados = []
-        # Buscar en libros disponibles
-        for libro in self.libros_disponibles.values():
-            if (criterio == 'titulo' and valor.lower() in libro.datos[1].lower() or
-                    criterio == 'autor' and valor.lower() in libro.datos[0].lower() or
-                    criterio == 'categoria' and valor.lower() in libro.categoria.lower()):
-                resultados.append(libro)
-
-        # Buscar en libros prestados
-        for isbn, id_usuario in self.prestamos_activos.items():
-            libro = self.usuarios[id_usuario].libros_prestados[
-                next(i for i, lib in enumerate(self.usuarios[id_usuario].libros_prestados)
-                     if lib.isbn == isbn)
-            ]
-            if (criterio == 'titulo' and valor.lower() in libro.datos[1].lower() or
-                    criterio == 'autor' and valor.lower() in libro.datos[0].lower() or
-                    criterio == 'categoria' and valor.lower() in libro.categoria.lower()):
-                resultados.append(libro)
-
-        return resultados
+        """Busca libros por título, autor o categoría (el valor puede estar en cualquier parte del campo)"""
+        with self._candado_catalogo:
+            return [self.catalogo[isbn] for isbn in self._buscar_isbns({criterio: valor})]
+
+    def _buscar_isbns(self, criterios, prefijo=False):
+        """Devuelve ordenados los ISBNs de los libros que cumplen todos los criterios"""
+        conjuntos = []
+        # Criterios de subcadena que hay que comprobar sobre el campo completo
+        comprobar = []
+        for criterio, valor in criterios.items():
+            if criterio not in self.indices:
+                self._informar(f"Error: Criterio de búsqueda no válido: {criterio}")
+                return []
+            if prefijo:
+                isbns = self.indices[criterio].buscar_prefijo(valor)
+            else:
+                isbns = self.indices[criterio].candidatos(valor)
+                # Si el valor es una sola palabra, todos los candidatos la contienen
+                consulta = normalizar(valor)
+                if consulta and not _PALABRAS.fullmatch(consulta):
+                    comprobar.append((criterio, consulta))
+            if isbns is not None:
+                conjuntos.append(isbns)
+
+        if not conjuntos:
+            isbns = self.catalogo
+        else:
+            # Intersectamos empezando por el conjunto más pequeño
+            conjuntos.sort(key=len)
+            isbns = conjuntos[0].intersection(*conjuntos[1:])
+        if comprobar:
+            isbns = [isbn for isbn in isbns
+                     if all(consulta in normalizar(self._campos(self.catalogo[isbn])[criterio])
+                            for criterio, consulta in comprobar)]
+        return sorted(isbns)
 
     def listar_libros_prestados(self, id_usuario):
         """Lista todos los libros prestados a un usuario específico"""
-        if id_usuario not in self.usuarios:
-            print("Error: Usuario no registrado")
-            return []
-        return self.usuarios[id_usuario].libros_prestados
+        with self._candado_usuario(id_usuario):
+            if id_usuario not in self.usuarios:
+                self._informar("Error: Usuario no registrado")
+                return []
+            return list(self.usuarios[id_usuario].libros_prestados)
+
+    def fechas_prestamo(self, isbn):
+        """Devuelve (prestado, vence) del préstamo del libro, o None si no está prestado"""
+        with self._candado_vencimientos:
+            fechas = self._fechas.get(isbn)
+        return fechas[:2] if fechas is not None else None
+
+    def _claves_vencidas(self, ahora):
+        """
+        Devuelve las entradas (vence, número, ISBN) vigentes con vence <= ahora, de la más antigua
+        a la más reciente. Solo se visita la parte del montículo con fechas vencidas: si un nodo no
+        ha vencido, ninguno de sus hijos tampoco. Una frontera ordenada con los nodos por visitar
+        da el orden por fecha, O(k log k) para k vencidos.
+        """
+        with self._candado_vencimientos:
+            monticulo = self._vencimientos
+            claves = []
+            frontera = [(monticulo[0], 0)] if monticulo and monticulo[0][0] <= ahora else []
+            while frontera:
+                entrada, posicion = heapq.heappop(frontera)
+                if self._vigente(entrada):
+                    claves.append(entrada)
+                for hijo in (2 * posicion + 1, 2 * posicion + 2):
+                    if hijo < len(monticulo) and monticulo[hijo][0] <= ahora:
+                        heapq.heappush(frontera, (monticulo[hijo], hijo))
+            return claves
+
+    def _prestamos_vencidos(self, ahora):
+        """Genera (libro, usuario, vence) de los préstamos vencidos que siguen sin devolver"""
+        for vence, numero, isbn in self._claves_vencidas(ahora):
+            with self._candado_isbn(isbn):
+                # Con varios hilos el libro puede haberse devuelto después de leer el montículo
+                fechas = self._fechas.get(isbn)
+                if fechas is None or fechas[2] != numero:
+                    continue
+                libro = self.catalogo[isbn]
+                usuario = self.usuarios[self.prestamos_activos[isbn]]
+            yield libro, usuario, vence
+
+    def vencidos(self, ahora=None):
+        """Lista de (libro, usuario, vence) de los préstamos vencidos, del más antiguo al más reciente"""
+        return list(self._prestamos_vencidos(ahora if ahora is not None else datetime.now()))
+
+    def recordatorios(self, ahora=None, tamaño_lote=100):
+        """
+        Genera los avisos de los préstamos vencidos en lotes de hasta tamaño_lote mensajes, del
+        préstamo más antiguo al más reciente. Cada lote se prepara cuando se pide, así que se
+        pueden enviar los avisos sin tener todos en memoria.
+        """
+        ahora = ahora if ahora is not None else datetime.now()
+        lote = []
+        for libro, usuario, vence in self._prestamos_vencidos(ahora):
+            lote.append(f"Aviso para {usuario.nombre} (ID: {usuario.id_usuario}): el libro '{libro.datos[1]}' "
+                        f"(ISBN: {libro.isbn}) tenía que devolverse el {vence:%d/%m/%Y}, "
+                        f"hace {(ahora - vence).days} días")
+            if len(lote) >= tamaño_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
 
 
 # Ejemplo de uso y pruebas
@@ -160,11 +689,27 @@ if __name__ == "__main__":
     for libro in resultados:
         print(f"Resultado búsqueda: {libro}")
 
+    # Búsqueda combinada por varios campos, con la disponibilidad de cada libro
+    for libro, disponible in bib.buscar(titulo="cien", autor="garcia marquez"):
+        print(f"Resultado búsqueda: {libro} - {'disponible' if disponible else 'prestado'}")
+
+    # Búsqueda por el principio de las palabras (abreviaturas)
+    for libro, disponible in bib.buscar_por_prefijo(autor="garc marq"):
+        print(f"Resultado búsqueda por prefijo: {libro} - {'disponible' if disponible else 'prestado'}")
+
     # Listar libros prestados
     prestados = bib.listar_libros_prestados("001")
     for libro in prestados:
         print(f"Libro prestado a usuario 001: {libro}")
 
+    # Préstamos vencidos dentro de un mes y avisos a sus usuarios
+    dentro_de_un_mes = datetime.now() + timedelta(days=30)
+    for libro, usuario, vence in bib.vencidos(dentro_de_un_mes):
+        print(f"Vencido: {libro} (prestado a {usuario.nombre}, vence el {vence:%d/%m/%Y})")
+    for lote in bib.recordatorios(dentro_de_un_mes, tamaño_lote=10):
+        for aviso in lote:
+            print(aviso)
+
     # Devolver libro
     bib.devolver_libro("1234567890")
 
@@ -0,0 +1,101 @@
+"""
+Búsqueda de libros recorriendo el catálogo completo (como hacía buscar_libros) frente a los
+índices de palabras por campo de Biblioteca, por subcadena (buscar_libros) y por el principio
+de las palabras (buscar_por_prefijo).
+
+Uso:
+    python benchmark_busqueda.py --libros 2000000
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from Sistemadegestiondebiblioteca import Biblioteca, Libro, Usuario
+
+SILABAS = ["ma", "ri", "so", "la", "no", "che", "ñi", "cá", "tel", "ro", "dé", "bu", "gua", "mí", "ter", "pa",
+           "lu", "zón", "ve", "ra", "nú", "ez", "sá", "lo"]
+CATEGORIAS = ["Novela", "Poesía", "Ciencia ficción", "Historia", "Ensayo", "Realismo mágico", "Biografía",
+              "Teatro", "Infantil", "Ciencia"]
+
+
+def vocabulario(rng, n):
+    """n palabras pseudoaleatorias distintas, algunas con tildes o ñ"""
+    palabras = set()
+    while len(palabras) < n:
+        palabras.add("".join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4))))
+    return sorted(palabras)
+
+
+def crear_biblioteca(n, semilla=42):
+    """Biblioteca de n libros con títulos de un vocabulario de 20000 palabras y 5000 apellidos"""
+    rng = random.Random(semilla)
+    palabras = vocabulario(rng, 20000)
+    apellidos = [palabra.capitalize() for palabra in rng.sample(palabras, 5000)]
+    biblioteca = Biblioteca()
+    with contextlib.redirect_stdout(io.StringIO()):
+        biblioteca.registrar_usuario(Usuario("Lector", "001"))
+        for i in range(n):
+            titulo = " ".join(rng.choice(palabras) for _ in range(rng.randint(2, 5))).capitalize()
+            autor = f"{rng.choice(apellidos)} {rng.choice(apellidos)}"
+            biblioteca.añadir_libro(Libro(titulo, autor, rng.choice(CATEGORIAS), f"{i:013d}"))
+            # Uno de cada diez libros está prestado
+            if i % 10 == 0:
+                biblioteca.prestar_libro(f"{i:013d}", "001")
+    return biblioteca, palabras, apellidos
+
+
+def busqueda_lineal(biblioteca, criterio, valor):
+    """Búsqueda original: recorre todos los libros pasando cada campo a minúsculas"""
+    campo = {'titulo': lambda libro: libro.datos[1], 'autor': lambda libro: libro.datos[0],
+             'categoria': lambda libro: libro.categoria}[criterio]
+    return [libro for libro in biblioteca.catalogo.values() if valor.lower() in campo(libro).lower()]
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda de libros")
+    parser.add_argument("--libros", type=int, default=200000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    biblioteca, palabras, apellidos = crear_biblioteca(args.libros)
+    print(f"Biblioteca de {args.libros} libros creada (con índices) en {time.perf_counter() - inicio:.2f} s")
+
+    rng = random.Random(7)
+    libro = biblioteca.catalogo[f"{args.libros // 3:013d}"]
+    consultas = [("autor", rng.choice(apellidos).lower()), ("titulo", rng.choice(palabras)),
+                 ("titulo", f"{rng.choice(palabras)} {rng.choice(palabras)}"), ("titulo", rng.choice(palabras)[:3]),
+                 ("titulo", rng.choice(palabras)[2:]), ("titulo", libro.datos[1][3:15].lower()),
+                 ("categoria", "poesía")]
+    for criterio, valor in consultas:
+        lineal = medir(lambda: busqueda_lineal(biblioteca, criterio, valor), args.repeticiones)
+        indice = medir(lambda: biblioteca.buscar_libros(criterio, valor), args.repeticiones)
+        prefijo = medir(lambda: biblioteca.buscar_por_prefijo(**{criterio: valor}), args.repeticiones)
+        recorridos = busqueda_lineal(biblioteca, criterio, valor)
+        encontrados = biblioteca.buscar_libros(criterio, valor)
+        # El índice no distingue tildes, así que puede encontrar más que el recorrido, nunca menos
+        assert {libro.isbn for libro in recorridos} <= {libro.isbn for libro in encontrados}
+        print(f"{criterio}='{valor}': recorrido {len(recorridos)} resultados en {lineal * 1000:.1f} ms | "
+              f"índice {len(encontrados)} resultados en {indice * 1000:.2f} ms | por prefijo "
+              f"{len(biblioteca.buscar_por_prefijo(**{criterio: valor}))} resultados en {prefijo * 1000:.2f} ms")
+
+    # Varias condiciones a la vez: el recorrido tendría que comprobar cada campo de cada libro
+    libro = biblioteca.catalogo[f"{args.libros // 2:013d}"]
+    criterios = {'titulo': libro.datos[1].split()[0], 'autor': libro.datos[0].split()[0], 'categoria': libro.categoria}
+    segundos = medir(lambda: biblioteca.buscar(**criterios), args.repeticiones)
+    resultados = biblioteca.buscar(**criterios)
+    disponibles = sum(1 for _, disponible in resultados if disponible)
+    print(f"buscar({criterios}): {len(resultados)} resultados ({disponibles} disponibles) en {segundos * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
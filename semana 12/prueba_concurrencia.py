@@ -0,0 +1,119 @@
+"""
+Prueba de estrés de la Biblioteca concurrente: varios hilos prestan, devuelven, añaden y
+quitan libros y dan de alta y de baja usuarios a la vez. Al final se comprueba que ningún
+libro está a la vez disponible y prestado, que cada préstamo figura en su usuario y que el
+número de préstamos confirmados menos el de devoluciones coincide con los préstamos activos.
+
+Uso:
+    python prueba_concurrencia.py --hilos 8 --operaciones 1000000
+    python prueba_concurrencia.py --sin-candados      # para ver los errores sin concurrente=True
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from Sistemadegestiondebiblioteca import Biblioteca, Libro, Usuario
+
+
+def comprobar(biblioteca, prestamos_confirmados, excepciones):
+    """Devuelve la lista de invariantes incumplidos"""
+    errores = [f"{excepciones} operaciones fallaron con una excepción"] if excepciones else []
+    disponibles = set(biblioteca.libros_disponibles)
+    prestados = set(biblioteca.prestamos_activos)
+    if disponibles & prestados:
+        errores.append(f"{len(disponibles & prestados)} libros disponibles y prestados a la vez")
+    if disponibles | prestados != set(biblioteca.catalogo):
+        errores.append("el catálogo no coincide con disponibles + prestados")
+    en_usuarios = {}
+    for usuario in biblioteca.usuarios.values():
+        for libro in usuario.libros_prestados:
+            if libro.isbn in en_usuarios:
+                errores.append(f"el libro {libro.isbn} está prestado a dos usuarios")
+            en_usuarios[libro.isbn] = usuario.id_usuario
+    if en_usuarios != biblioteca.prestamos_activos:
+        errores.append("los libros prestados de los usuarios no coinciden con prestamos_activos")
+    if prestamos_confirmados != len(prestados):
+        errores.append(f"{prestamos_confirmados} préstamos sin devolver confirmados, "
+                       f"pero hay {len(prestados)} préstamos activos")
+    return errores
+
+
+def trabajar(biblioteca, semilla, operaciones, libros, usuarios, contadores, indice):
+    rng = random.Random(semilla)
+    prestamos = devoluciones = excepciones = 0
+    for _ in range(operaciones):
+        accion = rng.random()
+        isbn = f"{rng.randrange(libros):013d}"
+        id_usuario = f"{rng.randrange(usuarios):04d}"
+        try:
+            if accion < 0.48:
+                prestamos += biblioteca.prestar_libro(isbn, id_usuario)
+            elif accion < 0.96:
+                devoluciones += biblioteca.devolver_libro(isbn)
+            elif accion < 0.98:
+                biblioteca.añadir_libro(Libro(f"Título {isbn}", "Autor", "Novela", isbn))
+            elif accion < 0.99:
+                biblioteca.quitar_libro(isbn)
+            elif accion < 0.995:
+                biblioteca.registrar_usuario(Usuario(f"Usuario {id_usuario}", id_usuario))
+            else:
+                biblioteca.dar_baja_usuario(id_usuario)
+        except Exception:
+            # Sin candados, dos hilos pueden comprobar el mismo libro y aplicar los dos su cambio
+            excepciones += 1
+    contadores[indice] = (prestamos, devoluciones, excepciones)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de la Biblioteca con varios hilos")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=1000000, help="Operaciones en total")
+    parser.add_argument("--libros", type=int, default=10000)
+    parser.add_argument("--usuarios", type=int, default=500)
+    parser.add_argument("--franjas", type=int, default=64)
+    parser.add_argument("--archivo", action="store_true", help="Registrar cada operación en disco")
+    parser.add_argument("--sin-candados", action="store_true", help="Usar la biblioteca sin concurrente=True")
+    args = parser.parse_args()
+
+    # Cambiar de hilo con más frecuencia hace aparecer antes las condiciones de carrera
+    sys.setswitchinterval(1e-5)
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "biblioteca.json") if args.archivo else None
+        biblioteca = Biblioteca(archivo, concurrente=not args.sin_candados, franjas=args.franjas, mensajes=False)
+        for i in range(args.libros):
+            biblioteca.añadir_libro(Libro(f"Título {i}", "Autor", "Novela", f"{i:013d}"))
+        for i in range(args.usuarios):
+            biblioteca.registrar_usuario(Usuario(f"Usuario {i:04d}", f"{i:04d}"))
+
+        contadores = [None] * args.hilos
+        por_hilo = args.operaciones // args.hilos
+        hilos = [threading.Thread(target=trabajar, args=(biblioteca, i, por_hilo, args.libros, args.usuarios,
+                                                         contadores, i))
+                 for i in range(args.hilos)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        segundos = time.perf_counter() - inicio
+        biblioteca.cerrar()
+
+    prestamos = sum(c[0] for c in contadores)
+    devoluciones = sum(c[1] for c in contadores)
+    print(f"{args.hilos} hilos x {por_hilo} operaciones en {segundos:.1f} s: "
+          f"{args.hilos * por_hilo / segundos:.0f} operaciones/s, {prestamos / segundos:.0f} préstamos/s "
+          f"({prestamos} préstamos, {devoluciones} devoluciones)")
+    errores = comprobar(biblioteca, prestamos - devoluciones, sum(c[2] for c in contadores))
+    for error in errores:
+        print(f"ERROR: {error}")
+    if errores:
+        sys.exit(1)
+    print("Invariantes correctos.")
+
+
+if __name__ == "__main__":
+    main()
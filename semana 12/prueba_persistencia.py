@@ -0,0 +1,161 @@
+"""
+Comprueba que una Biblioteca con archivo recupera exactamente el mismo estado al reabrirla
+(instantánea más cola del registro, también con una última línea a medias, una línea dañada
+en medio o una escritura del registro que falla) y mide cuántos préstamos por segundo se
+registran y cuánto tarda en reabrirse.
+
+Uso:
+    python prueba_persistencia.py --operaciones 20000 --eventos-por-instantanea 5000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from Sistemadegestiondebiblioteca import Biblioteca, Libro, Usuario
+
+
+def estado(biblioteca):
+    return (
+        sorted((l.isbn, l.datos, l.categoria) for l in biblioteca.catalogo.values()),
+        sorted(biblioteca.libros_disponibles),
+        sorted((u.id_usuario, u.nombre, [l.isbn for l in u.libros_prestados]) for u in biblioteca.usuarios.values()),
+        sorted(biblioteca.prestamos_activos.items()),
+    )
+
+
+def operacion_aleatoria(rng, biblioteca, libros, usuarios):
+    accion = rng.random()
+    isbn = f"{rng.randrange(libros):013d}"
+    id_usuario = f"{rng.randrange(usuarios):03d}"
+    if accion < 0.45:
+        biblioteca.prestar_libro(isbn, id_usuario)
+    elif accion < 0.9:
+        biblioteca.devolver_libro(isbn)
+    elif accion < 0.94:
+        biblioteca.añadir_libro(Libro(f"Título {isbn}", f"Autor {rng.randrange(50)}", "Novela", isbn))
+    elif accion < 0.97:
+        biblioteca.quitar_libro(isbn)
+    elif accion < 0.985:
+        biblioteca.registrar_usuario(Usuario(f"Usuario {id_usuario}", id_usuario))
+    else:
+        biblioteca.dar_baja_usuario(id_usuario)
+
+
+@contextlib.contextmanager
+def fsync_que_falla():
+    """Hace fallar la siguiente llamada a os.fsync, como un disco lleno o un error de E/S"""
+    original = os.fsync
+    llamadas = []
+
+    def fallar(descriptor):
+        if not llamadas:
+            llamadas.append(descriptor)
+            raise OSError(28, "No queda espacio en el dispositivo (simulado)")
+        return original(descriptor)
+
+    os.fsync = fallar
+    try:
+        yield
+    finally:
+        os.fsync = original
+
+
+def prueba_fallos(directorio):
+    """Un evento rechazado no puede reaparecer al cargar ni tapar al siguiente"""
+    archivo = os.path.join(directorio, "fallos.json")
+    biblioteca = Biblioteca(archivo, mensajes=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        biblioteca.añadir_libro(Libro("Uno", "Autor", "Novela", "1"))
+        with fsync_que_falla():
+            assert not biblioteca.añadir_libro(Libro("Dos", "Autor", "Novela", "2"))
+        biblioteca.añadir_libro(Libro("Tres", "Autor", "Novela", "3"))
+        # Una instantánea que falla no deja su archivo temporal en el directorio
+        with fsync_que_falla():
+            assert not biblioteca.guardar_instantanea()
+    assert sorted(os.listdir(directorio)) == ["fallos.json.log"], os.listdir(directorio)
+    biblioteca.cerrar()
+    reabierta = Biblioteca(archivo, mensajes=False)
+    assert sorted(reabierta.catalogo) == sorted(biblioteca.catalogo) == ["1", "3"], sorted(reabierta.catalogo)
+    reabierta.cerrar()
+
+    # Una línea dañada en medio del registro no hace perder los eventos que la siguen
+    with open(archivo + ".log", 'ab') as f:
+        f.write(b'{"op": "libro", "isbn"\n')
+        f.write(json.dumps({'op': 'libro', 'isbn': '4', 'titulo': 'Cuatro', 'autor': 'Autor',
+                            'categoria': 'Novela', 'n': reabierta.secuencia + 1}).encode('utf-8') + b"\n")
+    reabierta = Biblioteca(archivo, mensajes=False)
+    reabierta.añadir_libro(Libro("Cinco", "Autor", "Novela", "5"))
+    reabierta.cerrar()
+    otra = Biblioteca(archivo, mensajes=False)
+    assert sorted(otra.catalogo) == ["1", "3", "4", "5"], sorted(otra.catalogo)
+    otra.cerrar()
+    print("Los fallos al escribir el registro o la instantánea no pierden ni resucitan eventos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de la persistencia de la Biblioteca")
+    parser.add_argument("--operaciones", type=int, default=5000)
+    parser.add_argument("--libros", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--eventos-por-instantanea", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "biblioteca.json")
+        biblioteca = Biblioteca(archivo, args.eventos_por_instantanea)
+        memoria = Biblioteca()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for destino in (biblioteca, memoria):
+                for i in range(args.libros):
+                    destino.añadir_libro(Libro(f"Título {i}", f"Autor {i % 50}", "Novela", f"{i:013d}"))
+                for i in range(args.usuarios):
+                    destino.registrar_usuario(Usuario(f"Usuario {i:03d}", f"{i:03d}"))
+            # La misma secuencia de operaciones en la biblioteca persistente y en una en memoria
+            for _ in range(args.operaciones):
+                semilla = rng.random()
+                for destino in (biblioteca, memoria):
+                    operacion_aleatoria(random.Random(semilla), destino, args.libros, args.usuarios)
+        biblioteca.cerrar()
+
+        # Simulamos una caída a mitad de escritura del último evento
+        with open(archivo + ".log", 'ab') as f:
+            f.write(b'{"op": "prestar", "isbn": "00000000')
+
+        inicio = time.perf_counter()
+        reabierta = Biblioteca(archivo, args.eventos_por_instantanea)
+        segundos = time.perf_counter() - inicio
+        assert estado(reabierta) == estado(memoria), "El estado recuperado no coincide"
+        print(f"Estado recuperado tras {reabierta.secuencia} eventos "
+              f"({reabierta._eventos_en_registro} reaplicados del registro) en {segundos * 1000:.1f} ms")
+
+        # Préstamos y devoluciones: cada uno es una línea añadida al registro
+        disponibles = list(reabierta.libros_disponibles)[:1000]
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            for isbn in disponibles:
+                reabierta.prestar_libro(isbn, "000" if "000" in reabierta.usuarios else next(iter(reabierta.usuarios)))
+            for isbn in disponibles:
+                reabierta.devolver_libro(isbn)
+            segundos = time.perf_counter() - inicio
+        print(f"{2 * len(disponibles) / segundos:.0f} préstamos y devoluciones por segundo "
+              f"(registro de {os.path.getsize(archivo + '.log') / 1024:.0f} KB)")
+        reabierta.cerrar()
+
+        # Tras las operaciones anteriores el estado también tiene que sobrevivir a otra apertura
+        otra = Biblioteca(archivo, args.eventos_por_instantanea)
+        assert estado(otra) == estado(reabierta)
+        otra.cerrar()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        prueba_fallos(directorio)
+    print("Persistencia correcta.")
+
+
+if __name__ == "__main__":
+    main()
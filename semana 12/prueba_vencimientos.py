@@ -0,0 +1,112 @@
+"""
+Comprueba que vencidos() y recordatorios() devuelven lo mismo que recorrer todos los préstamos
+(también tras reabrir una Biblioteca con archivo) y compara sus tiempos con ese recorrido
+cuando solo una pequeña parte de los préstamos ha vencido.
+
+Uso:
+    python prueba_vencimientos.py --libros 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from Sistemadegestiondebiblioteca import Biblioteca, Libro, Usuario
+
+INICIO = datetime(2024, 1, 1)
+
+
+def vencidos_recorriendo(biblioteca, ahora):
+    """Recorre todos los préstamos activos: lo que había que hacer sin el montículo"""
+    resultado = []
+    for isbn, id_usuario in biblioteca.prestamos_activos.items():
+        prestado, vence = biblioteca.fechas_prestamo(isbn)
+        if vence <= ahora:
+            resultado.append((vence, isbn, id_usuario))
+    return sorted(resultado)
+
+
+def resumir(vencidos):
+    return sorted((vence, libro.isbn, usuario.id_usuario) for libro, usuario, vence in vencidos)
+
+
+def comprobar(biblioteca, ahora):
+    esperado = vencidos_recorriendo(biblioteca, ahora)
+    vencidos = biblioteca.vencidos(ahora)
+    assert resumir(vencidos) == esperado, "vencidos() no coincide con el recorrido"
+    fechas = [vence for _, _, vence in vencidos]
+    assert fechas == sorted(fechas), "vencidos() no está ordenado por fecha"
+    avisos = sum(len(lote) for lote in biblioteca.recordatorios(ahora, tamaño_lote=7))
+    assert avisos == len(esperado), "recordatorios() no da un aviso por préstamo vencido"
+    return len(esperado)
+
+
+def operaciones_aleatorias(biblioteca, rng, operaciones, libros, usuarios):
+    """Préstamos y devoluciones con un reloj que avanza, comprobando los vencidos por el camino"""
+    ahora = INICIO
+    for i in range(operaciones):
+        ahora += timedelta(minutes=rng.randrange(60))
+        isbn = f"{rng.randrange(libros):013d}"
+        if rng.random() < 0.55:
+            biblioteca.prestar_libro(isbn, f"{rng.randrange(usuarios):03d}", ahora=ahora, dias=rng.randint(1, 30))
+        else:
+            biblioteca.devolver_libro(isbn)
+        if i % 1000 == 0:
+            comprobar(biblioteca, ahora)
+    return ahora
+
+
+def crear(biblioteca, libros, usuarios):
+    for i in range(libros):
+        biblioteca.añadir_libro(Libro(f"Título {i}", f"Autor {i % 50}", "Novela", f"{i:013d}"))
+    for i in range(usuarios):
+        biblioteca.registrar_usuario(Usuario(f"Usuario {i:03d}", f"{i:03d}"))
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de los vencimientos de la Biblioteca")
+    parser.add_argument("--operaciones", type=int, default=20000)
+    parser.add_argument("--libros", type=int, default=200000, help="Libros prestados en la medición de tiempos")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    # Exactitud, en memoria y al reabrir desde el archivo
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "biblioteca.json")
+        biblioteca = Biblioteca(archivo, eventos_por_instantanea=3000, mensajes=False)
+        crear(biblioteca, 2000, 100)
+        ahora = operaciones_aleatorias(biblioteca, rng, args.operaciones, 2000, 100)
+        total = comprobar(biblioteca, ahora)
+        biblioteca.cerrar()
+        reabierta = Biblioteca(archivo, mensajes=False)
+        assert resumir(reabierta.vencidos(ahora)) == resumir(biblioteca.vencidos(ahora))
+        reabierta.cerrar()
+    print(f"vencidos() y recordatorios() correctos ({total} préstamos vencidos al final, también tras reabrir)")
+
+    # Tiempos: todos los libros prestados, uno por minuto; solo los más antiguos han vencido
+    biblioteca = Biblioteca(mensajes=False)
+    crear(biblioteca, args.libros, 1000)
+    for i in range(args.libros):
+        biblioteca.prestar_libro(f"{i:013d}", f"{i % 1000:03d}", ahora=INICIO + timedelta(minutes=i), dias=14)
+    for vencidos in (10, 1000, args.libros // 10):
+        ahora = INICIO + timedelta(days=14, minutes=vencidos - 1)
+        recorrido = medir(lambda: vencidos_recorriendo(biblioteca, ahora), args.repeticiones)
+        monticulo = medir(lambda: biblioteca.vencidos(ahora), args.repeticiones)
+        primer_lote = medir(lambda: next(biblioteca.recordatorios(ahora), None), args.repeticiones)
+        print(f"{len(biblioteca.vencidos(ahora))} vencidos de {args.libros} préstamos: recorrido "
+              f"{recorrido * 1000:.1f} ms | vencidos() {monticulo * 1000:.2f} ms | "
+              f"primer lote de recordatorios {primer_lote * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,37 @@
+import argparse
+import asyncio
+import bisect
+import codecs
+import functools
+import heapq
+import itertools
 import json
+import math
+import operator
 import os
+import re
+import stat
+import sys
+import tempfile
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no existe fcntl; usamos msvcrt para el bloqueo de archivos
+    fcntl = None
+    import msvcrt
 
 
 class Producto:
+    # Sin __dict__ por instancia: reduce la memoria de cada producto
+    __slots__ = ('_id', '_nombre', '_cantidad', '_precio')
+
     def __init__(self, id, nombre, cantidad, precio):
         self._id = id
         self._nombre = nombre
@@ -52,15 +81,882 @@ class Producto:
         return f"ID: {self._id}, Nombre: {self._nombre}, Cantidad: {self._cantidad}, Precio: ${self._precio:.2f}"
 
 
-class Inventario:
+# Tamaño de lote a partir del cual aplicar_lote reconstruye los índices ordenados en vez de mantenerlos
+UMBRAL_LOTE_EN_BLOQUE = 1000
+
+# Espacios y comas que separan los elementos de un array JSON
+_SEPARADORES = re.compile(r'[\s,]*')
+_PALABRAS = re.compile(r'\w+')
+
+
+def es_json_lines(ruta):
+    """Los archivos .jsonl guardan un producto por línea en lugar de un array JSON"""
+    return ruta.endswith(".jsonl")
+
+
+def leer_productos(ruta, progreso=None, tamaño_bloque=1 << 16):
+    """
+    Lee los productos de un archivo JSON (array) o JSON Lines elemento a elemento,
+    sin cargar el archivo completo en memoria.
+
+    progreso, si se indica, se llama como progreso(bytes_leidos, bytes_totales).
+    """
+    total = os.path.getsize(ruta)
+    leidos = 0
+
+    if es_json_lines(ruta):
+        with open(ruta, 'rb') as f:
+            for linea in f:
+                leidos += len(linea)
+                if linea.strip():
+                    yield Producto.from_dict(json.loads(linea))
+                if progreso is not None and leidos % tamaño_bloque < len(linea):
+                    progreso(leidos, total)
+        if progreso is not None:
+            progreso(leidos, total)
+        return
+
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    pos = 0
+    fin_archivo = False
+    inicio_array = False
+
+    with open(ruta, 'rb') as f:
+        while True:
+            # Saltamos espacios y separadores hasta el siguiente elemento
+            pos = _SEPARADORES.match(buffer, pos).end()
+
+            if pos < len(buffer):
+                if not inicio_array:
+                    if buffer[pos] != '[':
+                        raise ValueError("El archivo de inventario no contiene un array JSON")
+                    inicio_array = True
+                    pos += 1
+                    continue
+                if buffer[pos] == ']':
+                    break
+                try:
+                    item, fin = decodificador.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if fin_archivo:
+                        raise
+                    item = None
+                if item is not None:
+                    yield Producto.from_dict(item)
+                    pos = fin
+                    continue
+            elif fin_archivo:
+                if inicio_array:
+                    raise ValueError("Array JSON incompleto en el archivo de inventario")
+                break
+
+            # Necesitamos más datos: descartamos lo ya procesado y leemos otro bloque
+            bloque = f.read(tamaño_bloque)
+            fin_archivo = not bloque
+            leidos += len(bloque)
+            buffer = buffer[pos:] + utf8.decode(bloque, final=fin_archivo)
+            pos = 0
+            if progreso is not None:
+                progreso(leidos, total)
+
+
+def escribir_productos(f, datos, json_lines=False):
+    """Escribe los diccionarios de productos uno a uno, sin construir el documento completo"""
+    if json_lines:
+        for item in datos:
+            f.write(json.dumps(item, separators=(',', ':')) + "\n")
+        return
+
+    # Mismo formato que json.dump(datos, f, indent=4)
+    primero = True
+    for item in datos:
+        f.write("[\n" if primero else ",\n")
+        f.write("\n".join("    " + linea for linea in json.dumps(item, indent=4).split("\n")))
+        primero = False
+    f.write("[]" if primero else "\n]")
+
+
+@contextmanager
+def escritura_atomica(ruta, modo='w'):
+    """
+    Escribe en un archivo temporal del mismo directorio, lo sincroniza a disco y lo renombra
+    sobre el destino: una caída a mitad de escritura nunca deja el archivo truncado.
+    """
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=os.path.basename(ruta) + ".", suffix=".tmp")
+    try:
+        # mkstemp crea el archivo con permisos 0600; conservamos los del archivo original
+        os.chmod(temporal, stat.S_IMODE(os.stat(ruta).st_mode) if os.path.exists(ruta) else 0o644)
+        with os.fdopen(descriptor, modo) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+    # Sincronizamos también el directorio para que el renombrado sobreviva a una caída
+    if os.name != 'nt':
+        descriptor = os.open(directorio, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+@contextmanager
+def bloqueo_archivo(ruta):
+    """Bloqueo consultivo exclusivo entre procesos, tomado sobre el archivo auxiliar ruta + '.lock'"""
+    with open(ruta + ".lock", 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def en_sesion_compartida(metodo):
+    """Ejecuta el método del Inventario dentro de sesion_compartida()"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.sesion_compartida():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+class ProductoColumnar:
+    """Vista de una fila del almacén columnar con la misma interfaz que Producto"""
+    __slots__ = ('_almacen', '_fila')
+
+    def __init__(self, almacen, fila):
+        self._almacen = almacen
+        self._fila = fila
+
+    def get_id(self):
+        return self._almacen._ids[self._fila]
+
+    def get_nombre(self):
+        return self._almacen._nombres[self._fila]
+
+    def set_nombre(self, nombre):
+        self._almacen._nombres[self._fila] = sys.intern(nombre)
+
+    def get_cantidad(self):
+        return self._almacen._cantidades[self._fila]
+
+    def set_cantidad(self, cantidad):
+        self._almacen._cantidades[self._fila] = cantidad
+
+    def get_precio(self):
+        return self._almacen._precios[self._fila]
+
+    def set_precio(self, precio):
+        self._almacen._precios[self._fila] = precio
+
+    def to_dict(self):
+        return {
+            'id': self.get_id(),
+            'nombre': self.get_nombre(),
+            'cantidad': self.get_cantidad(),
+            'precio': self.get_precio()
+        }
+
+    def __str__(self):
+        return f"ID: {self.get_id()}, Nombre: {self.get_nombre()}, Cantidad: {self.get_cantidad()}, Precio: ${self.get_precio():.2f}"
+
+
+class AlmacenColumnar(MutableMapping):
+    """
+    Almacena los productos por columnas (arrays paralelos) en lugar de un objeto por producto.
+    Se usa como el diccionario ID -> producto del Inventario y devuelve vistas ProductoColumnar.
+    """
+
+    def __init__(self):
+        # ID -> número de fila
+        self._filas = {}
+        self._ids = []
+        self._nombres = []
+        self._cantidades = array('q')
+        self._precios = array('d')
+        # Filas liberadas por eliminaciones, reutilizadas en las siguientes altas
+        self._libres = []
+
+    def __getitem__(self, id):
+        return ProductoColumnar(self, self._filas[id])
+
+    def __setitem__(self, id, producto):
+        fila = self._filas.get(id)
+        if fila is None:
+            if self._libres:
+                fila = self._libres.pop()
+            else:
+                fila = len(self._ids)
+                self._ids.append(None)
+                self._nombres.append(None)
+                self._cantidades.append(0)
+                self._precios.append(0.0)
+            self._filas[id] = fila
+        self._ids[fila] = id
+        self._nombres[fila] = sys.intern(producto.get_nombre())
+        self._cantidades[fila] = producto.get_cantidad()
+        self._precios[fila] = producto.get_precio()
+
+    def __delitem__(self, id):
+        fila = self._filas.pop(id)
+        self._ids[fila] = None
+        self._nombres[fila] = None
+        self._libres.append(fila)
+
+    def pop(self, id, *predeterminado):
+        # Devolvemos una copia independiente: la fila queda libre y la vista dejaría de ser válida
+        if id not in self._filas:
+            if predeterminado:
+                return predeterminado[0]
+            raise KeyError(id)
+        vista = self[id]
+        producto = Producto(id, vista.get_nombre(), vista.get_cantidad(), vista.get_precio())
+        del self[id]
+        return producto
+
+    def __iter__(self):
+        return iter(self._filas)
+
+    def __len__(self):
+        return len(self._filas)
+
+    def __contains__(self, id):
+        return id in self._filas
+
+    def leer_columnas(self, ids):
+        """Devuelve (nombres, cantidades, precios) de esos IDs leyendo las columnas, sin crear vistas"""
+        filas = [self._filas[id] for id in ids]
+        return ([self._nombres[fila] for fila in filas], [self._cantidades[fila] for fila in filas],
+                [self._precios[fila] for fila in filas])
+
+    def asignar_precios(self, ids, precios):
+        """Escribe muchos precios directamente en su columna"""
+        columna = self._precios
+        filas = self._filas
+        for id, precio in zip(ids, precios):
+            columna[filas[id]] = precio
+
+    def columnas(self):
+        """Genera (id, cantidad, precio) de cada fila ocupada"""
+        return ((id, cantidad, precio) for id, cantidad, precio in zip(self._ids, self._cantidades, self._precios)
+                if id is not None)
+
+
+# Copia idéntica de la clase en semana 10/sistema_inventariomejorado.py: cualquier cambio debe hacerse en las dos
+class CacheLRU:
+    """Caché de tamaño acotado que descarta el elemento usado hace más tiempo, con contadores de aciertos y fallos"""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.elementos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, cargar):
+        """Devuelve el valor en caché o lo lee con cargar(clave); los None no se guardan"""
+        try:
+            valor = self.elementos[clave]
+        except KeyError:
+            self.fallos += 1
+            valor = cargar(clave)
+            if valor is not None:
+                self.guardar(clave, valor)
+            return valor
+        self.aciertos += 1
+        self.elementos.move_to_end(clave)
+        return valor
+
+    def guardar(self, clave, valor):
+        if self.capacidad <= 0:
+            return
+        self.elementos[clave] = valor
+        self.elementos.move_to_end(clave)
+        if len(self.elementos) > self.capacidad:
+            self.elementos.popitem(last=False)
+
+    def descartar(self, clave):
+        self.elementos.pop(clave, None)
+
+    def limpiar(self):
+        self.elementos.clear()
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'en_cache': len(self.elementos),
+            'capacidad': self.capacidad,
+        }
+
+
+# Copia idéntica de la clase en semana 10/sistema_inventariomejorado.py: cualquier cambio debe hacerse en las dos
+class IndiceTrigramas:
+    """Índice invertido de trigramas para acotar las búsquedas por subcadena en los nombres"""
+
+    def __init__(self):
+        # Trigrama -> conjunto de IDs cuyos nombres lo contienen
+        self._trigramas = {}
+
+    @staticmethod
+    def _trigramas_de(texto):
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    def agregar(self, id, nombre):
+        for trigrama in self._trigramas_de(nombre.lower()):
+            self._trigramas.setdefault(trigrama, set()).add(id)
+
+    def quitar(self, id, nombre):
+        for trigrama in self._trigramas_de(nombre.lower()):
+            ids = self._trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del self._trigramas[trigrama]
+
+    def candidatos(self, consulta):
+        """
+        Devuelve los IDs que pueden contener la consulta (superconjunto de las coincidencias),
+        o None si hay que recorrer todos los nombres: una consulta de menos de 3 letras no
+        tiene trigramas que intersectar y reunir los trigramas que la contienen es más lento
+        que el recorrido lineal. Los nombres de menos de 3 letras no tienen trigramas, pero
+        tampoco pueden contener una consulta más larga.
+        """
+        consulta = consulta.lower()
+        if len(consulta) < 3:
+            return None
+
+        # Intersectamos empezando por el trigrama menos frecuente
+        conjuntos = sorted((self._trigramas.get(t, set()) for t in self._trigramas_de(consulta)), key=len)
+        if not conjuntos[0]:
+            return set()
+        resto = conjuntos[1:]
+        return {id for id in conjuntos[0] if all(id in ids for ids in resto)}
+
+
+class IndiceAproximado:
+    """
+    Índice de las palabras de los nombres (normalizadas sin tildes) para búsquedas tolerantes
+    a errores: coincidencia exacta, por prefijo y con hasta dos errores de tecleo.
+
+    Los prefijos se resuelven con bisect sobre el vocabulario ordenado. Los errores se buscan
+    por borrado simétrico: cada palabra se indexa bajo sus variantes con una letra borrada, y
+    la consulta solo se compara con las palabras que comparten alguna de sus variantes con
+    una o dos letras borradas. Así aparecen todos los errores simples y casi todos los dobles
+    (no, por ejemplo, dos letras que faltan en la consulta).
+    """
+
+    PUNTOS_EXACTA = 4
+    PUNTOS_PREFIJO = 3
+    PUNTOS_POR_DISTANCIA = {1: 2, 2: 1}
+    # Máximo de palabras que se aceptan como continuación de un prefijo
+    LIMITE_PREFIJO = 100
+    # Palabras nuevas que se acumulan antes de reordenar el vocabulario
+    LIMITE_PENDIENTES = 1000
+
+    def __init__(self):
+        # Palabra -> conjunto de IDs cuyos nombres la contienen
+        self._ids = {}
+        # Palabra con una letra borrada -> palabras de las que sale
+        self._borrados = {}
+        # Vocabulario ordenado; puede conservar palabras ya eliminadas, que se saltan al consultar
+        self._vocabulario = []
+        # Palabras añadidas que aún no están en el vocabulario ordenado
+        self._pendientes = set()
+
+    @staticmethod
+    def palabras(texto):
+        return list(dict.fromkeys(_PALABRAS.findall(normalizar(texto))))
+
+    @staticmethod
+    def _borrados_de(palabra):
+        return {palabra[:i] + palabra[i + 1:] for i in range(len(palabra))}
+
+    def agregar(self, id, nombre):
+        for palabra in self.palabras(nombre):
+            ids = self._ids.get(palabra)
+            if ids is None:
+                ids = self._ids[palabra] = set()
+                self._pendientes.add(palabra)
+                for variante in self._borrados_de(palabra):
+                    self._borrados.setdefault(variante, set()).add(palabra)
+            ids.add(id)
+
+    def quitar(self, id, nombre):
+        for palabra in self.palabras(nombre):
+            ids = self._ids.get(palabra)
+            if ids is None:
+                continue
+            ids.discard(id)
+            if not ids:
+                del self._ids[palabra]
+                self._pendientes.discard(palabra)
+                for variante in self._borrados_de(palabra):
+                    palabras = self._borrados[variante]
+                    palabras.discard(palabra)
+                    if not palabras:
+                        del self._borrados[variante]
+
+    def _ordenar_vocabulario(self):
+        # El vocabulario ya ordenado y las pendientes forman dos tramos que sorted fusiona en O(n)
+        vigentes = [p for p in self._vocabulario if p in self._ids and p not in self._pendientes]
+        self._vocabulario = sorted(vigentes + sorted(self._pendientes))
+        self._pendientes.clear()
+
+    def _con_prefijo(self, prefijo):
+        if len(self._pendientes) > self.LIMITE_PENDIENTES:
+            self._ordenar_vocabulario()
+        encontradas = []
+        i = bisect.bisect_left(self._vocabulario, prefijo)
+        while i < len(self._vocabulario) and len(encontradas) < self.LIMITE_PREFIJO:
+            palabra = self._vocabulario[i]
+            if not palabra.startswith(prefijo):
+                break
+            if palabra in self._ids:
+                encontradas.append(palabra)
+            i += 1
+        encontradas.extend(p for p in self._pendientes if p.startswith(prefijo))
+        return encontradas
+
+    def _variantes(self, consulta):
+        """Devuelve las palabras del índice parecidas a la consulta como [(palabra, puntos)], de más a menos puntos"""
+        puntos = {}
+        if consulta in self._ids:
+            puntos[consulta] = self.PUNTOS_EXACTA
+        for palabra in self._con_prefijo(consulta):
+            puntos.setdefault(palabra, self.PUNTOS_PREFIJO)
+
+        # En palabras muy cortas casi todo está a dos errores: solo toleramos uno
+        if len(consulta) >= 3:
+            maximo = 1 if len(consulta) <= 4 else 2
+            variantes = self._borrados_de(consulta) | {consulta}
+            if maximo > 1:
+                variantes |= {doble for variante in variantes for doble in self._borrados_de(variante)}
+            candidatas = set()
+            for variante in variantes:
+                candidatas.update(self._borrados.get(variante, ()))
+                if variante in self._ids:
+                    candidatas.add(variante)
+            for palabra in candidatas:
+                if palabra not in puntos:
+                    distancia = distancia_edicion(consulta, palabra, maximo)
+                    if distancia <= maximo:
+                        puntos[palabra] = self.PUNTOS_POR_DISTANCIA[distancia]
+
+        return sorted(puntos.items(), key=lambda par: -par[1])
+
+    def buscar(self, consulta, k=10):
+        """
+        Devuelve hasta k pares (ID, puntos) de los nombres que contienen una palabra parecida a
+        cada palabra de la consulta, de mayor a menor puntuación y, a igualdad, por ID.
+        """
+        palabras = self.palabras(consulta)
+        if not palabras or k <= 0:
+            return []
+        variantes = [self._variantes(palabra) for palabra in palabras]
+        if not all(variantes):
+            return []
+
+        # Recorremos los candidatos de la palabra con menos productos; las demás solo se comprueban
+        variantes.sort(key=lambda parecidas: sum(len(self._ids[p]) for p, _ in parecidas))
+        base, resto = variantes[0], variantes[1:]
+        maximo_resto = sum(parecidas[0][1] for parecidas in resto)
+
+        # Montículo de (puntos, -ID): la raíz es el peor de los k mejores encontrados
+        mejores = []
+        vistos = set()
+        for puntos, grupo in itertools.groupby(base, key=operator.itemgetter(1)):
+            # Los grupos van de más a menos puntos: si ni el mejor caso supera al k-ésimo, terminamos
+            if len(mejores) == k and puntos + maximo_resto < mejores[0][0]:
+                break
+            candidatos = set().union(*(self._ids[palabra] for palabra, _ in grupo)) - vistos
+            vistos |= candidatos
+            if not resto:
+                # Con una sola palabra todos los candidatos del grupo empatan: basta con los de menor ID
+                mejores.extend((puntos, -id) for id in heapq.nsmallest(k - len(mejores), candidatos))
+                if len(mejores) == k:
+                    break
+                continue
+            for id in candidatos:
+                total = puntos
+                for parecidas in resto:
+                    acierto = next((p for palabra, p in parecidas if id in self._ids[palabra]), None)
+                    if acierto is None:
+                        break
+                    total += acierto
+                else:
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (total, -id))
+                    elif (total, -id) > mejores[0]:
+                        heapq.heapreplace(mejores, (total, -id))
+
+        return [(-id_negativo, puntos) for puntos, id_negativo in sorted(mejores, reverse=True)]
+
+
+class IndiceOrdenado:
+    """Pares (valor, ID) ordenados con bisect para consultas por rango sobre un atributo numérico"""
+
+    def __init__(self, pares=()):
+        self._pares = sorted(pares)
+
+    def agregar(self, valor, id):
+        bisect.insort(self._pares, (valor, id))
+
+    def quitar(self, valor, id):
+        i = bisect.bisect_left(self._pares, (valor, id))
+        if i < len(self._pares) and self._pares[i] == (valor, id):
+            del self._pares[i]
+
+    def menores_que(self, umbral):
+        """IDs con valor < umbral, ordenados por valor"""
+        fin = bisect.bisect_left(self._pares, umbral, key=operator.itemgetter(0))
+        return [id for _, id in self._pares[:fin]]
+
+    def entre(self, minimo, maximo):
+        """IDs con minimo <= valor <= maximo, ordenados por valor"""
+        inicio = bisect.bisect_left(self._pares, minimo, key=operator.itemgetter(0))
+        fin = bisect.bisect_right(self._pares, maximo, key=operator.itemgetter(0))
+        return [id for _, id in self._pares[inicio:fin]]
+
+    def primero(self):
+        return self._pares[0] if self._pares else None
+
+    def ultimo(self):
+        return self._pares[-1] if self._pares else None
+
+
+class EventoInventario:
+    """
+    Cambio confirmado en el inventario. tipo es AÑADIDO, ELIMINADO o ACTUALIZADO; producto es
+    el diccionario del producto tras el cambio (None si se eliminó) y anterior el de antes
+    (None si se añadió).
+    """
+
+    AÑADIDO = 'añadido'
+    ELIMINADO = 'eliminado'
+    ACTUALIZADO = 'actualizado'
+
+    __slots__ = ('tipo', 'id', 'producto', 'anterior')
+
+    def __init__(self, tipo, id, producto=None, anterior=None):
+        self.tipo = tipo
+        self.id = id
+        self.producto = producto
+        self.anterior = anterior
+
+    @classmethod
+    def desde_registro(cls, registro, deshacer):
+        """Construye el evento a partir de un registro del log y su registro inverso"""
+        if registro['op'] == 'a':
+            return cls(cls.AÑADIDO, registro['p']['id'], producto=registro['p'])
+        if registro['op'] == 'e':
+            return cls(cls.ELIMINADO, registro['id'], anterior=deshacer['p'])
+        anterior = {'id': registro['id'], 'nombre': deshacer['nombre'], 'cantidad': deshacer['cantidad'],
+                    'precio': deshacer['precio']}
+        producto = dict(anterior)
+        for campo in ('nombre', 'cantidad', 'precio'):
+            if registro.get(campo) is not None:
+                producto[campo] = registro[campo]
+        return cls(cls.ACTUALIZADO, registro['id'], producto=producto, anterior=anterior)
+
+    @classmethod
+    def desde_registros(cls, confirmados):
+        """
+        Genera los eventos de una lista de (registro, deshacer). Un cambio masivo de precios
+        ('p') da un evento ACTUALIZADO por producto.
+        """
+        for registro, deshacer in confirmados:
+            if registro['op'] != 'p':
+                yield cls.desde_registro(registro, deshacer)
+                continue
+            for id, precio, nombre, cantidad, precio_anterior in zip(
+                    registro['ids'], registro['precios'], deshacer['nombres'], deshacer['cantidades'],
+                    deshacer['precios']):
+                anterior = {'id': id, 'nombre': nombre, 'cantidad': cantidad, 'precio': precio_anterior}
+                yield cls(cls.ACTUALIZADO, id, producto=dict(anterior, precio=precio), anterior=anterior)
+
+    def to_dict(self):
+        return {'tipo': self.tipo, 'id': self.id, 'producto': self.producto, 'anterior': self.anterior}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['tipo'], data['id'], data.get('producto'), data.get('anterior'))
+
+    def __str__(self):
+        return f"{self.tipo}: ID {self.id}"
+
+
+class BusEventos:
+    """Reparte cada evento a los suscriptores síncronos y a las colas asyncio registradas"""
+
     def __init__(self):
-        # Usamos un diccionario para acceso rápido por ID
-        self._productos = {}
+        self._suscriptores = []
+        # Cola asyncio -> función que la alimenta desde cualquier hilo
+        self._colas = {}
+
+    def suscribir(self, funcion):
+        """Registra funcion(evento), que se llama en el mismo hilo que confirma el cambio"""
+        self._suscriptores.append(funcion)
+        return funcion
+
+    def cola(self, tamaño_maximo=0):
+        """
+        Crea una asyncio.Queue que recibe los eventos en el bucle de eventos actual; debe
+        llamarse desde una corrutina. Cada evento se entrega con run_coroutine_threadsafe, así
+        que el inventario puede modificarse desde otro hilo.
+
+        Con tamaño_maximo > 0 y la cola llena, el inventario no se bloquea ni se pierde ningún
+        evento: cada entrega queda como una tarea del bucle esperando sitio en la cola, y los
+        eventos llegan en orden cuando el consumidor la vacía. Esas entregas pendientes ocupan
+        memoria mientras el consumidor no avance.
+        """
+        bucle = asyncio.get_running_loop()
+        cola = asyncio.Queue(tamaño_maximo)
+
+        def entregar(evento):
+            asyncio.run_coroutine_threadsafe(cola.put(evento), bucle)
+
+        self._colas[cola] = self.suscribir(entregar)
+        return cola
+
+    def desuscribir(self, suscriptor):
+        """Da de baja una función suscrita o una cola creada con cola()"""
+        funcion = self._colas.pop(suscriptor, suscriptor)
+        if funcion in self._suscriptores:
+            self._suscriptores.remove(funcion)
+
+    def tiene_suscriptores(self):
+        return bool(self._suscriptores)
+
+    def publicar(self, eventos):
+        for funcion in list(self._suscriptores):
+            for evento in eventos:
+                try:
+                    funcion(evento)
+                except Exception as e:
+                    # Un suscriptor con errores no debe afectar al inventario ni a los demás suscriptores
+                    print(f"Error en un suscriptor de eventos: {e!r}")
+
+
+def leer_cambios(ruta, desde=0):
+    """
+    Lee el archivo de cambios desde la posición `desde` (en bytes) y devuelve (eventos, posición)
+    con la posición desde la que continuar la próxima vez. Una última línea incompleta (que otro
+    proceso está escribiendo) se deja para la siguiente lectura.
+    """
+    eventos = []
+    try:
+        with open(ruta, 'rb') as f:
+            f.seek(desde)
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break
+                eventos.append(EventoInventario.from_dict(json.loads(linea)))
+                desde += len(linea)
+    except FileNotFoundError:
+        pass
+    return eventos, desde
+
+
+class Inventario:
+    def __init__(self, archivo="inventario.json", diario=False, umbral_compactacion=1024 * 1024, progreso=None,
+                 columnar=False, compartido=False, en_segundo_plano=False, registro_cambios=False):
+        if compartido and en_segundo_plano:
+            raise ValueError("El modo compartido recarga el archivo en cada sesión y no admite carga en segundo plano")
+        self._columnar = columnar
+        self._reiniciar_estado()
+        self._archivo = archivo
+        # Modo diario: cada mutación se añade como un registro compacto al log en vez de
+        # reescribir todo el JSON; el log se compacta en una nueva instantánea al superar el umbral
+        self._diario = diario
+        self._archivo_log = archivo + ".log"
+        self._umbral_compactacion = umbral_compactacion
+        self._log = None
+        self._compactacion = None
+        # Registros pendientes de la transacción en curso (None fuera de una transacción)
+        self._transaccion = None
+        # Dentro de carga_masiva() sin modo diario: si hay cambios sin escribir (None fuera de ella)
+        self._guardado_diferido = None
+        # Cada cambio confirmado se publica como EventoInventario en el bus y, si se pide, se añade
+        # al archivo de cambios (archivo + '.cambios') para que otros sistemas lean solo las novedades
+        self._eventos = BusEventos()
+        # Registros confirmados mientras los índices ordenados están diferidos: se publican al reconstruirlos
+        self._confirmados_diferidos = []
+        self._archivo_cambios = archivo + ".cambios" if registro_cambios else None
+        # Función opcional progreso(bytes_leidos, bytes_totales) que informa del avance de la carga
+        self._progreso = progreso
+        # Modo compartido: varios procesos usan el mismo archivo; cada mutación toma un bloqueo
+        # de archivo y recarga el inventario si otro proceso lo cambió desde la última lectura
+        self._compartido = compartido
+        self._sesiones = 0
+        self._firma = None
+        # Carga en segundo plano: hilo que lee el archivo (None cuando no hay carga en curso), condición
+        # que se notifica a cada bloque leído, IDs que el log modifica (None hasta leerlos) y avance en bytes
+        self._carga = None
+        self._avance_carga = threading.Condition()
+        self._ids_en_log = None
+        self._bytes_cargados = (0, 0)
+        if compartido:
+            with self.sesion_compartida():
+                pass
+        elif en_segundo_plano:
+            self._carga = threading.Thread(target=self._cargar_en_segundo_plano, daemon=True)
+            self._carga.start()
+        else:
+            self.cargar_desde_archivo()
+
+    def _reiniciar_estado(self):
+        # Usamos un diccionario para acceso rápido por ID (o un almacén columnar compacto con la misma interfaz)
+        self._productos = AlmacenColumnar() if self._columnar else {}
         # Usamos un conjunto para mantener un índice de nombres (en minúsculas para búsquedas case-insensitive)
         self._nombres_index = set()
-        self._archivo = "inventario.json"
-        self.cargar_desde_archivo()
+        # Índice de trigramas para búsquedas parciales por nombre
+        self._trigramas = IndiceTrigramas()
+        # Índice de búsqueda aproximada; se construye con la primera búsqueda que lo necesita
+        self._aproximado = None
+        # Lista de IDs mantenida en orden con bisect para listar sin reordenar el catálogo
+        self._ids_ordenados = []
+        # Índices secundarios por cantidad y precio para consultas de bajo stock y rangos de precio
+        self._indice_cantidad = IndiceOrdenado()
+        self._indice_precio = IndiceOrdenado()
+        # Agregados mantenidos en O(1) en cada cambio (el mínimo y máximo de precio salen del índice de precios)
+        self._total_unidades = 0
+        self._valor_total = 0.0
+        # Durante la carga y los lotes grandes los índices ordenados se reconstruyen de una vez al final
+        self._indices_diferidos = False
+
+    @contextmanager
+    def sesion_compartida(self):
+        """
+        En modo compartido, mantiene el bloqueo del archivo durante el bloque y recarga antes
+        el inventario si otro proceso lo modificó. Fuera del modo compartido no hace nada.
+        """
+        if not self._compartido:
+            self._esperar_carga()
+            yield self
+            return
+
+        if self._sesiones:
+            self._sesiones += 1
+            try:
+                yield self
+            finally:
+                self._sesiones -= 1
+            return
+
+        with bloqueo_archivo(self._archivo):
+            self._sesiones = 1
+            try:
+                if self._firma_archivos() != self._firma:
+                    self._reiniciar_estado()
+                    self.cargar_desde_archivo()
+                yield self
+            finally:
+                self._sesiones = 0
+                # Otro proceso puede rotar el log, así que no lo mantenemos abierto entre sesiones
+                self.cerrar()
+                self._firma = self._firma_archivos()
+
+    def _firma_archivos(self):
+        """Identifica la versión en disco de la instantánea y los logs (inodo, tamaño y fecha)"""
+        firma = []
+        for ruta in (self._archivo, self._archivo_log, self._archivo_log + ".compactando"):
+            try:
+                estado = os.stat(ruta)
+                firma.append((estado.st_ino, estado.st_size, estado.st_mtime_ns))
+            except FileNotFoundError:
+                firma.append(None)
+        return tuple(firma)
 
+    def _cargar_en_segundo_plano(self):
+        progreso = self._progreso
+
+        def avance(leidos, total):
+            self._bytes_cargados = (leidos, total)
+            with self._avance_carga:
+                self._avance_carga.notify_all()
+            if progreso is not None:
+                progreso(leidos, total)
+
+        try:
+            self._ids_en_log = self._ids_modificados_por_log()
+            self._progreso = avance
+            self.cargar_desde_archivo()
+        finally:
+            self._progreso = progreso
+            with self._avance_carga:
+                self._carga = None
+                self._avance_carga.notify_all()
+
+    def _ids_modificados_por_log(self):
+        """IDs con registros en el log: su valor en la instantánea puede no ser el definitivo"""
+        ids = set()
+        if not self._diario:
+            return ids
+        for ruta in (self._archivo_log + ".compactando", self._archivo_log):
+            try:
+                with open(ruta, 'r') as f:
+                    for linea in f:
+                        try:
+                            registro = json.loads(linea)
+                            if registro['op'] == 'p':
+                                ids.update(registro['ids'])
+                            else:
+                                ids.add(registro['p']['id'] if registro['op'] == 'a' else registro['id'])
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            except FileNotFoundError:
+                pass
+        return ids
+
+    def _esperar_carga(self):
+        """Bloquea hasta que termine la carga en segundo plano (salvo desde el propio hilo de carga)"""
+        carga = self._carga
+        if carga is not None and carga is not threading.current_thread():
+            carga.join()
+
+    def progreso_carga(self):
+        """Devuelve (bytes_leidos, bytes_totales) mientras hay una carga en segundo plano, o None"""
+        return self._bytes_cargados if self._carga is not None else None
+
+    def obtener_producto(self, id):
+        """
+        Devuelve el producto con ese ID, o None si no existe. Durante una carga en segundo plano
+        responde en cuanto el producto se ha leído, sin esperar al resto del archivo.
+        """
+        if self._carga is not None:
+            with self._avance_carga:
+                while self._carga is not None and (self._ids_en_log is None or id in self._ids_en_log
+                                                   or id not in self._productos):
+                    self._avance_carga.wait()
+                if self._carga is not None:
+                    return self._productos.get(id)
+        with self.sesion_compartida():
+            return self._productos.get(id)
+
+    @en_sesion_compartida
+    def tiene_nombre(self, nombre):
+        """Indica si algún producto tiene ese nombre (sin distinguir mayúsculas)"""
+        return nombre.lower() in self._nombres_index
+
+    @en_sesion_compartida
     def añadir_producto(self, producto):
         if producto.get_id() in self._productos:
             print("Error: Ya existe un producto con ese ID.")
@@ -71,82 +967,668 @@ class Inventario:
             print("Error: Ya existe un producto con ese nombre.")
             return False
 
-        self._productos[producto.get_id()] = producto
-        self._nombres_index.add(nombre_lower)
-        self.guardar_en_archivo()
-        print("Producto añadido exitosamente.")
+        self._aplicar_alta(producto)
+        if not self._registrar({'op': 'a', 'p': producto.to_dict()}, {'op': 'e', 'id': producto.get_id()}):
+            return False
+        self._informar("Producto añadido exitosamente.")
         return True
 
+    @en_sesion_compartida
     def eliminar_producto(self, id):
         if id not in self._productos:
             print("Error: No existe un producto con ese ID.")
             return False
 
-        producto = self._productos[id]
-        self._nombres_index.remove(producto.get_nombre().lower())
-        del self._productos[id]
-        self.guardar_en_archivo()
-        print("Producto eliminado exitosamente.")
+        producto = self._aplicar_baja(id)
+        if not self._registrar({'op': 'e', 'id': id}, {'op': 'a', 'p': producto.to_dict()}):
+            return False
+        self._informar("Producto eliminado exitosamente.")
         return True
 
-    def actualizar_producto(self, id, cantidad=None, precio=None):
+    @en_sesion_compartida
+    def actualizar_producto(self, id, cantidad=None, precio=None, nombre=None):
         if id not in self._productos:
             print("Error: No existe un producto con ese ID.")
             return False
 
         producto = self._productos[id]
+        if nombre is not None and nombre.lower() != producto.get_nombre().lower() \
+                and nombre.lower() in self._nombres_index:
+            print("Error: Ya existe un producto con ese nombre.")
+            return False
+
+        anterior = {'op': 'u', 'id': id, 'cantidad': producto.get_cantidad(), 'precio': producto.get_precio(),
+                    'nombre': producto.get_nombre()}
+        self._aplicar_cambio(id, cantidad, precio, nombre)
+        registro = {'op': 'u', 'id': id, 'cantidad': cantidad, 'precio': precio}
+        if nombre is not None:
+            registro['nombre'] = nombre
+        if not self._registrar(registro, anterior):
+            return False
+        self._informar("Producto actualizado exitosamente.")
+        return True
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias mutaciones y las persiste una sola vez al confirmar.
+
+        Si el bloque lanza una excepción o la escritura final falla, el estado en
+        memoria se revierte. Las transacciones anidadas se unen a la externa.
+        """
+        if self._transaccion is not None:
+            yield self
+            return
+
+        # En modo compartido el bloqueo se mantiene durante toda la transacción
+        with self.sesion_compartida():
+            self._transaccion = []
+            try:
+                yield self
+            except BaseException:
+                pendientes, self._transaccion = self._transaccion, None
+                self._revertir(pendientes)
+                raise
+
+            pendientes, self._transaccion = self._transaccion, None
+            if pendientes and not self._persistir([registro for registro, _ in pendientes]):
+                self._revertir(pendientes)
+                raise OSError("No se pudo guardar la transacción; los cambios fueron revertidos.")
+            self._notificar(pendientes)
+
+    def suscribir(self, funcion):
+        """Llama a funcion(evento) con cada EventoInventario confirmado; devuelve la propia función"""
+        return self._eventos.suscribir(funcion)
+
+    def cola_eventos(self, tamaño_maximo=0):
+        """Devuelve una asyncio.Queue que recibe los EventoInventario confirmados (llamar desde una corrutina)"""
+        return self._eventos.cola(tamaño_maximo)
+
+    def desuscribir(self, suscriptor):
+        """Da de baja una función de suscribir() o una cola de cola_eventos()"""
+        self._eventos.desuscribir(suscriptor)
+
+    def posicion_cambios(self):
+        """Posición actual del final del archivo de cambios, para empezar a seguirlo desde ahora"""
+        try:
+            return os.path.getsize(self._archivo_cambios) if self._archivo_cambios else 0
+        except FileNotFoundError:
+            return 0
+
+    @en_sesion_compartida
+    def aplicar_lote(self, cambios):
+        """
+        Valida y aplica un lote de cambios de forma atómica con una única escritura.
+
+        Cada cambio es un diccionario {'id', 'cantidad', 'precio', 'nombre'} (actualización), o
+        {'op': 'añadir', 'producto': Producto} / {'op': 'eliminar', 'id': id}.
+        """
+        cambios = list(cambios)
+
+        # Validamos el lote completo simulando sus efectos sobre IDs y nombres:
+        # estado guarda el nombre actual de cada ID tocado (None si se elimina)
+        estado = {}
+        tomados = set()
+        liberados = set()
+
+        def existe(id):
+            return estado[id] is not None if id in estado else id in self._productos
+
+        def nombre_actual(id):
+            return estado[id] if id in estado else self._productos[id].get_nombre().lower()
+
+        def ocupado(nombre_lower):
+            return nombre_lower in tomados or (nombre_lower in self._nombres_index and nombre_lower not in liberados)
+
+        def tomar(nombre_lower):
+            if nombre_lower in liberados:
+                liberados.discard(nombre_lower)
+            else:
+                tomados.add(nombre_lower)
+
+        def liberar(nombre_lower):
+            if nombre_lower in tomados:
+                tomados.discard(nombre_lower)
+            else:
+                liberados.add(nombre_lower)
+
+        for i, cambio in enumerate(cambios):
+            op = cambio.get('op', 'actualizar')
+            if op == 'añadir':
+                id = cambio['producto'].get_id()
+                nombre_lower = cambio['producto'].get_nombre().lower()
+                if existe(id):
+                    print(f"Error en el cambio {i}: Ya existe un producto con el ID {id}.")
+                    return False
+                if ocupado(nombre_lower):
+                    print(f"Error en el cambio {i}: Ya existe un producto con ese nombre.")
+                    return False
+                tomar(nombre_lower)
+                estado[id] = nombre_lower
+            elif op in ('eliminar', 'actualizar'):
+                id = cambio['id']
+                if not existe(id):
+                    print(f"Error en el cambio {i}: No existe un producto con el ID {id}.")
+                    return False
+                if op == 'eliminar':
+                    liberar(nombre_actual(id))
+                    estado[id] = None
+                elif cambio.get('nombre') is not None and cambio['nombre'].lower() != nombre_actual(id):
+                    nombre_lower = cambio['nombre'].lower()
+                    if ocupado(nombre_lower):
+                        print(f"Error en el cambio {i}: Ya existe un producto con ese nombre.")
+                        return False
+                    liberar(nombre_actual(id))
+                    tomar(nombre_lower)
+                    estado[id] = nombre_lower
+            else:
+                print(f"Error en el cambio {i}: Operación desconocida '{op}'.")
+                return False
+
+        # En lotes grandes es más barato reconstruir los índices ordenados una vez que mantenerlos
+        en_bloque = self._indices_en_bloque() if len(cambios) > UMBRAL_LOTE_EN_BLOQUE else nullcontext()
+        try:
+            with en_bloque, self.transaccion():
+                for cambio in cambios:
+                    op = cambio.get('op', 'actualizar')
+                    if op == 'añadir':
+                        self.añadir_producto(cambio['producto'])
+                    elif op == 'eliminar':
+                        self.eliminar_producto(cambio['id'])
+                    else:
+                        self.actualizar_producto(cambio['id'], cambio.get('cantidad'), cambio.get('precio'),
+                                                 cambio.get('nombre'))
+        except OSError as e:
+            print(f"Error: {e}")
+            return False
+
+        self._informar(f"Lote aplicado exitosamente ({len(cambios)} cambios).")
+        return True
+
+    @en_sesion_compartida
+    def cambiar_precios(self, ids, precios):
+        """
+        Cambia el precio de muchos productos (ids y precios son listas paralelas) con un único
+        registro en el log o una única escritura del archivo. En lotes grandes los precios se
+        escriben de una vez en su columna (con el almacén columnar) y el índice de precios se
+        reconstruye una sola vez. Devuelve False sin cambiar nada si algún ID no existe.
+        """
+        ids, precios = list(ids), list(precios)
+        if len(ids) != len(precios):
+            print("Error: Hay que indicar un precio por cada ID.")
+            return False
+        for id in ids:
+            if id not in self._productos:
+                print(f"Error: No existe un producto con el ID {id}.")
+                return False
+        if not ids:
+            return True
+
+        # El registro inverso guarda también nombres y cantidades para construir los eventos
+        if isinstance(self._productos, AlmacenColumnar):
+            nombres, cantidades, anteriores = self._productos.leer_columnas(ids)
+        else:
+            productos = [self._productos[id] for id in ids]
+            nombres = [producto.get_nombre() for producto in productos]
+            cantidades = [producto.get_cantidad() for producto in productos]
+            anteriores = [producto.get_precio() for producto in productos]
+        self._aplicar_precios(ids, precios)
+        if not self._registrar({'op': 'p', 'ids': ids, 'precios': precios},
+                               {'op': 'p', 'ids': ids, 'precios': anteriores,
+                                'nombres': nombres, 'cantidades': cantidades}):
+            return False
+        self._informar(f"Precios actualizados exitosamente ({len(ids)} productos).")
+        return True
+
+    @contextmanager
+    def carga_masiva(self):
+        """
+        Bloque para importar muchos productos con añadir_productos(): los índices ordenados se
+        reconstruyen una sola vez al salir y, sin modo diario, el archivo también se escribe una
+        sola vez al salir en lugar de reescribirse con cada lote. Si esa escritura falla se lanza
+        OSError; los productos siguen en memoria hasta el siguiente guardado.
+        """
+        with self.sesion_compartida(), self._indices_en_bloque():
+            if self._guardado_diferido is not None:
+                yield self
+                return
+            self._guardado_diferido = False
+            try:
+                yield self
+            finally:
+                # Se escribe antes de reconstruir los índices, que publican los eventos pendientes
+                pendiente, self._guardado_diferido = self._guardado_diferido, None
+                if pendiente and not self.guardar_en_archivo():
+                    raise OSError("No se pudo guardar el inventario tras la carga masiva.")
+
+    def añadir_productos(self, productos):
+        """
+        Añade una lista de productos con una sola escritura. A diferencia de aplicar_lote, los
+        que repiten un ID o un nombre (del inventario o de antes en la misma lista) se rechazan
+        sin detener el resto.
+
+        Devuelve los rechazados como lista de (posición en la lista, motivo). Si la escritura
+        falla, los productos añadidos se revierten y se lanza OSError.
+        """
+        rechazados = []
+        en_bloque = self._indices_en_bloque() if len(productos) > UMBRAL_LOTE_EN_BLOQUE else nullcontext()
+        with en_bloque, self.transaccion():
+            for i, producto in enumerate(productos):
+                if producto.get_id() in self._productos:
+                    rechazados.append((i, f"ID {producto.get_id()} duplicado"))
+                elif producto.get_nombre().lower() in self._nombres_index:
+                    rechazados.append((i, f"nombre '{producto.get_nombre()}' duplicado"))
+                else:
+                    self._aplicar_alta(producto)
+                    self._registrar({'op': 'a', 'p': producto.to_dict()}, {'op': 'e', 'id': producto.get_id()})
+        return rechazados
+
+    # Operaciones internas sobre el estado en memoria (sin validar ni persistir)
+    def _aplicar_alta(self, producto):
+        self._productos[producto.get_id()] = producto
+        self._total_unidades += producto.get_cantidad()
+        self._valor_total += producto.get_cantidad() * producto.get_precio()
+        self._nombres_index.add(producto.get_nombre().lower())
+        self._trigramas.agregar(producto.get_id(), producto.get_nombre())
+        if self._aproximado is not None:
+            self._aproximado.agregar(producto.get_id(), producto.get_nombre())
+        if not self._indices_diferidos:
+            bisect.insort(self._ids_ordenados, producto.get_id())
+            self._indice_cantidad.agregar(producto.get_cantidad(), producto.get_id())
+            self._indice_precio.agregar(producto.get_precio(), producto.get_id())
+
+    def _aplicar_baja(self, id):
+        producto = self._productos.pop(id)
+        self._total_unidades -= producto.get_cantidad()
+        self._valor_total -= producto.get_cantidad() * producto.get_precio()
+        if not self._indices_diferidos:
+            del self._ids_ordenados[bisect.bisect_left(self._ids_ordenados, id)]
+            self._indice_cantidad.quitar(producto.get_cantidad(), id)
+            self._indice_precio.quitar(producto.get_precio(), id)
+        self._nombres_index.discard(producto.get_nombre().lower())
+        self._trigramas.quitar(id, producto.get_nombre())
+        if self._aproximado is not None:
+            self._aproximado.quitar(id, producto.get_nombre())
+        return producto
+
+    def _aplicar_cambio(self, id, cantidad=None, precio=None, nombre=None):
+        producto = self._productos[id]
+        if nombre is not None:
+            self._nombres_index.discard(producto.get_nombre().lower())
+            self._trigramas.quitar(id, producto.get_nombre())
+            if self._aproximado is not None:
+                self._aproximado.quitar(id, producto.get_nombre())
+            producto.set_nombre(nombre)
+            self._nombres_index.add(nombre.lower())
+            self._trigramas.agregar(id, nombre)
+            if self._aproximado is not None:
+                self._aproximado.agregar(id, nombre)
+        self._total_unidades -= producto.get_cantidad()
+        self._valor_total -= producto.get_cantidad() * producto.get_precio()
         if cantidad is not None:
+            if not self._indices_diferidos:
+                self._indice_cantidad.quitar(producto.get_cantidad(), id)
+                self._indice_cantidad.agregar(cantidad, id)
             producto.set_cantidad(cantidad)
         if precio is not None:
+            if not self._indices_diferidos:
+                self._indice_precio.quitar(producto.get_precio(), id)
+                self._indice_precio.agregar(precio, id)
             producto.set_precio(precio)
+        self._total_unidades += producto.get_cantidad()
+        self._valor_total += producto.get_cantidad() * producto.get_precio()
+
+    def _aplicar_precios(self, ids, precios):
+        """Asigna muchos precios; en lotes grandes reconstruye el índice de precios en vez de mantenerlo"""
+        if len(ids) <= UMBRAL_LOTE_EN_BLOQUE:
+            for id, precio in zip(ids, precios):
+                self._aplicar_cambio(id, precio=precio)
+            return
+        if isinstance(self._productos, AlmacenColumnar):
+            self._productos.asignar_precios(ids, precios)
+        else:
+            for id, precio in zip(ids, precios):
+                self._productos[id].set_precio(precio)
+        if self._indices_diferidos:
+            # _indices_en_bloque reconstruye el índice y la valoración al salir
+            return
+        self._indice_precio = IndiceOrdenado((precio, id) for id, _, precio in self._columnas())
+        self._valor_total = math.fsum(cantidad * precio for _, cantidad, precio in self._columnas())
 
-        self.guardar_en_archivo()
-        print("Producto actualizado exitosamente.")
+    def _columnas(self):
+        """Genera (id, cantidad, precio) de cada producto; con el almacén columnar, sin crear vistas"""
+        if isinstance(self._productos, AlmacenColumnar):
+            return self._productos.columnas()
+        return ((p.get_id(), p.get_cantidad(), p.get_precio()) for p in self._productos.values())
+
+    def _registrar(self, registro, deshacer):
+        """Persiste una mutación ya aplicada en memoria, o la deja pendiente si hay una transacción"""
+        if self._transaccion is not None:
+            self._transaccion.append((registro, deshacer))
+            return True
+
+        if not self._persistir([registro]):
+            self._aplicar_registro(deshacer)
+            return False
+        self._notificar([(registro, deshacer)])
         return True
 
+    def _notificar(self, confirmados):
+        """Publica los eventos de los registros ya confirmados en disco"""
+        if not confirmados or (self._archivo_cambios is None and not self._eventos.tiene_suscriptores()):
+            return
+        if self._indices_diferidos:
+            # Un suscriptor que consulte el inventario no debe ver los índices sin reconstruir
+            self._confirmados_diferidos.extend(confirmados)
+            return
+        eventos = list(EventoInventario.desde_registros(confirmados))
+        if self._archivo_cambios is not None:
+            try:
+                # Una sola escritura en modo append: en modo compartido además se hace con el bloqueo tomado
+                with open(self._archivo_cambios, 'ab') as f:
+                    f.write("".join(json.dumps(evento.to_dict()) + "\n" for evento in eventos).encode('utf-8'))
+            except OSError as e:
+                print(f"Error al escribir el archivo de cambios: {e}")
+        self._eventos.publicar(eventos)
+
+    def _revertir(self, pendientes):
+        # Deshacemos en orden inverso al de aplicación
+        for _, deshacer in reversed(pendientes):
+            self._aplicar_registro(deshacer)
+
+    def _informar(self, mensaje):
+        # Dentro de una transacción no se anuncia cada cambio individual
+        if self._transaccion is None:
+            print(mensaje)
+
+    def _aplicar_registro(self, registro):
+        """Reproduce un registro del log sobre el estado en memoria"""
+        op = registro['op']
+        if op == 'a':
+            producto = Producto.from_dict(registro['p'])
+            if producto.get_id() in self._productos:
+                self._aplicar_baja(producto.get_id())
+            self._aplicar_alta(producto)
+        elif op == 'e':
+            if registro['id'] in self._productos:
+                self._aplicar_baja(registro['id'])
+        elif op == 'u':
+            if registro['id'] in self._productos:
+                self._aplicar_cambio(registro['id'], registro['cantidad'], registro['precio'], registro.get('nombre'))
+        elif op == 'p':
+            existentes = [(id, precio) for id, precio in zip(registro['ids'], registro['precios'])
+                          if id in self._productos]
+            if existentes:
+                ids, precios = zip(*existentes)
+                self._aplicar_precios(ids, precios)
+
+    @en_sesion_compartida
     def buscar_por_nombre(self, nombre):
         # Usamos una lista para almacenar los resultados de la búsqueda
         resultados = []
         nombre_lower = nombre.lower()
 
-        # Buscamos en todos los productos
-        for producto in self._productos.values():
+        # Sin texto coinciden todos: el listado ya ordenado por ID
+        if not nombre_lower:
+            return [self._productos[id] for id in self._ids_ordenados]
+
+        # El índice de trigramas acota los candidatos; el `in` confirma la coincidencia
+        # (None en consultas cortas: recorrido lineal, por la lista de IDs para mantener el mismo orden)
+        candidatos = self._trigramas.candidatos(nombre_lower)
+        ids = self._ids_ordenados if candidatos is None else sorted(candidatos)
+
+        for id in ids:
+            producto = self._productos[id]
             if nombre_lower in producto.get_nombre().lower():
                 resultados.append(producto)
 
         return resultados
 
+    @en_sesion_compartida
+    def buscar_aproximado(self, texto, k=10):
+        """
+        Devuelve hasta k productos cuyo nombre se parece al texto, del más al menos parecido:
+        sin distinguir tildes ni mayúsculas, aceptando prefijos de palabras ("torn" encuentra
+        "tornillo") y hasta dos errores de tecleo por palabra ("tornilo", "martilo").
+        """
+        if self._aproximado is None:
+            self._aproximado = IndiceAproximado()
+            for producto in self._productos.values():
+                self._aproximado.agregar(producto.get_id(), producto.get_nombre())
+        return [self._productos[id] for id, _ in self._aproximado.buscar(texto, k)]
+
+    @en_sesion_compartida
     def mostrar_todos(self):
-        # Usamos una lista ordenada por ID para mostrar los productos
-        productos_ordenados = sorted(self._productos.values(), key=lambda p: p.get_id())
-        return productos_ordenados
+        # La lista de IDs ya está ordenada, así que el listado completo es O(N)
+        return [self._productos[id] for id in self._ids_ordenados]
+
+    @en_sesion_compartida
+    def productos_entre(self, id_min, id_max):
+        """Devuelve los productos con ID en el rango [id_min, id_max], ordenados por ID"""
+        inicio = bisect.bisect_left(self._ids_ordenados, id_min)
+        fin = bisect.bisect_right(self._ids_ordenados, id_max)
+        return [self._productos[id] for id in self._ids_ordenados[inicio:fin]]
+
+    @en_sesion_compartida
+    def pagina(self, offset, limite):
+        """Devuelve hasta `limite` productos ordenados por ID a partir de la posición `offset`"""
+        return [self._productos[id] for id in self._ids_ordenados[offset:offset + limite]]
+
+    @en_sesion_compartida
+    def resumen(self):
+        """Devuelve los agregados del inventario sin recorrer los productos"""
+        minimo = self._indice_precio.primero()
+        maximo = self._indice_precio.ultimo()
+        return {
+            'productos': len(self._productos),
+            'unidades': self._total_unidades,
+            'valor_total': self._valor_total,
+            'precio_minimo': minimo[0] if minimo is not None else None,
+            'precio_maximo': maximo[0] if maximo is not None else None,
+        }
+
+    @en_sesion_compartida
+    def bajo_stock(self, umbral):
+        """Devuelve los productos con cantidad < umbral, de menor a mayor cantidad"""
+        return [self._productos[id] for id in self._indice_cantidad.menores_que(umbral)]
+
+    @en_sesion_compartida
+    def rango_precio(self, minimo, maximo):
+        """Devuelve los productos con minimo <= precio <= maximo, de menor a mayor precio"""
+        return [self._productos[id] for id in self._indice_precio.entre(minimo, maximo)]
+
+    def _persistir(self, registros):
+        """Persiste mutaciones: reescritura completa o, en modo diario, registros en el log"""
+        if not self._diario:
+            if self._guardado_diferido is not None:
+                # Dentro de carga_masiva() el archivo se escribe una sola vez al salir
+                self._guardado_diferido = True
+                return True
+            return self.guardar_en_archivo()
 
-    def guardar_en_archivo(self):
         try:
-            with open(self._archivo, 'w') as f:
-                # Convertimos todos los productos a diccionarios y los guardamos como JSON
-                datos = [producto.to_dict() for producto in self._productos.values()]
-                json.dump(datos, f, indent=4)
+            if self._log is None:
+                self._log = self._abrir_log()
+            self._log.write("".join(json.dumps(registro, separators=(',', ':')) + "\n" for registro in registros))
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            if self._log.tell() >= self._umbral_compactacion:
+                self._compactar()
+            return True
         except Exception as e:
-            print(f"Error al guardar en archivo: {e}")
+            print(f"Error al escribir en el log: {e}")
+            return False
 
-    def cargar_desde_archivo(self):
-        if not os.path.exists(self._archivo):
+    def _abrir_log(self):
+        # Si una caída dejó un registro a medias, lo cerramos con un salto de línea
+        # para que el siguiente registro no quede pegado a él
+        log = open(self._archivo_log, 'a+')
+        if log.tell() > 0:
+            log.seek(log.tell() - 1)
+            if log.read(1) != "\n":
+                log.write("\n")
+        return log
+
+    def _compactar(self):
+        """Rota el log y escribe en segundo plano una instantánea que lo incorpora"""
+        if self._compactacion is not None and self._compactacion.is_alive():
+            return
+
+        if os.path.exists(self._archivo_log + ".compactando"):
+            # Una compactación anterior falló y su log rotado no está en ninguna instantánea:
+            # rotar encima lo perdería. La instantánea se escribe aquí mismo y el log solo se
+            # vacía si se pudo escribir; si no, se sigue añadiendo al log actual
+            datos = [producto.to_dict() for producto in self._productos.values()]
+            if self._escribir_instantanea(datos):
+                self._log.truncate(0)
+            return
+
+        # Las mutaciones posteriores van a un log nuevo mientras se escribe la instantánea
+        self._log.close()
+        os.replace(self._archivo_log, self._archivo_log + ".compactando")
+        self._log = open(self._archivo_log, 'a')
+
+        datos = [producto.to_dict() for producto in self._productos.values()]
+        if self._compartido:
+            # Con varios procesos la compactación debe terminar mientras se mantiene el bloqueo
+            self._escribir_instantanea(datos)
             return
+        self._compactacion = threading.Thread(target=self._escribir_instantanea, args=(datos,))
+        self._compactacion.start()
 
+    def _escribir_instantanea(self, datos):
         try:
-            with open(self._archivo, 'r') as f:
-                datos = json.load(f)
-                for item in datos:
-                    producto = Producto.from_dict(item)
-                    self._productos[producto.get_id()] = producto
-                    self._nombres_index.add(producto.get_nombre().lower())
+            with escritura_atomica(self._archivo) as f:
+                escribir_productos(f, datos, es_json_lines(self._archivo))
+            # El log rotado ya está incorporado en la instantánea
+            if os.path.exists(self._archivo_log + ".compactando"):
+                os.remove(self._archivo_log + ".compactando")
+            return True
         except Exception as e:
-            print(f"Error al cargar desde archivo: {e}")
+            print(f"Error al compactar el inventario: {e}")
+            return False
+
+    def cerrar(self):
+        """Espera a que termine una compactación pendiente y cierra el log"""
+        self._esperar_carga()
+        if self._compactacion is not None:
+            self._compactacion.join()
+            self._compactacion = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def guardar_en_archivo(self):
+        self._esperar_carga()
+        if not self._diario:
+            try:
+                with escritura_atomica(self._archivo) as f:
+                    # Convertimos los productos a diccionarios y los escribimos uno a uno
+                    datos = (producto.to_dict() for producto in self._productos.values())
+                    escribir_productos(f, datos, es_json_lines(self._archivo))
+                return True
+            except Exception as e:
+                print(f"Error al guardar en archivo: {e}")
+                return False
 
+        # En modo diario guardar equivale a compactar de forma síncrona y vaciar el log
+        self.cerrar()
+        datos = [producto.to_dict() for producto in self._productos.values()]
+        if not self._escribir_instantanea(datos):
+            return False
+        open(self._archivo_log, 'w').close()
+        return True
+
+    def cargar_desde_archivo(self):
+        self._esperar_carga()
+        with self._indices_en_bloque():
+            self._cargar_productos()
 
-def mostrar_menu():
+    @contextmanager
+    def _indices_en_bloque(self):
+        """
+        Difiere el mantenimiento de los índices ordenados y los reconstruye al salir:
+        insertar ordenadamente uno a uno sería O(N) por cambio, O(N²) en total.
+        """
+        if self._indices_diferidos:
+            yield
+            return
+
+        self._indices_diferidos = True
+        try:
+            yield
+        finally:
+            self._indices_diferidos = False
+            self._ids_ordenados = sorted(self._productos)
+            productos = self._productos.values()
+            self._indice_cantidad = IndiceOrdenado((p.get_cantidad(), p.get_id()) for p in productos)
+            self._indice_precio = IndiceOrdenado((p.get_precio(), p.get_id()) for p in productos)
+            # Recalculamos los agregados: la valoración con fsum para no arrastrar el error de
+            # redondeo acumulado, y ambos para no contar productos sustituidos por un ID repetido
+            self._total_unidades = sum(p.get_cantidad() for p in productos)
+            self._valor_total = math.fsum(p.get_cantidad() * p.get_precio() for p in productos)
+            confirmados, self._confirmados_diferidos = self._confirmados_diferidos, []
+            self._notificar(confirmados)
+
+    def _cargar_productos(self):
+        if os.path.exists(self._archivo):
+            try:
+                # Construimos cada Producto a medida que se lee, sin materializar la lista de dicts
+                for producto in leer_productos(self._archivo, self._progreso):
+                    self._aplicar_alta(producto)
+            except Exception as e:
+                print(f"Error al cargar desde archivo: {e}")
+
+        if not self._diario:
+            return
+
+        # Reproducimos el log rotado de una compactación interrumpida y luego el log actual
+        rotado = self._archivo_log + ".compactando"
+        for ruta in (rotado, self._archivo_log):
+            if os.path.exists(ruta):
+                try:
+                    with open(ruta, 'r') as f:
+                        for linea in f:
+                            try:
+                                registro = json.loads(linea)
+                            except ValueError:
+                                # Registro truncado por una caída a mitad de escritura
+                                continue
+                            self._aplicar_registro(registro)
+                except Exception as e:
+                    print(f"Error al reproducir el log {ruta}: {e}")
+
+        if os.path.exists(rotado):
+            self.guardar_en_archivo()
+
+
+# Extensiones de archivo que abrir_inventario asocia al almacenamiento SQLite
+EXTENSIONES_SQLITE = ('.db', '.sqlite', '.sqlite3')
+# Los directorios con esta extensión guardan un inventario repartido en fragmentos
+EXTENSION_FRAGMENTADO = '.fragmentos'
+
+
+def abrir_inventario(archivo="inventario.json", **opciones):
+    """
+    Abre el inventario con el almacenamiento que corresponde al archivo: SQLite para .db,
+    .sqlite y .sqlite3 (ver almacen_sqlite.py), varios archivos JSON para un directorio
+    .fragmentos (ver inventario_fragmentado.py) y JSON en memoria para el resto. Las opciones
+    (diario, columnar, compartido...) se aplican al almacenamiento JSON; SQLite solo usa compartido.
+    """
+    if archivo.endswith(EXTENSIONES_SQLITE):
+        from almacen_sqlite import InventarioSQLite
+        return InventarioSQLite(archivo, compartido=opciones.get('compartido', False))
+    if archivo.rstrip(os.sep).endswith(EXTENSION_FRAGMENTADO):
+        from inventario_fragmentado import InventarioFragmentado
+        return InventarioFragmentado(archivo.rstrip(os.sep), **opciones)
+    return Inventario(archivo, **opciones)
+
+
+def mostrar_menu(progreso_carga=None):
     print("\n--- Sistema de Gestión de Inventario ---")
+    if progreso_carga is not None:
+        leidos, total = progreso_carga
+        print(f"(Cargando inventario en segundo plano: {leidos * 100 // max(total, 1)}%)")
     print("1. Añadir nuevo producto")
     print("2. Eliminar producto por ID")
     print("3. Actualizar cantidad o precio de un producto")
@@ -156,10 +1638,17 @@ def mostrar_menu():
 
 
 def main():
-    inventario = Inventario()
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Inventario")
+    # Se puede indicar otro archivo de inventario, por ejemplo inventario.db para usar SQLite
+    # o un directorio inventario.fragmentos para repartirlo en varios archivos
+    parser.add_argument("archivo", nargs="?", default="inventario.json")
+    parser.add_argument("--segundo-plano", action="store_true",
+                        help="Mostrar el menú de inmediato y cargar el archivo en segundo plano")
+    args = parser.parse_args()
+    inventario = abrir_inventario(args.archivo, en_segundo_plano=args.segundo_plano)
 
     while True:
-        mostrar_menu()
+        mostrar_menu(inventario.progreso_carga())
         opcion = input("Seleccione una opción: ")
 
         if opcion == "1":
@@ -214,19 +1703,29 @@ def main():
                 for producto in resultados:
                     print(producto)
             else:
-                print("No se encontraron productos con ese nombre.")
+                # Sin coincidencias exactas, sugerimos nombres parecidos (el almacén SQLite no lo permite)
+                parecidos = inventario.buscar_aproximado(nombre, 5) if hasattr(inventario, 'buscar_aproximado') else []
+                if parecidos:
+                    print("\nNo hay coincidencias exactas. Productos parecidos:")
+                    for producto in parecidos:
+                        print(producto)
+                else:
+                    print("No se encontraron productos con ese nombre.")
 
         elif opcion == "5":
-            productos = inventario.mostrar_todos()
+            # Con SQLite mostrar_todos recorre los productos por páginas en lugar de devolver una lista
+            vacio = True
+            for producto in inventario.mostrar_todos():
+                if vacio:
+                    print("\nTodos los productos en el inventario:")
+                    vacio = False
+                print(producto)
 
-            if productos:
-                print("\nTodos los productos en el inventario:")
-                for producto in productos:
-                    print(producto)
-            else:
+            if vacio:
                 print("El inventario está vacío.")
 
         elif opcion == "6":
+            inventario.cerrar()
             print("Saliendo del sistema...")
             break
 
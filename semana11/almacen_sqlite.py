@@ -0,0 +1,313 @@
+"""
+Almacenamiento SQLite para el Inventario, con los mismos métodos públicos que Inventario.
+
+A diferencia del almacenamiento JSON, los productos no se cargan en memoria: cada cambio es
+una escritura puntual sobre la base de datos (modo WAL), la búsqueda por nombre usa un
+índice FTS5 de trigramas y el listado completo se recorre por páginas.
+
+Se elige abriendo un archivo .db, .sqlite o .sqlite3 con abrir_inventario(), o directamente:
+
+    inventario = InventarioSQLite("inventario.db")
+
+Varios procesos pueden usar la misma base de datos a la vez: SQLite se encarga del bloqueo.
+
+obtener_producto pasa por una CacheLRU de tamaño acotado (tamaño_cache) con los productos
+consultados por ID más recientemente. Los cambios de esta conexión actualizan la caché; si
+otros procesos también modifican la base de datos hay que abrirla con compartido=True, y
+cada consulta por ID comprueba antes (con PRAGMA data_version) si hay cambios de otra
+conexión y, en ese caso, vacía la caché. Sin compartido, un acierto de caché no consulta
+SQLite.
+"""
+import sqlite3
+from contextlib import contextmanager
+
+from SistemaAvanzadodeGestióndeInventario import CacheLRU, Producto
+
+# Productos leídos por consulta al recorrer el inventario completo
+TAMAÑO_PAGINA = 1000
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_lower TEXT NOT NULL UNIQUE,
+    cantidad INTEGER NOT NULL,
+    precio REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS productos_cantidad ON productos (cantidad, id);
+CREATE INDEX IF NOT EXISTS productos_precio ON productos (precio, id);
+"""
+
+# Índice de texto completo sincronizado con la tabla mediante disparadores
+_ESQUEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts
+    USING fts5(nombre_lower, content='productos', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS productos_fts_alta AFTER INSERT ON productos BEGIN
+    INSERT INTO productos_fts (rowid, nombre_lower) VALUES (new.id, new.nombre_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS productos_fts_baja AFTER DELETE ON productos BEGIN
+    INSERT INTO productos_fts (productos_fts, rowid, nombre_lower) VALUES ('delete', old.id, old.nombre_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS productos_fts_cambio AFTER UPDATE OF nombre_lower ON productos BEGIN
+    INSERT INTO productos_fts (productos_fts, rowid, nombre_lower) VALUES ('delete', old.id, old.nombre_lower);
+    INSERT INTO productos_fts (rowid, nombre_lower) VALUES (new.id, new.nombre_lower);
+END;
+"""
+
+_COLUMNAS = "id, nombre, cantidad, precio"
+
+
+class InventarioSQLite:
+    def __init__(self, archivo="inventario.db", tamaño_cache=1024, compartido=False):
+        self._archivo = archivo
+        self.cache = CacheLRU(tamaño_cache)
+        self._compartido = compartido
+        # Sin transacciones implícitas: cada sentencia se confirma sola salvo dentro de transaccion()
+        self._conexion = sqlite3.connect(archivo, timeout=30, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        # FULL sincroniza el WAL en cada confirmación, igual que el log del Inventario JSON
+        self._conexion.execute("PRAGMA synchronous=FULL")
+        self._conexion.executescript(_ESQUEMA)
+        try:
+            self._conexion.executescript(_ESQUEMA_FTS)
+            self._fts = True
+        except sqlite3.OperationalError:
+            # SQLite sin FTS5 o anterior a 3.34 (sin tokenizador trigram): búsqueda por recorrido
+            self._fts = False
+        self._profundidad = 0
+        self._version_datos = self._conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    def _consultar(self, sql, parametros=()):
+        return [Producto(*fila) for fila in self._conexion.execute(sql, parametros)]
+
+    def _informar(self, mensaje):
+        # Dentro de una transacción no se anuncia cada cambio individual
+        if self._profundidad == 0:
+            print(mensaje)
+
+    # Operaciones sin anunciar: devuelven None si se aplicaron o el mensaje de error
+    def _alta(self, producto):
+        try:
+            self._conexion.execute(f"INSERT INTO productos ({_COLUMNAS}, nombre_lower) VALUES (?, ?, ?, ?, ?)",
+                                   (producto.get_id(), producto.get_nombre(), producto.get_cantidad(),
+                                    producto.get_precio(), producto.get_nombre().lower()))
+        except sqlite3.IntegrityError as e:
+            if "nombre_lower" in str(e):
+                return "Ya existe un producto con ese nombre."
+            return f"Ya existe un producto con el ID {producto.get_id()}."
+        return None
+
+    def _baja(self, id):
+        self.cache.descartar(id)
+        if self._conexion.execute("DELETE FROM productos WHERE id = ?", (id,)).rowcount == 0:
+            return f"No existe un producto con el ID {id}."
+        return None
+
+    def _cambio(self, id, cantidad=None, precio=None, nombre=None):
+        self.cache.descartar(id)
+        try:
+            cursor = self._conexion.execute(
+                "UPDATE productos SET cantidad = COALESCE(?, cantidad), precio = COALESCE(?, precio), "
+                "nombre = COALESCE(?, nombre), nombre_lower = COALESCE(?, nombre_lower) WHERE id = ?",
+                (cantidad, precio, nombre, nombre.lower() if nombre is not None else None, id))
+        except sqlite3.IntegrityError:
+            return "Ya existe un producto con ese nombre."
+        if cursor.rowcount == 0:
+            return f"No existe un producto con el ID {id}."
+        return None
+
+    def _leer_producto(self, id):
+        fila = self._conexion.execute(f"SELECT {_COLUMNAS} FROM productos WHERE id = ?", (id,)).fetchone()
+        return Producto(*fila) if fila is not None else None
+
+    def obtener_producto(self, id):
+        """Devuelve el producto con ese ID, o None si no existe"""
+        if self._compartido:
+            # data_version cambia cuando otra conexión confirma cambios: lo que hay en caché puede estar desactualizado
+            version = self._conexion.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._version_datos:
+                self.cache.limpiar()
+                self._version_datos = version
+        return self.cache.obtener(id, self._leer_producto)
+
+    def añadir_producto(self, producto):
+        error = self._alta(producto)
+        if error is not None:
+            print(f"Error: {error}")
+            return False
+        self._informar("Producto añadido exitosamente.")
+        return True
+
+    def eliminar_producto(self, id):
+        error = self._baja(id)
+        if error is not None:
+            print(f"Error: {error}")
+            return False
+        self._informar("Producto eliminado exitosamente.")
+        return True
+
+    def actualizar_producto(self, id, cantidad=None, precio=None, nombre=None):
+        error = self._cambio(id, cantidad, precio, nombre)
+        if error is not None:
+            print(f"Error: {error}")
+            return False
+        self._informar("Producto actualizado exitosamente.")
+        return True
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias mutaciones en una transacción de SQLite confirmada una sola vez.
+
+        Si el bloque lanza una excepción se deshacen todos sus cambios. Las transacciones
+        anidadas se unen a la externa.
+        """
+        if self._profundidad > 0:
+            self._profundidad += 1
+            try:
+                yield self
+            finally:
+                self._profundidad -= 1
+            return
+
+        # IMMEDIATE toma el bloqueo de escritura al empezar, no al primer cambio
+        self._conexion.execute("BEGIN IMMEDIATE")
+        self._profundidad = 1
+        try:
+            yield self
+        except BaseException:
+            self._profundidad = 0
+            self._conexion.execute("ROLLBACK")
+            # La caché pudo guardar productos leídos con cambios que ya no existen
+            self.cache.limpiar()
+            raise
+
+        self._profundidad = 0
+        try:
+            self._conexion.execute("COMMIT")
+        except sqlite3.Error as e:
+            if self._conexion.in_transaction:
+                self._conexion.execute("ROLLBACK")
+            self.cache.limpiar()
+            raise OSError(f"No se pudo guardar la transacción; los cambios fueron revertidos ({e}).")
+
+    def aplicar_lote(self, cambios):
+        """
+        Aplica un lote de cambios de forma atómica: si alguno falla no se aplica ninguno.
+
+        Cada cambio es un diccionario {'id', 'cantidad', 'precio', 'nombre'} (actualización), o
+        {'op': 'añadir', 'producto': Producto} / {'op': 'eliminar', 'id': id}.
+        """
+        cambios = list(cambios)
+        try:
+            with self.transaccion():
+                # El punto de guardado permite descartar solo el lote si hay una transacción externa
+                self._conexion.execute("SAVEPOINT lote")
+                for i, cambio in enumerate(cambios):
+                    op = cambio.get('op', 'actualizar')
+                    if op == 'añadir':
+                        error = self._alta(cambio['producto'])
+                    elif op == 'eliminar':
+                        error = self._baja(cambio['id'])
+                    elif op == 'actualizar':
+                        error = self._cambio(cambio['id'], cambio.get('cantidad'), cambio.get('precio'),
+                                             cambio.get('nombre'))
+                    else:
+                        error = f"Operación desconocida '{op}'."
+                    if error is not None:
+                        self._conexion.execute("ROLLBACK TO lote")
+                        self._conexion.execute("RELEASE lote")
+                        self.cache.limpiar()
+                        print(f"Error en el cambio {i}: {error}")
+                        return False
+                self._conexion.execute("RELEASE lote")
+        except OSError as e:
+            print(f"Error: {e}")
+            return False
+
+        self._informar(f"Lote aplicado exitosamente ({len(cambios)} cambios).")
+        return True
+
+    def buscar_por_nombre(self, nombre):
+        nombre_lower = nombre.lower()
+        # El tokenizador trigram no indexa consultas de menos de tres caracteres
+        if self._fts and len(nombre_lower) >= 3:
+            # El índice acota los candidatos; instr confirma la coincidencia exacta con lower() de Python
+            frase = '"' + nombre_lower.replace('"', '""') + '"'
+            return self._consultar(
+                f"SELECT {_COLUMNAS} FROM productos WHERE id IN "
+                "(SELECT rowid FROM productos_fts WHERE productos_fts MATCH ?) "
+                "AND instr(nombre_lower, ?) > 0 ORDER BY id", (frase, nombre_lower))
+        return self._consultar(f"SELECT {_COLUMNAS} FROM productos WHERE instr(nombre_lower, ?) > 0 ORDER BY id",
+                               (nombre_lower,))
+
+    def mostrar_todos(self):
+        """Recorre todos los productos ordenados por ID, leyendo una página cada vez"""
+        ultimo = None
+        while True:
+            if ultimo is None:
+                pagina = self._consultar(f"SELECT {_COLUMNAS} FROM productos ORDER BY id LIMIT ?",
+                                         (TAMAÑO_PAGINA,))
+            else:
+                pagina = self._consultar(f"SELECT {_COLUMNAS} FROM productos WHERE id > ? ORDER BY id LIMIT ?",
+                                         (ultimo, TAMAÑO_PAGINA))
+            yield from pagina
+            if len(pagina) < TAMAÑO_PAGINA:
+                return
+            ultimo = pagina[-1].get_id()
+
+    def productos_entre(self, id_min, id_max):
+        """Devuelve los productos con ID en el rango [id_min, id_max], ordenados por ID"""
+        return self._consultar(f"SELECT {_COLUMNAS} FROM productos WHERE id BETWEEN ? AND ? ORDER BY id",
+                               (id_min, id_max))
+
+    def pagina(self, offset, limite):
+        """Devuelve hasta `limite` productos ordenados por ID a partir de la posición `offset`"""
+        return self._consultar(f"SELECT {_COLUMNAS} FROM productos ORDER BY id LIMIT ? OFFSET ?", (limite, offset))
+
+    def resumen(self):
+        """Devuelve los agregados del inventario (mínimo y máximo de precio salen del índice)"""
+        productos, unidades, valor_total, minimo, maximo = self._conexion.execute(
+            "SELECT COUNT(*), COALESCE(SUM(cantidad), 0), TOTAL(cantidad * precio), MIN(precio), MAX(precio) "
+            "FROM productos").fetchone()
+        return {
+            'productos': productos,
+            'unidades': unidades,
+            'valor_total': valor_total,
+            'precio_minimo': minimo,
+            'precio_maximo': maximo,
+        }
+
+    def bajo_stock(self, umbral):
+        """Devuelve los productos con cantidad < umbral, de menor a mayor cantidad"""
+        return self._consultar(f"SELECT {_COLUMNAS} FROM productos WHERE cantidad < ? ORDER BY cantidad, id",
+                               (umbral,))
+
+    def rango_precio(self, minimo, maximo):
+        """Devuelve los productos con minimo <= precio <= maximo, de menor a mayor precio"""
+        return self._consultar(f"SELECT {_COLUMNAS} FROM productos WHERE precio BETWEEN ? AND ? "
+                               "ORDER BY precio, id", (minimo, maximo))
+
+    def guardar_en_archivo(self):
+        # Cada cambio ya está confirmado en la base de datos; solo volcamos el WAL al archivo principal
+        try:
+            self._conexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al guardar en archivo: {e}")
+            return False
+
+    def cargar_desde_archivo(self):
+        # Los productos se leen de la base de datos bajo demanda; no hay nada que cargar
+        pass
+
+    def progreso_carga(self):
+        # No hay nada que cargar al abrir: los productos se leen bajo demanda
+        return None
+
+    def cerrar(self):
+        """Actualiza las estadísticas del planificador y cierra la conexión"""
+        if self._conexion is not None:
+            self._conexion.execute("PRAGMA optimize")
+            self._conexion.close()
+            self._conexion = None
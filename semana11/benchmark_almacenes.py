@@ -0,0 +1,80 @@
+"""
+Comparación de los almacenamientos del Inventario: JSON en memoria (con log de operaciones)
+frente a SQLite, en inserción masiva, actualizaciones individuales, búsqueda y apertura.
+
+Uso:
+    python benchmark_almacenes.py --productos 200000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, Producto
+from almacen_sqlite import InventarioSQLite
+from benchmark_inventario import medir, nombre_aleatorio
+
+
+def productos_sinteticos(n, semilla=42):
+    rng = random.Random(semilla)
+    return [Producto(i, nombre_aleatorio(rng, i), rng.randint(0, 500), round(rng.uniform(0.5, 500), 2))
+            for i in range(n)]
+
+
+def abrir(tipo, directorio):
+    if tipo == "JSON":
+        return Inventario(archivo=os.path.join(directorio, "inventario.json"), diario=True)
+    return InventarioSQLite(os.path.join(directorio, "inventario.db"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los almacenamientos JSON y SQLite del Inventario")
+    parser.add_argument("--productos", type=int, default=100000)
+    parser.add_argument("--actualizaciones", type=int, default=1000,
+                        help="Actualizaciones individuales, cada una confirmada en disco")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    productos = productos_sinteticos(args.productos)
+    rng = random.Random(7)
+    ids = [rng.randrange(args.productos) for _ in range(args.actualizaciones)]
+    consultas = ["abc", "xyz q", "lmno", "ab", "99", "zzzzzz"]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for tipo in ("JSON", "SQLite"):
+            print(f"\n--- {tipo} ---")
+            inventario = abrir(tipo, directorio)
+            # Los mensajes de cada operación no forman parte de la medición
+            with contextlib.redirect_stdout(io.StringIO()):
+                segundos = medir(lambda: inventario.aplicar_lote({'op': 'añadir', 'producto': p} for p in productos))
+            print(f"Inserción de {args.productos} productos en un lote: {segundos:.2f} s")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                inicio = time.perf_counter()
+                for id in ids:
+                    inventario.actualizar_producto(id, cantidad=rng.randint(0, 500))
+                segundos = time.perf_counter() - inicio
+            print(f"{args.actualizaciones} actualizaciones individuales: "
+                  f"{args.actualizaciones / segundos:.0f} por segundo")
+
+            for consulta in consultas:
+                segundos = medir(lambda: inventario.buscar_por_nombre(consulta), args.repeticiones)
+                print(f"buscar_por_nombre('{consulta}'): {len(inventario.buscar_por_nombre(consulta))} resultados "
+                      f"en {segundos * 1000:.2f} ms")
+            segundos = medir(lambda: inventario.bajo_stock(5), args.repeticiones)
+            print(f"bajo_stock(5): {segundos * 1000:.2f} ms | pagina(50000, 50): "
+                  f"{medir(lambda: inventario.pagina(50000, 50), args.repeticiones) * 1000:.3f} ms")
+            inventario.cerrar()
+
+            inicio = time.perf_counter()
+            inventario = abrir(tipo, directorio)
+            primero = inventario.obtener_producto(0)
+            print(f"Apertura y primera consulta: {time.perf_counter() - inicio:.2f} s ({primero.get_nombre()!r})")
+            inventario.cerrar()
+
+
+if __name__ == "__main__":
+    main()
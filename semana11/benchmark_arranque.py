@@ -0,0 +1,69 @@
+"""
+Tiempo hasta el primer menú con carga completa frente a carga en segundo plano, y tiempo
+de respuesta de las consultas por ID mientras el archivo todavía se está leyendo.
+
+Uso:
+    python benchmark_arranque.py --productos 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, escribir_productos
+
+PROMPT = "Seleccione una opción".encode('utf-8')
+
+
+def crear_archivo(ruta, n):
+    with open(ruta, 'w') as f:
+        escribir_productos(f, ({'id': i, 'nombre': f"producto {i}", 'cantidad': i % 500,
+                                'precio': round(0.5 + i % 1000 / 10, 2)} for i in range(n)))
+
+
+def tiempo_hasta_menu(ruta, opciones):
+    """Arranca el programa y mide cuánto tarda en pedir la primera opción del menú"""
+    programa = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SistemaAvanzadodeGestióndeInventario.py")
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, programa, ruta, *opciones],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    salida = b""
+    try:
+        while PROMPT not in salida:
+            bloque = os.read(proceso.stdout.fileno(), 4096)
+            if not bloque:
+                raise RuntimeError("El programa terminó sin mostrar el menú")
+            salida += bloque
+        return time.perf_counter() - inicio
+    finally:
+        proceso.kill()
+        proceso.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque del inventario")
+    parser.add_argument("--productos", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "inventario.json")
+        crear_archivo(ruta, args.productos)
+        print(f"Archivo de {args.productos} productos ({os.path.getsize(ruta) / 1024 / 1024:.0f} MB)")
+
+        print(f"Primer menú con carga completa: {tiempo_hasta_menu(ruta, []):.2f} s")
+        print(f"Primer menú con carga en segundo plano: {tiempo_hasta_menu(ruta, ['--segundo-plano']):.2f} s")
+
+        inicio = time.perf_counter()
+        inventario = Inventario(ruta, en_segundo_plano=True)
+        for id in (0, args.productos // 2, args.productos - 1):
+            producto = inventario.obtener_producto(id)
+            print(f"obtener_producto({id}) respondido a los {time.perf_counter() - inicio:.2f} s "
+                  f"({producto.get_nombre()!r})")
+        inventario.cerrar()
+        print(f"Carga completa a los {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
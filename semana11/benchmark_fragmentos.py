@@ -0,0 +1,60 @@
+"""
+Inventario en un solo archivo JSON frente a InventarioFragmentado: apertura, coste de cada
+cambio (sin log de operaciones, cada cambio reescribe el archivo afectado) y búsqueda por nombre.
+
+Uso:
+    python benchmark_fragmentos.py --productos 200000 --fragmentos 16
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, escribir_productos
+from benchmark_almacenes import productos_sinteticos
+from benchmark_inventario import medir
+from inventario_fragmentado import InventarioFragmentado, repartir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del inventario fragmentado")
+    parser.add_argument("--productos", type=int, default=100000)
+    parser.add_argument("--fragmentos", type=int, default=8)
+    parser.add_argument("--actualizaciones", type=int, default=50)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    ids = [rng.randrange(args.productos) for _ in range(args.actualizaciones)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "inventario.json")
+        with open(archivo, 'w') as f:
+            escribir_productos(f, (p.to_dict() for p in productos_sinteticos(args.productos)))
+        fragmentado = os.path.join(directorio, "inventario.fragmentos")
+        repartir(archivo, fragmentado, args.fragmentos)
+
+        for tipo, abrir in (("Un archivo", lambda: Inventario(archivo)),
+                            (f"{args.fragmentos} fragmentos", lambda: InventarioFragmentado(fragmentado))):
+            print(f"\n--- {tipo} ---")
+            with contextlib.redirect_stdout(io.StringIO()):
+                inicio = time.perf_counter()
+                inventario = abrir()
+                apertura = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                for id in ids:
+                    inventario.actualizar_producto(id, cantidad=rng.randint(0, 500))
+                cambio = (time.perf_counter() - inicio) / len(ids)
+            print(f"Apertura: {apertura:.2f} s | cada actualización: {cambio * 1000:.1f} ms")
+            for consulta in ("abc", "ab", "99"):
+                segundos = medir(lambda: inventario.buscar_por_nombre(consulta), args.repeticiones)
+                print(f"buscar_por_nombre('{consulta}'): {len(inventario.buscar_por_nombre(consulta))} resultados "
+                      f"en {segundos * 1000:.2f} ms")
+            inventario.cerrar()
+
+
+if __name__ == "__main__":
+    main()
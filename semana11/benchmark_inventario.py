@@ -0,0 +1,208 @@
+"""
+Mediciones de rendimiento del Inventario de la semana 11.
+
+Uso:
+    python benchmark_inventario.py --productos 500000
+"""
+import argparse
+import json
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+
+from SistemaAvanzadodeGestióndeInventario import AlmacenColumnar, Inventario, Producto, leer_productos
+
+
+def nombre_aleatorio(rng, i):
+    """Genera un nombre único con palabras pseudoaleatorias"""
+    palabras = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+                for _ in range(rng.randint(1, 3))]
+    return f"{' '.join(palabras)} {i}"
+
+
+def crear_inventario(directorio, n, semilla=42):
+    """Crea un inventario con n productos sintéticos usando una sola escritura"""
+    rng = random.Random(semilla)
+    inventario = Inventario(archivo=os.path.join(directorio, "inventario.json"))
+    with inventario.transaccion():
+        for i in range(n):
+            inventario.añadir_producto(Producto(i, nombre_aleatorio(rng, i), rng.randint(0, 500),
+                                                round(rng.uniform(0.5, 500), 2)))
+    return inventario
+
+
+def medir(funcion, repeticiones=1):
+    """Devuelve el tiempo medio en segundos de una llamada a funcion"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def busqueda_lineal(inventario, nombre):
+    """Búsqueda original: recorre todos los productos comparando el nombre en minúsculas"""
+    nombre_lower = nombre.lower()
+    return [p for p in inventario._productos.values() if nombre_lower in p.get_nombre().lower()]
+
+
+def benchmark_busqueda(inventario, repeticiones):
+    print("\n--- Búsqueda por nombre: recorrido lineal vs índice de trigramas ---")
+    consultas = ["abc", "xyz q", "lmno", "ab", "99", "zzzzzz", ""]
+    for consulta in consultas:
+        lineal = medir(lambda: busqueda_lineal(inventario, consulta), repeticiones)
+        indice = medir(lambda: inventario.buscar_por_nombre(consulta), repeticiones)
+        ids = [p.get_id() for p in inventario.buscar_por_nombre(consulta)]
+        # Mismos productos que el recorrido lineal, y siempre en orden de ID
+        assert ids == sorted(p.get_id() for p in busqueda_lineal(inventario, consulta))
+        encontrados = len(ids)
+        print(f"'{consulta}': {encontrados} resultados | lineal {lineal * 1000:.2f} ms | "
+              f"índice {indice * 1000:.3f} ms | x{lineal / max(indice, 1e-9):.0f}")
+
+
+def benchmark_busqueda_aproximada(inventario, repeticiones):
+    print("\n--- Búsqueda aproximada (prefijos y errores de tecleo) ---")
+    construccion = medir(lambda: inventario.buscar_aproximado("x", 1))
+    print(f"construcción del índice (primera búsqueda): {construccion:.2f} s")
+    rng = random.Random(7)
+    ids = inventario._ids_ordenados
+    nombres = [inventario._productos[ids[rng.randrange(len(ids))]].get_nombre().split() for _ in range(4)]
+    consultas = [nombres[0][0][:-1] + "x",                          # una letra cambiada
+                 nombres[1][0][1:],                                 # falta la primera letra
+                 nombres[2][0][:3],                                 # prefijo
+                 f"{nombres[3][0].upper()} {nombres[3][-1]}",       # dos palabras (AND)
+                 "zzzzzzzz"]
+    for consulta in consultas:
+        tiempo = medir(lambda: inventario.buscar_aproximado(consulta, 10), repeticiones)
+        encontrados = inventario.buscar_aproximado(consulta, 10)
+        primero = encontrados[0].get_nombre() if encontrados else "-"
+        print(f"'{consulta}': {len(encontrados)} resultados ({primero!r}) | {tiempo * 1000:.2f} ms")
+
+
+def benchmark_listado(inventario, repeticiones):
+    print("\n--- Listado completo y consultas por rango de ID ---")
+    reordenar = medir(lambda: sorted(inventario._productos.values(), key=lambda p: p.get_id()), repeticiones)
+    listado = medir(inventario.mostrar_todos, repeticiones)
+    print(f"mostrar_todos: reordenando {reordenar * 1000:.2f} ms | lista ordenada {listado * 1000:.2f} ms")
+    rango = medir(lambda: inventario.productos_entre(1000, 1100), repeticiones)
+    pagina = medir(lambda: inventario.pagina(5000, 50), repeticiones)
+    print(f"productos_entre (100 IDs) {rango * 1000:.3f} ms | pagina (50) {pagina * 1000:.3f} ms")
+
+
+def benchmark_indices_secundarios(inventario, repeticiones):
+    print("\n--- Bajo stock y rango de precio: recorrido completo vs índices ordenados ---")
+    productos = inventario._productos
+    lineal = medir(lambda: [p for p in productos.values() if p.get_cantidad() < 10], repeticiones)
+    indice = medir(lambda: inventario.bajo_stock(10), repeticiones)
+    print(f"bajo_stock(10): {len(inventario.bajo_stock(10))} resultados | lineal {lineal * 1000:.2f} ms | "
+          f"índice {indice * 1000:.3f} ms")
+    lineal = medir(lambda: [p for p in productos.values() if 100 <= p.get_precio() <= 101], repeticiones)
+    indice = medir(lambda: inventario.rango_precio(100, 101), repeticiones)
+    print(f"rango_precio(100, 101): {len(inventario.rango_precio(100, 101))} resultados | "
+          f"lineal {lineal * 1000:.2f} ms | índice {indice * 1000:.3f} ms")
+
+
+def medir_memoria(funcion):
+    """Devuelve (segundos, pico de memoria en MB) de una llamada a funcion"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return segundos, pico / 1024 / 1024
+
+
+def carga_completa(ruta):
+    """Carga original: json.load del archivo completo y luego los objetos Producto"""
+    with open(ruta, 'r') as f:
+        return [Producto.from_dict(item) for item in json.load(f)]
+
+
+def benchmark_carga(directorio):
+    print("\n--- Carga del archivo: json.load vs lector incremental ---")
+    ruta = os.path.join(directorio, "inventario.json")
+    print(f"Tamaño del archivo: {os.path.getsize(ruta) / 1024 / 1024:.1f} MB")
+    segundos, pico = medir_memoria(lambda: carga_completa(ruta))
+    print(f"json.load: {segundos:.2f} s | pico {pico:.1f} MB")
+    segundos, pico = medir_memoria(lambda: list(leer_productos(ruta)))
+    print(f"leer_productos: {segundos:.2f} s | pico {pico:.1f} MB")
+
+
+class ProductoConDict:
+    """Producto original, con __dict__ por instancia, como referencia de memoria"""
+
+    def __init__(self, id, nombre, cantidad, precio):
+        self._id = id
+        self._nombre = nombre
+        self._cantidad = cantidad
+        self._precio = precio
+
+    def get_nombre(self):
+        return self._nombre
+
+    def get_cantidad(self):
+        return self._cantidad
+
+    def get_precio(self):
+        return self._precio
+
+
+def bytes_por_producto(n, construir):
+    """Memoria asignada por construir(n) dividida entre n"""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    almacen = construir(n)
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del almacen
+    return (despues - antes) / n
+
+
+def benchmark_memoria(n):
+    print("\n--- Memoria por producto (diccionario de IDs incluido) ---")
+    # Precios y cantidades variados para que no se compartan objetos int/float pequeños
+    def filas(n):
+        return ((i, f"producto {i}", i * 7 + 1000, i * 0.37 + 0.01) for i in range(n))
+
+    def con_dict(n):
+        return {i: ProductoConDict(i, nombre, cantidad, precio) for i, nombre, cantidad, precio in filas(n)}
+
+    def con_slots(n):
+        return {i: Producto(i, nombre, cantidad, precio) for i, nombre, cantidad, precio in filas(n)}
+
+    def columnar(n):
+        almacen = AlmacenColumnar()
+        for i, nombre, cantidad, precio in filas(n):
+            almacen[i] = ProductoConDict(i, nombre, cantidad, precio)
+        return almacen
+
+    for nombre, construir in (("Producto con __dict__", con_dict), ("Producto con __slots__", con_slots),
+                              ("AlmacenColumnar", columnar)):
+        print(f"{nombre}: {bytes_por_producto(n, construir):.0f} bytes/producto")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del Inventario de la semana 11")
+    parser.add_argument("--productos", type=int, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        inventario = crear_inventario(directorio, args.productos)
+        print(f"Inventario de {args.productos} productos creado en {time.perf_counter() - inicio:.2f} s")
+
+        benchmark_busqueda(inventario, args.repeticiones)
+        benchmark_busqueda_aproximada(inventario, args.repeticiones)
+        benchmark_listado(inventario, args.repeticiones)
+        benchmark_indices_secundarios(inventario, args.repeticiones)
+        benchmark_carga(directorio)
+
+    benchmark_memoria(args.productos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Generador de carga para servidor_inventario.py: mide solicitudes por segundo y latencias.
+
+Arranca un servidor en un proceso aparte sobre un inventario temporal, lo llena con
+productos y lanza varias conexiones que mantienen cada una varias solicitudes en vuelo.
+
+Uso:
+    python carga_servidor.py --conexiones 8 --profundidad 16 --segundos 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from SistemaAvanzadodeGestióndeInventario import Producto
+from cliente_inventario import ClienteInventario
+
+
+async def esperar_servidor(puerto, intentos=100):
+    for _ in range(intentos):
+        try:
+            cliente = await ClienteInventario.conectar(puerto=puerto)
+            return cliente
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+async def poblar(cliente, productos):
+    for inicio in range(0, productos, 1000):
+        await asyncio.gather(*(cliente.añadir_producto(Producto(i, f"producto {i}", 100, 10.0))
+                               for i in range(inicio, min(inicio + 1000, productos))))
+
+
+async def trabajador(cliente, productos, fin, latencias, rng):
+    """Envía solicitudes mixtas (lecturas, actualizaciones y búsquedas) hasta el instante fin"""
+    while time.perf_counter() < fin:
+        id = rng.randrange(productos)
+        tipo = rng.random()
+        inicio = time.perf_counter()
+        if tipo < 0.7:
+            await cliente.obtener_producto(id)
+        elif tipo < 0.9:
+            await cliente.actualizar_producto(id, cantidad=rng.randint(0, 500))
+        else:
+            await cliente.buscar_por_nombre(f"producto {id}")
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def generar_carga(args, puerto):
+    cliente = await esperar_servidor(puerto)
+    await poblar(cliente, args.productos)
+    await cliente.cerrar()
+
+    clientes = [await ClienteInventario.conectar(puerto=puerto) for _ in range(args.conexiones)]
+    latencias = []
+    rng = random.Random(42)
+    inicio = time.perf_counter()
+    fin = inicio + args.segundos
+    # Cada conexión mantiene `profundidad` solicitudes en vuelo (pipelining)
+    await asyncio.gather(*(trabajador(cliente, args.productos, fin, latencias, rng)
+                           for cliente in clientes for _ in range(args.profundidad)))
+    duracion = time.perf_counter() - inicio
+    for cliente in clientes:
+        await cliente.cerrar()
+
+    latencias.sort()
+    def percentil(p):
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000
+
+    print(f"{len(latencias)} solicitudes en {duracion:.1f} s: {len(latencias) / duracion:.0f} solicitudes/s")
+    print(f"Latencia p50 {percentil(0.50):.2f} ms | p99 {percentil(0.99):.2f} ms | máx {latencias[-1] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servidor de inventario")
+    parser.add_argument("--puerto", type=int, default=8766)
+    parser.add_argument("--productos", type=int, default=10000)
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--profundidad", type=int, default=16, help="Solicitudes en vuelo por conexión")
+    parser.add_argument("--segundos", type=float, default=10)
+    args = parser.parse_args()
+
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as temporal:
+        servidor = subprocess.Popen([sys.executable, os.path.join(directorio, "servidor_inventario.py"),
+                                     "--archivo", os.path.join(temporal, "inventario.json"),
+                                     "--puerto", str(args.puerto)], stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(generar_carga(args, args.puerto))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cliente asyncio para servidor_inventario.py.
+
+Las solicitudes se envían sin esperar la respuesta de la anterior (pipelining), así que
+varias corrutinas pueden usar la misma conexión a la vez:
+
+    cliente = await ClienteInventario.conectar()
+    await asyncio.gather(*(cliente.actualizar_producto(id, cantidad=0) for id in ids))
+    await cliente.cerrar()
+"""
+import asyncio
+import itertools
+import json
+
+from SistemaAvanzadodeGestióndeInventario import Producto
+from servidor_inventario import LIMITE_LINEA
+
+
+class ClienteInventario:
+    def __init__(self, lector, escritor):
+        self._lector = lector
+        self._escritor = escritor
+        self._ids = itertools.count()
+        # Solicitudes enviadas que esperan respuesta (id de solicitud -> futuro)
+        self._pendientes = {}
+        self._receptor = asyncio.ensure_future(self._recibir())
+
+    @classmethod
+    async def conectar(cls, host='127.0.0.1', puerto=8765, socket_unix=None):
+        if socket_unix is not None:
+            lector, escritor = await asyncio.open_unix_connection(socket_unix, limit=LIMITE_LINEA)
+        else:
+            lector, escritor = await asyncio.open_connection(host, puerto, limit=LIMITE_LINEA)
+        return cls(lector, escritor)
+
+    async def _recibir(self):
+        try:
+            while True:
+                linea = await self._lector.readline()
+                if not linea:
+                    break
+                respuesta = json.loads(linea)
+                futuro = self._pendientes.pop(respuesta['id'], None)
+                if futuro is not None and not futuro.done():
+                    futuro.set_result(respuesta)
+        finally:
+            for futuro in self._pendientes.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("Conexión con el servidor cerrada"))
+            self._pendientes.clear()
+
+    async def solicitar(self, op, **datos):
+        """Envía una solicitud y espera su respuesta completa (dict con ok, mensaje y resultado)"""
+        if self._receptor.done():
+            raise ConnectionError("Conexión con el servidor cerrada")
+        id = next(self._ids)
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendientes[id] = futuro
+        self._escritor.write(json.dumps({'id': id, 'op': op, **datos}).encode('utf-8') + b"\n")
+        return await futuro
+
+    async def añadir_producto(self, producto):
+        respuesta = await self.solicitar('añadir', producto_id=producto.get_id(), nombre=producto.get_nombre(),
+                                         cantidad=producto.get_cantidad(), precio=producto.get_precio())
+        return respuesta['ok']
+
+    async def eliminar_producto(self, id):
+        return (await self.solicitar('eliminar', producto_id=id))['ok']
+
+    async def actualizar_producto(self, id, cantidad=None, precio=None, nombre=None):
+        respuesta = await self.solicitar('actualizar', producto_id=id, cantidad=cantidad, precio=precio,
+                                         nombre=nombre)
+        return respuesta['ok']
+
+    async def obtener_producto(self, id):
+        respuesta = await self.solicitar('obtener', producto_id=id)
+        return Producto.from_dict(respuesta['resultado']) if respuesta['ok'] else None
+
+    async def buscar_por_nombre(self, nombre):
+        """Lanza ValueError con el mensaje del servidor si rechaza la búsqueda"""
+        return self._productos(await self.solicitar('buscar', nombre=nombre))
+
+    async def pagina(self, offset, limite):
+        """Lanza ValueError con el mensaje del servidor si rechaza la página (offset o límite no válidos)"""
+        return self._productos(await self.solicitar('listar', offset=offset, limite=limite))
+
+    @staticmethod
+    def _productos(respuesta):
+        # Una lista vacía no distinguiría "sin resultados" de una solicitud rechazada
+        if not respuesta['ok']:
+            raise ValueError(respuesta['mensaje'])
+        return [Producto.from_dict(item) for item in respuesta['resultado']]
+
+    async def cerrar(self):
+        self._escritor.close()
+        try:
+            await self._escritor.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self._receptor, return_exceptions=True)
@@ -0,0 +1,265 @@
+"""
+Importación y exportación masiva del Inventario en CSV y JSON Lines.
+
+El archivo se lee por bloques de líneas; los bloques se analizan y validan en un pool de
+procesos y el proceso principal inserta los productos por lotes con
+Inventario.añadir_productos(), que descarta los duplicados. Con --diario cada lote se añade al
+log en su propia transacción; sin él, el archivo se escribe una sola vez al terminar. Nunca hay
+más de unos pocos bloques en vuelo, así que la memoria del proceso de importación no depende
+del tamaño del archivo.
+
+Formato CSV: cabecera con las columnas id, nombre, cantidad y precio (en cualquier orden).
+Formato JSON Lines (.jsonl): un objeto {"id", "nombre", "cantidad", "precio"} por línea.
+
+Uso:
+    python importacion.py importar proveedor.csv --inventario inventario.json --diario
+    python importacion.py exportar catalogo.jsonl --inventario inventario.json
+    python importacion.py generar prueba.csv --filas 5000000
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, Producto, escritura_atomica, es_json_lines
+
+COLUMNAS = ('id', 'nombre', 'cantidad', 'precio')
+# Máximo de mensajes de error que se conservan (el resto solo se cuenta)
+MAXIMO_ERRORES = 20
+
+
+def _leer_bloques(f, lineas_por_bloque, es_csv, primera_linea=1):
+    """
+    Agrupa las líneas del archivo en bloques de (número de la primera línea, líneas).
+    En CSV no se corta nunca dentro de un campo entre comillas que contenga saltos de línea.
+    """
+    bloque = []
+    inicio = numero = primera_linea
+    comillas_abiertas = False
+    for linea in f:
+        numero += 1
+        bloque.append(linea)
+        if es_csv and linea.count(b'"') % 2:
+            comillas_abiertas = not comillas_abiertas
+        if len(bloque) >= lineas_por_bloque and not comillas_abiertas:
+            yield inicio, bloque
+            bloque = []
+            inicio = numero
+    if bloque:
+        yield inicio, bloque
+
+
+def _validar(fila):
+    """Convierte una fila (dict con las columnas) en la tupla (id, nombre, cantidad, precio)"""
+    id = int(fila['id'])
+    nombre = str(fila['nombre']).strip()
+    cantidad = int(fila['cantidad'])
+    precio = float(fila['precio'])
+    if not nombre:
+        raise ValueError("nombre vacío")
+    if cantidad < 0:
+        raise ValueError("cantidad negativa")
+    if not math.isfinite(precio) or precio < 0:
+        raise ValueError("precio no válido")
+    return id, nombre, cantidad, precio
+
+
+def _procesar_bloque(cabecera, inicio, lineas):
+    """
+    Analiza y valida un bloque en un proceso del pool. Devuelve (filas válidas, errores) como
+    tuplas (número de línea, ...), que son baratas de enviar de vuelta al proceso principal.
+    """
+    validas = []
+    errores = []
+    texto = b"".join(lineas).decode('utf-8')
+    if cabecera is None:
+        filas = ((inicio + i, linea) for i, linea in enumerate(texto.splitlines()) if linea.strip())
+        for numero, linea in filas:
+            try:
+                validas.append((numero, _validar(json.loads(linea))))
+            except (ValueError, TypeError, KeyError) as e:
+                errores.append((numero, f"{type(e).__name__}: {e}"))
+        return validas, errores
+
+    lector = csv.reader(io.StringIO(texto, newline=''))
+    while True:
+        numero = inicio + lector.line_num
+        try:
+            valores = next(lector)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            errores.append((numero, f"CSV mal formado: {e}"))
+            break
+        if not valores:
+            continue
+        try:
+            if len(valores) != len(cabecera):
+                raise ValueError(f"se esperaban {len(cabecera)} columnas y hay {len(valores)}")
+            validas.append((numero, _validar(dict(zip(cabecera, valores)))))
+        except (ValueError, KeyError) as e:
+            errores.append((numero, f"{type(e).__name__}: {e}"))
+    return validas, errores
+
+
+def _leer_cabecera(f):
+    linea = f.readline()
+    cabecera = [columna.strip().lower() for columna in next(csv.reader([linea.decode('utf-8-sig')]), [])]
+    faltan = [columna for columna in COLUMNAS if columna not in cabecera]
+    if faltan:
+        raise ValueError(f"Faltan columnas en la cabecera del CSV: {', '.join(faltan)}")
+    return cabecera
+
+
+def importar(inventario, ruta, trabajadores=None, lineas_por_bloque=10000, tamaño_lote=50000, progreso=None):
+    """
+    Importa los productos de un archivo CSV o JSON Lines. Las filas inválidas y los IDs o
+    nombres ya existentes (en el inventario o antes en el mismo archivo) se rechazan sin
+    detener la importación.
+
+    Devuelve un diccionario con importados, invalidos, duplicados y los primeros errores.
+    progreso, si se indica, se llama como progreso(filas_importadas).
+    """
+    resultado = {'importados': 0, 'invalidos': 0, 'duplicados': 0, 'errores': []}
+    trabajadores = trabajadores or os.cpu_count() or 1
+
+    def anotar(clave, numero, mensaje):
+        resultado[clave] += 1
+        if len(resultado['errores']) < MAXIMO_ERRORES:
+            resultado['errores'].append(f"Línea {numero}: {mensaje}")
+
+    # Filas válidas pendientes de insertar, como (número de línea, fila)
+    lote = []
+
+    def insertar_lote():
+        if not lote:
+            return
+        try:
+            rechazados = inventario.añadir_productos([Producto(*fila) for _, fila in lote])
+        except OSError as e:
+            anotar('invalidos', lote[0][0], f"no se pudo guardar el lote: {e}")
+            resultado['invalidos'] += len(lote) - 1
+        else:
+            # Los duplicados se rechazan en orden, así que gana la primera aparición en el archivo
+            for i, motivo in rechazados:
+                anotar('duplicados', lote[i][0], motivo)
+            resultado['importados'] += len(lote) - len(rechazados)
+            if progreso is not None:
+                progreso(resultado['importados'])
+        lote.clear()
+
+    def consumir(validas, errores):
+        for numero, mensaje in errores:
+            anotar('invalidos', numero, mensaje)
+        lote.extend(validas)
+        if len(lote) >= tamaño_lote:
+            insertar_lote()
+
+    with open(ruta, 'rb') as f, inventario.carga_masiva():
+        cabecera = None if es_json_lines(ruta) else _leer_cabecera(f)
+        bloques = _leer_bloques(f, lineas_por_bloque, cabecera is not None, 1 if cabecera is None else 2)
+
+        if trabajadores == 1:
+            for inicio, lineas in bloques:
+                consumir(*_procesar_bloque(cabecera, inicio, lineas))
+        else:
+            with ProcessPoolExecutor(trabajadores) as pool:
+                # Mantenemos un número acotado de bloques en vuelo y los consumimos en orden,
+                # para que ante un duplicado gane siempre la primera aparición en el archivo
+                en_vuelo = []
+                for inicio, lineas in bloques:
+                    en_vuelo.append(pool.submit(_procesar_bloque, cabecera, inicio, lineas))
+                    if len(en_vuelo) >= 2 * trabajadores:
+                        consumir(*en_vuelo.pop(0).result())
+                for futuro in en_vuelo:
+                    consumir(*futuro.result())
+        insertar_lote()
+
+    return resultado
+
+
+def exportar(inventario, ruta):
+    """Exporta el inventario en orden de ID a CSV o, si la ruta termina en .jsonl, a JSON Lines"""
+    try:
+        with escritura_atomica(ruta) as f:
+            if es_json_lines(ruta):
+                for producto in inventario.mostrar_todos():
+                    f.write(json.dumps(producto.to_dict(), ensure_ascii=False) + "\n")
+            else:
+                escritor = csv.writer(f, lineterminator="\n")
+                escritor.writerow(COLUMNAS)
+                for producto in inventario.mostrar_todos():
+                    escritor.writerow((producto.get_id(), producto.get_nombre(), producto.get_cantidad(),
+                                       producto.get_precio()))
+        return True
+    except OSError as e:
+        print(f"Error al exportar a {ruta}: {e}")
+        return False
+
+
+def generar(ruta, filas):
+    """Genera un archivo sintético de catálogo de proveedor para medir la importación"""
+    with open(ruta, 'w', newline='') as f:
+        if es_json_lines(ruta):
+            for i in range(filas):
+                f.write(json.dumps({'id': i, 'nombre': f"artículo {i}", 'cantidad': i % 500,
+                                    'precio': round(0.5 + (i * 7919) % 50000 / 100, 2)}, ensure_ascii=False) + "\n")
+        else:
+            escritor = csv.writer(f, lineterminator="\n")
+            escritor.writerow(COLUMNAS)
+            for i in range(filas):
+                escritor.writerow((i, f"artículo {i}", i % 500, round(0.5 + (i * 7919) % 50000 / 100, 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación y exportación masiva del inventario")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    for nombre in ("importar", "exportar"):
+        sub = subcomandos.add_parser(nombre)
+        sub.add_argument("ruta", help="Archivo .csv o .jsonl")
+        sub.add_argument("--inventario", default="inventario.json")
+        sub.add_argument("--diario", action="store_true",
+                         help="Usar el log de operaciones: cada lote queda guardado en el log al insertarlo "
+                              "(sin él, el archivo se escribe una sola vez al terminar)")
+    subcomandos.choices["importar"].add_argument("--trabajadores", type=int, default=None)
+    subcomandos.choices["importar"].add_argument("--lineas-por-bloque", type=int, default=10000)
+    subcomandos.choices["importar"].add_argument("--lote", type=int, default=50000)
+    sub = subcomandos.add_parser("generar")
+    sub.add_argument("ruta")
+    sub.add_argument("--filas", type=int, default=1000000)
+    args = parser.parse_args()
+
+    if args.comando == "generar":
+        generar(args.ruta, args.filas)
+        print(f"Generadas {args.filas} filas en {args.ruta}")
+        return
+
+    inicio = time.perf_counter()
+    inventario = Inventario(archivo=args.inventario, diario=args.diario)
+    try:
+        if args.comando == "exportar":
+            if exportar(inventario, args.ruta):
+                print(f"Exportados {inventario.resumen()['productos']} productos a {args.ruta}")
+            return
+
+        try:
+            resultado = importar(inventario, args.ruta, args.trabajadores, args.lineas_por_bloque, args.lote)
+        except (OSError, ValueError) as e:
+            print(f"Error al importar {args.ruta}: {e}")
+            return
+        segundos = time.perf_counter() - inicio
+        for error in resultado['errores']:
+            print(error)
+        print(f"Importados {resultado['importados']} productos en {segundos:.1f} s "
+              f"({resultado['importados'] / max(segundos, 1e-9):.0f} filas/s); "
+              f"{resultado['invalidos']} inválidos, {resultado['duplicados']} duplicados.")
+    finally:
+        inventario.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Inventario repartido en varios archivos (fragmentos) según un hash del ID, con los mismos
+métodos públicos que Inventario.
+
+Cada fragmento es un Inventario completo con su propio archivo JSON dentro del directorio
+del inventario, así que un cambio solo reescribe (o añade al log) el fragmento del producto
+afectado. Al abrir, los fragmentos se cargan a la vez en un pool de hilos, y las búsquedas
+por nombre se reparten entre los fragmentos y se fusionan en orden de ID.
+
+Se elige abriendo un directorio terminado en .fragmentos con abrir_inventario(), o directamente:
+
+    inventario = InventarioFragmentado("inventario.fragmentos", fragmentos=8, diario=True)
+
+Un inventario JSON existente se convierte con:
+
+    python inventario_fragmentado.py inventario.json inventario.fragmentos --fragmentos 8
+
+El número de fragmentos se guarda en fragmentos.json al crear el directorio y no se puede
+cambiar después (cada ID tiene que seguir en el mismo fragmento). Las transacciones y los
+lotes no están disponibles: no se podrían confirmar de forma atómica en varios archivos.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from operator import methodcaller
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, escribir_productos, escritura_atomica, \
+    leer_productos
+
+FRAGMENTOS_POR_DEFECTO = 8
+DESCRIPCION = "fragmentos.json"
+# Clave de ordenación por ID; con columnar=True los fragmentos devuelven vistas ProductoColumnar,
+# que no son Producto, así que no sirve Producto.get_id
+_POR_ID = methodcaller('get_id')
+
+
+def fragmento_de(id, fragmentos):
+    """Número de fragmento del ID; crc32 no cambia entre ejecuciones, a diferencia de hash() con cadenas"""
+    return zlib.crc32(str(id).encode('utf-8')) % fragmentos
+
+
+def ruta_fragmento(directorio, numero):
+    return os.path.join(directorio, f"fragmento-{numero:03d}.json")
+
+
+def _leer_descripcion(directorio, fragmentos):
+    """Devuelve el número de fragmentos del directorio, creando la descripción si es nuevo"""
+    descripcion = os.path.join(directorio, DESCRIPCION)
+    if os.path.exists(descripcion):
+        with open(descripcion) as f:
+            guardados = json.load(f)['fragmentos']
+        if guardados != fragmentos:
+            print(f"Aviso: el inventario tiene {guardados} fragmentos; se ignora fragmentos={fragmentos}.")
+        return guardados
+    os.makedirs(directorio, exist_ok=True)
+    with escritura_atomica(descripcion) as f:
+        json.dump({'fragmentos': fragmentos}, f)
+    return fragmentos
+
+
+class InventarioFragmentado:
+    def __init__(self, directorio="inventario.fragmentos", fragmentos=FRAGMENTOS_POR_DEFECTO, **opciones):
+        """Las opciones (diario, columnar, compartido, en_segundo_plano...) se aplican a cada fragmento"""
+        self._directorio = directorio
+        numero = _leer_descripcion(directorio, fragmentos)
+        self._pool = ThreadPoolExecutor(max_workers=numero)
+        self._fragmentos = list(self._pool.map(lambda i: Inventario(ruta_fragmento(directorio, i), **opciones),
+                                               range(numero)))
+        # Las altas y los cambios de nombre comprueban y ocupan el nombre sin que nadie se interponga
+        self._bloqueo_nombres = threading.Lock()
+
+    def _fragmento(self, id):
+        return self._fragmentos[fragmento_de(id, len(self._fragmentos))]
+
+    def _en_todos(self, metodo, *args):
+        """Llama al método en todos los fragmentos a la vez y devuelve sus resultados en orden"""
+        return list(self._pool.map(methodcaller(metodo, *args), self._fragmentos))
+
+    @contextmanager
+    def _nombres_bloqueados(self):
+        """
+        Mantiene bloqueados los nombres de todo el inventario durante el bloque: el bloqueo de
+        hilos de este objeto y la sesión compartida de cada fragmento (que en modo compartido
+        bloquea su archivo y lo recarga si otro proceso lo cambió). Los fragmentos se bloquean
+        siempre en el mismo orden para que dos procesos no se esperen mutuamente.
+        """
+        with self._bloqueo_nombres, ExitStack() as sesiones:
+            for fragmento in self._fragmentos:
+                sesiones.enter_context(fragmento.sesion_compartida())
+            yield
+
+    def _nombre_ocupado(self, nombre, id):
+        """Los nombres son únicos en todo el inventario; se llama con los nombres bloqueados"""
+        propio = self._fragmento(id)
+        return any(fragmento.tiene_nombre(nombre) for fragmento in self._fragmentos if fragmento is not propio)
+
+    def progreso_carga(self):
+        """Devuelve (bytes_leidos, bytes_totales) sumando los fragmentos que aún se cargan, o None"""
+        progresos = [p for p in (f.progreso_carga() for f in self._fragmentos) if p is not None]
+        if not progresos:
+            return None
+        return sum(p[0] for p in progresos), sum(p[1] for p in progresos)
+
+    def obtener_producto(self, id):
+        """Devuelve el producto con ese ID, o None si no existe"""
+        return self._fragmento(id).obtener_producto(id)
+
+    def añadir_producto(self, producto):
+        with self._nombres_bloqueados():
+            if self._nombre_ocupado(producto.get_nombre(), producto.get_id()):
+                print("Error: Ya existe un producto con ese nombre.")
+                return False
+            return self._fragmento(producto.get_id()).añadir_producto(producto)
+
+    def eliminar_producto(self, id):
+        return self._fragmento(id).eliminar_producto(id)
+
+    def actualizar_producto(self, id, cantidad=None, precio=None, nombre=None):
+        if nombre is None:
+            return self._fragmento(id).actualizar_producto(id, cantidad, precio, nombre)
+        with self._nombres_bloqueados():
+            if self._nombre_ocupado(nombre, id):
+                print("Error: Ya existe un producto con ese nombre.")
+                return False
+            return self._fragmento(id).actualizar_producto(id, cantidad, precio, nombre)
+
+    def buscar_por_nombre(self, nombre):
+        resultados = itertools.chain.from_iterable(self._en_todos('buscar_por_nombre', nombre))
+        return sorted(resultados, key=_POR_ID)
+
+    def mostrar_todos(self):
+        # Cada fragmento ya devuelve sus productos ordenados por ID: basta con fusionarlos
+        return list(heapq.merge(*self._en_todos('mostrar_todos'), key=_POR_ID))
+
+    def productos_entre(self, id_min, id_max):
+        """Devuelve los productos con ID en el rango [id_min, id_max], ordenados por ID"""
+        return list(heapq.merge(*self._en_todos('productos_entre', id_min, id_max), key=_POR_ID))
+
+    def pagina(self, offset, limite):
+        """Devuelve hasta `limite` productos ordenados por ID a partir de la posición `offset`"""
+        # Los productos de la página están entre los offset + limite primeros de cada fragmento
+        paginas = self._en_todos('pagina', 0, offset + limite)
+        return list(itertools.islice(heapq.merge(*paginas, key=_POR_ID), offset, offset + limite))
+
+    def resumen(self):
+        """Suma los agregados de los fragmentos"""
+        resumenes = self._en_todos('resumen')
+        minimos = [r['precio_minimo'] for r in resumenes if r['precio_minimo'] is not None]
+        maximos = [r['precio_maximo'] for r in resumenes if r['precio_maximo'] is not None]
+        return {
+            'productos': sum(r['productos'] for r in resumenes),
+            'unidades': sum(r['unidades'] for r in resumenes),
+            'valor_total': sum(r['valor_total'] for r in resumenes),
+            'precio_minimo': min(minimos, default=None),
+            'precio_maximo': max(maximos, default=None),
+        }
+
+    def bajo_stock(self, umbral):
+        """Devuelve los productos con cantidad < umbral, de menor a mayor cantidad"""
+        return list(heapq.merge(*self._en_todos('bajo_stock', umbral),
+                                key=lambda p: (p.get_cantidad(), p.get_id())))
+
+    def rango_precio(self, minimo, maximo):
+        """Devuelve los productos con minimo <= precio <= maximo, de menor a mayor precio"""
+        return list(heapq.merge(*self._en_todos('rango_precio', minimo, maximo),
+                                key=lambda p: (p.get_precio(), p.get_id())))
+
+    def guardar_en_archivo(self):
+        return all(self._en_todos('guardar_en_archivo'))
+
+    def cargar_desde_archivo(self):
+        self._en_todos('cargar_desde_archivo')
+
+    def cerrar(self):
+        """Cierra todos los fragmentos y el pool de hilos"""
+        if self._pool is not None:
+            self._en_todos('cerrar')
+            self._pool.shutdown()
+            self._pool = None
+
+
+def repartir(origen, directorio, fragmentos=FRAGMENTOS_POR_DEFECTO):
+    """Reparte los productos de un archivo JSON o JSON Lines en un directorio de fragmentos nuevo"""
+    if os.path.exists(os.path.join(directorio, DESCRIPCION)):
+        raise ValueError(f"{directorio} ya contiene un inventario fragmentado")
+    grupos = [[] for _ in range(fragmentos)]
+    for producto in leer_productos(origen):
+        grupos[fragmento_de(producto.get_id(), fragmentos)].append(producto.to_dict())
+    os.makedirs(directorio, exist_ok=True)
+    for numero, grupo in enumerate(grupos):
+        with escritura_atomica(ruta_fragmento(directorio, numero)) as f:
+            escribir_productos(f, grupo)
+    # La descripción se escribe al final: un reparto interrumpido no deja un inventario a medias
+    _leer_descripcion(directorio, fragmentos)
+    return sum(len(grupo) for grupo in grupos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte un inventario JSON en un inventario fragmentado")
+    parser.add_argument("origen", help="Archivo .json o .jsonl")
+    parser.add_argument("directorio", help="Directorio nuevo (por ejemplo, inventario.fragmentos)")
+    parser.add_argument("--fragmentos", type=int, default=FRAGMENTOS_POR_DEFECTO)
+    args = parser.parse_args()
+    try:
+        total = repartir(args.origen, args.directorio, args.fragmentos)
+    except (OSError, ValueError) as e:
+        print(f"Error al repartir {args.origen}: {e}")
+        return
+    print(f"{total} productos repartidos en {args.fragmentos} fragmentos en {args.directorio}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Operaciones masivas sobre el Inventario con NumPy: valoración y cambios de precio vectorizados.
+
+Los precios y cantidades se exportan a arrays en orden de ID, la expresión se evalúa de una
+vez sobre todo el catálogo y solo los precios que cambian se escriben de vuelta con
+Inventario.cambiar_precios(): un único registro en disco y, con el almacén columnar, escritos
+directamente en la columna de precios.
+
+Requiere NumPy (pip install numpy).
+
+Uso como benchmark:
+    python operaciones_masivas.py --productos 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    raise SystemExit("Este módulo requiere NumPy: pip install numpy")
+
+from SistemaAvanzadodeGestióndeInventario import AlmacenColumnar, Inventario, Producto
+
+
+def exportar_arrays(inventario):
+    """Devuelve (ids, cantidades, precios) como arrays de NumPy en orden de ID"""
+    ids = inventario._ids_ordenados
+    productos = inventario._productos
+    if isinstance(productos, AlmacenColumnar):
+        # Con el almacén columnar leemos las columnas directamente, sin materializar productos
+        filas = np.fromiter((productos._filas[id] for id in ids), dtype=np.int64, count=len(ids))
+        cantidades = np.frombuffer(productos._cantidades, dtype=np.int64)[filas]
+        precios = np.frombuffer(productos._precios, dtype=np.float64)[filas]
+    else:
+        cantidades = np.fromiter((productos[id].get_cantidad() for id in ids), dtype=np.int64, count=len(ids))
+        precios = np.fromiter((productos[id].get_precio() for id in ids), dtype=np.float64, count=len(ids))
+    return np.array(ids), cantidades, precios
+
+
+def valoracion(inventario):
+    """Valor total del stock (suma de cantidad * precio) calculado de forma vectorizada"""
+    _, cantidades, precios = exportar_arrays(inventario)
+    return float(np.dot(cantidades.astype(np.float64), precios))
+
+
+def mascara_por_nombre(inventario, texto):
+    """Máscara booleana (en orden de ID) de los productos cuyo nombre contiene el texto"""
+    ids = np.array(inventario._ids_ordenados)
+    encontrados = [producto.get_id() for producto in inventario.buscar_por_nombre(texto)]
+    return np.isin(ids, encontrados)
+
+
+def aplicar_precios(inventario, ids, precios_actuales, precios_nuevos):
+    """Escribe de vuelta solo los precios que cambiaron, con una sola escritura"""
+    cambiados = np.flatnonzero(precios_nuevos != precios_actuales)
+    return inventario.cambiar_precios(ids[cambiados].tolist(), precios_nuevos[cambiados].tolist())
+
+
+def reprecio(inventario, factor, mascara=None, decimales=2):
+    """
+    Multiplica los precios por `factor` (por ejemplo 1.03 para subir un 3 % o 0.9 para un
+    descuento del 10 %), solo en los productos marcados por `mascara` si se indica.
+    """
+    ids, _, precios = exportar_arrays(inventario)
+    nuevos = np.round(precios * factor, decimales)
+    if mascara is not None:
+        nuevos = np.where(mascara, nuevos, precios)
+    return aplicar_precios(inventario, ids, precios, nuevos)
+
+
+def reprecio_por_expresion(inventario, funcion, decimales=2):
+    """
+    Aplica una expresión vectorizada funcion(cantidades, precios) -> nuevos precios, por
+    ejemplo: lambda c, p: np.where(c > 100, p * 0.95, p) para rebajar el exceso de stock.
+    """
+    ids, cantidades, precios = exportar_arrays(inventario)
+    nuevos = np.round(np.asarray(funcion(cantidades, precios), dtype=np.float64), decimales)
+    return aplicar_precios(inventario, ids, precios, nuevos)
+
+
+def crear_inventario(directorio, n, columnar):
+    inventario = Inventario(archivo=os.path.join(directorio, "inventario.json"), diario=True, columnar=columnar,
+                            umbral_compactacion=1 << 40)
+    rng = np.random.default_rng(42)
+    cantidades = rng.integers(0, 500, n).tolist()
+    precios = np.round(rng.uniform(0.5, 500, n), 2).tolist()
+    inventario.aplicar_lote({'op': 'añadir', 'producto': Producto(i, f"producto {i}", cantidades[i], precios[i])}
+                            for i in range(n))
+    return inventario
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reprecio vectorizado frente al bucle por producto")
+    parser.add_argument("--productos", type=int, default=1000000)
+    parser.add_argument("--muestra", type=int, default=2000,
+                        help="Productos actualizados uno a uno para estimar el coste del bucle por objeto")
+    parser.add_argument("--columnar", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        inventario = crear_inventario(directorio, args.productos, args.columnar)
+        print(f"Inventario de {args.productos} productos creado en {time.perf_counter() - inicio:.1f} s")
+
+        inicio = time.perf_counter()
+        lineal = sum(p.get_cantidad() * p.get_precio() for p in inventario.mostrar_todos())
+        t_lineal = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        vectorizada = valoracion(inventario)
+        t_vectorizada = time.perf_counter() - inicio
+        print(f"Valoración: bucle {t_lineal:.2f} s | NumPy {t_vectorizada:.2f} s "
+              f"(diferencia {abs(lineal - vectorizada):.4f})")
+
+        # Bucle por objeto: una llamada a actualizar_producto (y una escritura) por producto
+        muestra = min(args.muestra, args.productos)
+        inicio = time.perf_counter()
+        for producto in inventario.pagina(0, muestra):
+            with inventario.transaccion():
+                inventario.actualizar_producto(producto.get_id(), precio=round(producto.get_precio() * 1.03, 2))
+        t_bucle = (time.perf_counter() - inicio) / muestra * args.productos
+        print(f"Subida del 3 % con bucle por producto: {t_bucle:.1f} s (extrapolado de {muestra} productos)")
+
+        inicio = time.perf_counter()
+        reprecio(inventario, 1.03)
+        t_numpy = time.perf_counter() - inicio
+        print(f"Subida del 3 % vectorizada: {t_numpy:.1f} s | x{t_bucle / t_numpy:.0f}")
+        inventario.cerrar()
+
+
+if __name__ == "__main__":
+    main()
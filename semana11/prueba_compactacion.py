@@ -0,0 +1,71 @@
+"""
+Prueba de fallos de la compactación en modo diario: mientras escribir la instantánea falla
+(disco lleno, error de E/S), ningún cambio confirmado puede perderse al reabrir, y cuando el
+disco se recupera la siguiente compactación debe incorporar todos los logs pendientes.
+
+Uso:
+    python prueba_compactacion.py --productos 200 --umbral 300
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import SistemaAvanzadodeGestióndeInventario as modulo
+from SistemaAvanzadodeGestióndeInventario import Inventario, Producto
+
+
+def escritura_que_falla(ruta, modo='w'):
+    raise OSError(28, "No queda espacio en el dispositivo (simulado)")
+
+
+def ids_en_disco(archivo, umbral):
+    with contextlib.redirect_stdout(io.StringIO()):
+        reabierto = Inventario(archivo, diario=True, umbral_compactacion=umbral)
+        ids = [producto.get_id() for producto in reabierto.mostrar_todos()]
+        reabierto.cerrar()
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de fallos de la compactación")
+    parser.add_argument("--productos", type=int, default=200)
+    parser.add_argument("--umbral", type=int, default=300, help="umbral_compactacion en bytes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "inventario.json")
+        inventario = Inventario(archivo, diario=True, umbral_compactacion=args.umbral)
+        escritura_atomica = modulo.escritura_atomica
+        modulo.escritura_atomica = escritura_que_falla
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i in range(args.productos):
+                    assert inventario.añadir_producto(Producto(i, f"Producto {i}", i % 7, 1.5))
+                    # Cada compactación fallida se espera para que la siguiente la encuentre
+                    if inventario._compactacion is not None:
+                        inventario._compactacion.join()
+                inventario.cerrar()
+            esperados = list(range(args.productos))
+            recuperados = ids_en_disco(archivo, args.umbral)
+        finally:
+            modulo.escritura_atomica = escritura_atomica
+        assert recuperados == esperados, f"{args.productos} en memoria, {len(recuperados)} tras reabrir"
+        print(f"Con la instantánea fallando se recuperan los {len(recuperados)} productos")
+
+        # Con el disco recuperado, la siguiente compactación incorpora el log rotado pendiente
+        inventario = Inventario(archivo, diario=True, umbral_compactacion=args.umbral)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(args.productos, 2 * args.productos):
+                assert inventario.añadir_producto(Producto(i, f"Producto {i}", i % 7, 1.5))
+        inventario.cerrar()
+        assert not os.path.exists(archivo + ".log.compactando"), "El log rotado sigue sin incorporar"
+        recuperados = ids_en_disco(archivo, args.umbral)
+        assert recuperados == list(range(2 * args.productos)), f"{len(recuperados)} productos tras reabrir"
+        print(f"Tras recuperar el disco se compacta y se recuperan los {len(recuperados)} productos")
+    print("Compactación correcta.")
+
+
+if __name__ == "__main__":
+    main()
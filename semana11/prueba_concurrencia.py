@@ -0,0 +1,75 @@
+"""
+Prueba de estrés del modo compartido del Inventario: varios procesos escriben a la vez
+sobre el mismo archivo y al final se comprueba que no se perdió ninguna actualización.
+
+Uso:
+    python prueba_concurrencia.py --procesos 8 --operaciones 50
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, Producto
+
+ID_CONTADOR = 0
+
+
+def trabajador(archivo, diario, numero, operaciones):
+    """Alterna altas de productos propios con incrementos de un contador compartido"""
+    inventario = Inventario(archivo=archivo, diario=diario, compartido=True, umbral_compactacion=4096)
+    for i in range(operaciones):
+        id = (numero + 1) * 1000000 + i
+        with inventario.transaccion():
+            inventario.añadir_producto(Producto(id, f"proceso {numero} producto {i}", 1, 1.0))
+        # Lectura-modificación-escritura del contador dentro de una sola transacción
+        with inventario.transaccion():
+            contador = inventario.obtener_producto(ID_CONTADOR)
+            inventario.actualizar_producto(ID_CONTADOR, cantidad=contador.get_cantidad() + 1)
+    inventario.cerrar()
+
+
+def ejecutar(procesos, operaciones, diario):
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "inventario.json")
+        inventario = Inventario(archivo=archivo, diario=diario, compartido=True)
+        with inventario.transaccion():
+            inventario.añadir_producto(Producto(ID_CONTADOR, "contador", 0, 0.0))
+        inventario.cerrar()
+
+        inicio = time.perf_counter()
+        trabajadores = [multiprocessing.Process(target=trabajador, args=(archivo, diario, n, operaciones))
+                        for n in range(procesos)]
+        for proceso in trabajadores:
+            proceso.start()
+        for proceso in trabajadores:
+            proceso.join()
+            assert proceso.exitcode == 0, f"Un proceso terminó con código {proceso.exitcode}"
+        segundos = time.perf_counter() - inicio
+
+        final = Inventario(archivo=archivo, diario=diario)
+        esperado = procesos * operaciones
+        contador = final.obtener_producto(ID_CONTADOR).get_cantidad()
+        altas = len(final.mostrar_todos()) - 1
+        modo = "diario" if diario else "instantánea"
+        print(f"[{modo}] {procesos} procesos x {operaciones} operaciones en {segundos:.2f} s: "
+              f"contador {contador}/{esperado}, altas {altas}/{esperado}")
+        assert contador == esperado, "Se perdieron incrementos del contador"
+        assert altas == esperado, "Se perdieron altas de productos"
+        final.cerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de escrituras concurrentes sobre un mismo inventario")
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=50)
+    args = parser.parse_args()
+
+    for diario in (False, True):
+        ejecutar(args.procesos, args.operaciones, diario)
+    print("Sin actualizaciones perdidas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Prueba de propiedades de Inventario.resumen(): tras cada operación aleatoria (incluidas
+transacciones revertidas y lotes grandes) los agregados mantenidos incrementalmente deben
+coincidir con los recalculados recorriendo todos los productos. Un suscriptor hace la misma
+comprobación desde cada evento: los eventos solo se publican con los índices al día.
+
+Uso:
+    python prueba_resumen.py --operaciones 2000 --semilla 1
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import tempfile
+
+from SistemaAvanzadodeGestióndeInventario import UMBRAL_LOTE_EN_BLOQUE, Inventario, Producto
+
+
+def resumen_recalculado(inventario):
+    productos = inventario.mostrar_todos()
+    precios = [p.get_precio() for p in productos]
+    return {
+        'productos': len(productos),
+        'unidades': sum(p.get_cantidad() for p in productos),
+        'valor_total': math.fsum(p.get_cantidad() * p.get_precio() for p in productos),
+        'precio_minimo': min(precios) if precios else None,
+        'precio_maximo': max(precios) if precios else None,
+    }
+
+
+def comprobar(inventario, paso):
+    esperado = resumen_recalculado(inventario)
+    obtenido = inventario.resumen()
+    for clave, valor in esperado.items():
+        if clave == 'valor_total':
+            assert math.isclose(obtenido[clave], valor, rel_tol=1e-9, abs_tol=1e-6), (paso, clave, obtenido, esperado)
+        else:
+            assert obtenido[clave] == valor, (paso, clave, obtenido, esperado)
+
+
+def operacion_aleatoria(inventario, rng):
+    id = rng.randrange(200)
+    accion = rng.random()
+    if accion < 0.4:
+        inventario.añadir_producto(Producto(id, f"producto {id}", rng.randint(0, 100), round(rng.uniform(0.1, 999), 2)))
+    elif accion < 0.6:
+        inventario.eliminar_producto(id)
+    else:
+        cantidad = rng.randint(0, 100) if rng.random() < 0.7 else None
+        precio = round(rng.uniform(0.1, 999), 2) if rng.random() < 0.7 else None
+        inventario.actualizar_producto(id, cantidad, precio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de propiedades de Inventario.resumen()")
+    parser.add_argument("--operaciones", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    for columnar in (False, True):
+        with tempfile.TemporaryDirectory() as directorio, contextlib.redirect_stdout(io.StringIO()):
+            archivo = os.path.join(directorio, "inventario.json")
+            inventario = Inventario(archivo=archivo, diario=True, columnar=columnar)
+            # El bus de eventos captura las excepciones de los suscriptores: guardamos los fallos aparte
+            fallos_en_eventos = []
+
+            def al_recibir(evento):
+                try:
+                    comprobar(inventario, f"evento {evento.tipo} {evento.id}")
+                except AssertionError as e:
+                    fallos_en_eventos.append(e)
+
+            inventario.suscribir(al_recibir)
+            for paso in range(args.operaciones):
+                ids = inventario.mostrar_todos()
+                if ids and rng.random() < 0.005:
+                    # Lote grande: los índices ordenados se reconstruyen de una vez al final
+                    inventario.aplicar_lote([{'id': rng.choice(ids).get_id(), 'cantidad': rng.randint(0, 100),
+                                              'precio': round(rng.uniform(0.1, 999), 2)}
+                                             for _ in range(UMBRAL_LOTE_EN_BLOQUE + 1)])
+                elif rng.random() < 0.05:
+                    # Transacción que se aborta: el resumen debe volver al estado anterior
+                    try:
+                        with inventario.transaccion():
+                            for _ in range(rng.randint(1, 5)):
+                                operacion_aleatoria(inventario, rng)
+                            raise RuntimeError("abortar")
+                    except RuntimeError:
+                        pass
+                else:
+                    operacion_aleatoria(inventario, rng)
+                comprobar(inventario, paso)
+                assert not fallos_en_eventos, fallos_en_eventos[0]
+
+            inventario.cerrar()
+            comprobar(Inventario(archivo=archivo, diario=True, columnar=columnar), args.operaciones)
+
+            # Con un ID repetido en el archivo gana la última fila, también en los agregados
+            repetido = os.path.join(directorio, "repetido.json")
+            with open(repetido, 'w') as f:
+                json.dump([{'id': 1, 'nombre': "a", 'cantidad': 5, 'precio': 1.0},
+                           {'id': 1, 'nombre': "a", 'cantidad': 7, 'precio': 2.0}], f)
+            comprobar(Inventario(archivo=repetido, columnar=columnar), "ID repetido")
+
+    print(f"resumen() coincide con el recálculo completo tras {args.operaciones} operaciones.")
+
+
+if __name__ == "__main__":
+    main()
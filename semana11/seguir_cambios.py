@@ -0,0 +1,43 @@
+"""
+Consumidor de ejemplo del archivo de cambios del Inventario (registro_cambios=True): muestra
+cada cambio a medida que llega y guarda la posición leída para continuar desde ahí la
+próxima vez, sin volver a leer el inventario completo.
+
+Uso:
+    python seguir_cambios.py inventario.json.cambios --posicion consumidor.pos
+"""
+import argparse
+import os
+import time
+
+from SistemaAvanzadodeGestióndeInventario import leer_cambios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sigue el archivo de cambios del inventario")
+    parser.add_argument("archivo", help="Archivo de cambios (inventario.json.cambios)")
+    parser.add_argument("--posicion", help="Archivo donde se guarda la posición ya procesada")
+    parser.add_argument("--desde", type=int, default=None, help="Posición inicial en bytes")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="Segundos entre comprobaciones")
+    args = parser.parse_args()
+
+    posicion = args.desde or 0
+    if args.desde is None and args.posicion and os.path.exists(args.posicion):
+        with open(args.posicion) as f:
+            posicion = int(f.read().strip() or 0)
+
+    try:
+        while True:
+            eventos, posicion = leer_cambios(args.archivo, posicion)
+            for evento in eventos:
+                print(evento, evento.producto if evento.producto is not None else "")
+            if eventos and args.posicion:
+                with open(args.posicion, 'w') as f:
+                    f.write(str(posicion))
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        print(f"Detenido en la posición {posicion}.")
+
+
+if __name__ == "__main__":
+    main()
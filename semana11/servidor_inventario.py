@@ -0,0 +1,199 @@
+"""
+Servidor asyncio que comparte una única instancia de Inventario entre muchos terminales.
+
+Protocolo: una solicitud JSON por línea, {"id": n, "op": ..., ...datos}, y una respuesta
+JSON por línea, {"id": n, "ok": bool, "mensaje": str, "resultado": ...}. Un cliente puede
+enviar varias solicitudes sin esperar las respuestas (pipelining); las respuestas llegan en
+el mismo orden.
+
+Uso:
+    python servidor_inventario.py --puerto 8765 --archivo inventario.json
+    python servidor_inventario.py --socket /tmp/inventario.sock
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+
+from SistemaAvanzadodeGestióndeInventario import Inventario, Producto
+
+# Tamaño del búfer de salida a partir del cual esperamos a que el cliente lea las respuestas
+LIMITE_BUFER = 64 * 1024
+# Longitud máxima de una línea del protocolo (los resultados de búsqueda pueden ser grandes)
+LIMITE_LINEA = 16 * 1024 * 1024
+
+
+def _entero(datos, campo, por_defecto=None):
+    """Lee un campo entero de la solicitud; bool no cuenta como entero aunque lo sea en Python"""
+    valor = datos.get(campo, por_defecto)
+    if valor is None:
+        return None
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise ValueError(f"'{campo}' debe ser un número entero")
+    return valor
+
+
+def _precio(datos):
+    valor = datos.get('precio')
+    if valor is None:
+        return None
+    if not isinstance(valor, (int, float)) or isinstance(valor, bool) or not math.isfinite(valor):
+        raise ValueError("'precio' debe ser un número")
+    return float(valor)
+
+
+def _texto(datos, campo):
+    valor = datos.get(campo)
+    if valor is None:
+        return None
+    if not isinstance(valor, str):
+        raise ValueError(f"'{campo}' debe ser un texto")
+    return valor
+
+
+def _requeridos(**campos):
+    """Comprueba que los campos obligatorios están presentes y devuelve sus valores"""
+    for campo, valor in campos.items():
+        if valor is None:
+            raise ValueError(f"Falta el campo '{campo}'")
+    return campos.values()
+
+
+class ServidorInventario:
+    def __init__(self, inventario):
+        self._inventario = inventario
+        self._operaciones = {
+            'añadir': self._añadir,
+            'eliminar': self._eliminar,
+            'actualizar': self._actualizar,
+            'obtener': self._obtener,
+            'buscar': self._buscar,
+            'listar': self._listar,
+        }
+
+    # Los campos se validan antes de llegar al Inventario: un tipo incorrecto haría fallar
+    # la operación a medias y dejaría sus índices incoherentes
+
+    def _añadir(self, datos):
+        producto_id, nombre, cantidad, precio = _requeridos(
+            producto_id=_entero(datos, 'producto_id'), nombre=_texto(datos, 'nombre'),
+            cantidad=_entero(datos, 'cantidad'), precio=_precio(datos))
+        return self._inventario.añadir_producto(Producto(producto_id, nombre, cantidad, precio)), None
+
+    def _eliminar(self, datos):
+        producto_id, = _requeridos(producto_id=_entero(datos, 'producto_id'))
+        return self._inventario.eliminar_producto(producto_id), None
+
+    def _actualizar(self, datos):
+        producto_id, = _requeridos(producto_id=_entero(datos, 'producto_id'))
+        ok = self._inventario.actualizar_producto(producto_id, _entero(datos, 'cantidad'), _precio(datos),
+                                                  _texto(datos, 'nombre'))
+        return ok, None
+
+    def _obtener(self, datos):
+        producto_id, = _requeridos(producto_id=_entero(datos, 'producto_id'))
+        producto = self._inventario.obtener_producto(producto_id)
+        return producto is not None, producto.to_dict() if producto is not None else None
+
+    def _buscar(self, datos):
+        nombre, = _requeridos(nombre=_texto(datos, 'nombre'))
+        return True, [producto.to_dict() for producto in self._inventario.buscar_por_nombre(nombre)]
+
+    def _listar(self, datos):
+        offset, limite = _entero(datos, 'offset', 0), _entero(datos, 'limite', 100)
+        if offset < 0 or limite < 0:
+            raise ValueError("'offset' y 'limite' no pueden ser negativos")
+        productos = self._inventario.pagina(offset, limite)
+        return True, [producto.to_dict() for producto in productos]
+
+    def ejecutar(self, solicitud):
+        """Ejecuta una solicitud y devuelve la respuesta; los mensajes del Inventario van en 'mensaje'"""
+        respuesta = {'id': solicitud.get('id')}
+        operacion = self._operaciones.get(solicitud.get('op'))
+        if operacion is None:
+            respuesta.update(ok=False, mensaje=f"Error: Operación desconocida '{solicitud.get('op')}'.")
+            return respuesta
+
+        # El Inventario informa por pantalla; capturamos esos mensajes para devolverlos al cliente.
+        # Las operaciones son síncronas, así que no se mezclan mensajes de distintas solicitudes.
+        salida = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(salida):
+                ok, resultado = operacion(solicitud)
+        except ValueError as e:
+            respuesta.update(ok=False, mensaje=f"Error: Solicitud inválida ({e}).")
+            return respuesta
+        except Exception as e:
+            # Un fallo inesperado no puede cerrar la conexión ni perder las solicitudes que vienen detrás
+            respuesta.update(ok=False, mensaje=f"Error: No se pudo completar la solicitud ({e!r}).")
+            return respuesta
+
+        respuesta.update(ok=ok, mensaje=salida.getvalue().strip(), resultado=resultado)
+        return respuesta
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexión: procesa las solicitudes en orden a medida que llegan"""
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    solicitud = json.loads(linea)
+                except ValueError:
+                    solicitud = None
+                if isinstance(solicitud, dict):
+                    respuesta = self.ejecutar(solicitud)
+                else:
+                    respuesta = {'id': None, 'ok': False, 'mensaje': "Error: JSON inválido."}
+                escritor.write(json.dumps(respuesta).encode('utf-8') + b"\n")
+                # Solo esperamos al cliente si acumula muchas respuestas sin leer
+                if escritor.transport.get_write_buffer_size() > LIMITE_BUFER:
+                    await escritor.drain()
+            await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+
+async def iniciar_servidor(inventario, host='127.0.0.1', puerto=8765, socket_unix=None):
+    """Crea el servidor asyncio (TCP local o socket Unix) que atiende al inventario dado"""
+    servidor = ServidorInventario(inventario)
+    if socket_unix is not None:
+        return await asyncio.start_unix_server(servidor.atender, path=socket_unix, limit=LIMITE_LINEA)
+    return await asyncio.start_server(servidor.atender, host, puerto, limit=LIMITE_LINEA)
+
+
+async def servir(args):
+    inventario = Inventario(archivo=args.archivo, diario=args.diario)
+    servidor = await iniciar_servidor(inventario, args.host, args.puerto, args.socket)
+    direccion = args.socket or f"{args.host}:{args.puerto}"
+    print(f"Servidor de inventario escuchando en {direccion}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        inventario.cerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de inventario compartido")
+    parser.add_argument("--archivo", default="inventario.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--socket", help="Ruta de un socket Unix en lugar de TCP")
+    parser.add_argument("--sin-diario", dest="diario", action="store_false",
+                        help="Reescribir el JSON completo en cada cambio en lugar de usar el log")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        print("Servidor detenido.")
+
+
+if __name__ == "__main__":
+    main()